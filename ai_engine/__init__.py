@@ -3,12 +3,19 @@ VN30-Quantum AI Engine
 Professional AI-powered trading signals for Vietnamese stocks
 """
 
+from . import forecasters, indicator_graph, kernels, trend
 from .indicators import TechnicalIndicators, SignalStrength, IndicatorResult
 from .signal_generator import SignalGenerator, SignalType, TradingSignal
 from .pattern_detector import PatternDetector, PatternType, PatternResult
 from .gemini_advisor import GeminiAdvisor, AIAnalysis
 
 __all__ = [
+    # Indicator kernels (vectorized series, shared with hunter/analyst)
+    'kernels',
+    'indicator_graph',
+    'trend',
+    'forecasters',
+    
     # Indicators
     'TechnicalIndicators',
     'SignalStrength',
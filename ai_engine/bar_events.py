@@ -0,0 +1,128 @@
+"""
+VN30-Quantum AI Engine - Bar Events
+"Bars written for symbols X,Y at T" notifications over Redis pub/sub
+
+The hunter publishes (hunter/bar_events.py BarPublisher); the signal agent
+and the analyst consume with BarSubscriber. Without redis (library or
+REDIS_URL) subscribers simply wait out their polling interval.
+"""
+import json
+import time
+from datetime import datetime
+from typing import Callable, Iterable, List, Optional, Sequence, Set
+
+try:
+    import redis
+    REDIS_AVAILABLE = True
+except ImportError:
+    REDIS_AVAILABLE = False
+
+# Gộp các sự kiện đến sát nhau (nhiều shard ghi cùng một nến) thành một lần phân tích
+COALESCE_WINDOW = 0.05
+RECONNECT_DELAY = 5.0
+
+
+def encode_event(symbols: Iterable[str], bar_time: Optional[datetime], source: str) -> str:
+    return json.dumps({
+        'symbols': sorted(symbols),
+        'bar_time': bar_time.isoformat() if bar_time else None,
+        'published': time.time(),
+        'source': source,
+    })
+
+
+def decode_event(raw) -> dict:
+    if isinstance(raw, bytes):
+        raw = raw.decode('utf-8')
+    return json.loads(raw)
+
+
+class BarSubscriber:
+    """
+    Blocking consumer of bar events
+
+    `wait(timeout)` returns the symbols written since the last call (events
+    arriving within COALESCE_WINDOW are merged), or None when nothing
+    arrived in time or Redis is unavailable - the caller then falls back to
+    analysing every symbol, as it did with fixed polling. `last_event` is
+    the newest event of the last `wait()` (for latency metrics).
+    `info` / `warning` print connection changes in the caller's log style.
+    """
+
+    def __init__(self, url: str, channel: str,
+                 info: Callable[[str], None] = print, warning: Callable[[str], None] = print):
+        self.url = url if REDIS_AVAILABLE else ''
+        self.channel = channel
+        self.last_event: Optional[dict] = None
+        self._info = info
+        self._warning = warning
+        self._pubsub = None
+        self._retry_at = 0.0
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.url)
+
+    def _connect(self) -> bool:
+        if self._pubsub is not None:
+            return True
+        if not self.url or time.time() < self._retry_at:
+            return False
+        try:
+            pubsub = redis.Redis.from_url(self.url).pubsub(ignore_subscribe_messages=True)
+            pubsub.subscribe(self.channel)
+            self._pubsub = pubsub
+            self._info(f"📣 Đăng ký bar events: redis {self.channel}")
+            return True
+        except redis.RedisError as e:
+            self._warning(f"Không kết nối được Redis ({str(e)[:60]}) - dùng polling")
+            self._retry_at = time.time() + RECONNECT_DELAY
+            return False
+
+    def wait(self, timeout: float) -> Optional[Set[str]]:
+        deadline = time.time() + timeout
+        self.last_event = None
+        if not self._connect():
+            time.sleep(max(0.0, deadline - time.time()))
+            return None
+
+        symbols: Set[str] = set()
+        try:
+            while time.time() < deadline and not symbols:
+                self._collect(symbols, max(0.0, deadline - time.time()))
+            while symbols and self._collect(symbols, COALESCE_WINDOW):
+                pass
+        except (redis.RedisError, ValueError) as e:
+            self._warning(f"Mất kết nối bar events: {str(e)[:60]} - dùng polling")
+            self._pubsub = None
+            self._retry_at = time.time() + RECONNECT_DELAY
+        return symbols or None
+
+    def wait_for(self, universe: Sequence[str], timeout: float) -> List[str]:
+        """
+        Symbols of `universe` the hunter just wrote, or all of `universe` once
+        `timeout` has passed - one deadline, however many events only name
+        symbols outside it
+        """
+        deadline = time.time() + timeout
+        while True:
+            changed = self.wait(max(0.0, deadline - time.time()))
+            if changed is None:
+                return list(universe)
+            symbols = [s for s in universe if s in changed]
+            if symbols:
+                return symbols
+
+    def _collect(self, symbols: Set[str], timeout: float) -> bool:
+        message = self._pubsub.get_message(timeout=timeout)
+        if message is None or message.get('type') != 'message':
+            return False
+        event = decode_event(message['data'])
+        self.last_event = event
+        symbols.update(event.get('symbols', []))
+        return True
+
+    def close(self):
+        if self._pubsub is not None:
+            self._pubsub.close()
+            self._pubsub = None
@@ -0,0 +1,239 @@
+"""
+VN30-Quantum AI Engine - Shared Bar Ring
+The last N bars of every symbol in one memory-mapped file (hot read path)
+
+The hunter appends every bar it hands to InfluxDB; the signal agent and
+the analyst read recent bars from here instead of re-querying InfluxDB
+each cycle. InfluxDB stays the durable store: readers fall back to it
+for full history, or when the ring is missing or doesn't reach back far
+enough. Put the file on tmpfs (/dev/shm or a tmpfs volume) shared by the
+containers.
+
+Layout (fixed, little-endian, 64-byte aligned sections):
+    header     magic, version, capacity, symbol count
+    directory  symbol names (S16), slot i = symbol i
+    slots      per-symbol (seq, count) - seqlock + bars ever written
+    bars       per-symbol 2 × capacity BAR_DTYPE records
+
+Each bar is written at `count % capacity` and again `capacity` further
+on, so the newest k bars are always one contiguous slice. One writer per
+symbol bumps `seq` to odd before and back to even after touching the
+slot; readers copy the slice they asked for and retry until they see the
+same even `seq` on both sides of the copy (no locks), so a bar revised
+in place is never returned half old, half new.
+"""
+import fcntl
+import os
+import time
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+
+MAGIC = b'VN30RING'
+VERSION = 1
+NAME_DTYPE = np.dtype('S16')
+BAR_DTYPE = np.dtype([('time', '<i8'), ('open', '<f8'), ('high', '<f8'), ('low', '<f8'),
+                      ('close', '<f8'), ('volume', '<f8')])
+HEADER_DTYPE = np.dtype([('magic', 'S8'), ('version', '<u4'), ('capacity', '<u4'), ('symbols', '<u4')])
+SLOT_DTYPE = np.dtype([('seq', '<u8'), ('count', '<u8'), ('_pad', '<u8', 6)])  # một cache line
+
+READ_RETRIES = 100
+# An append holds its slot odd for microseconds; odd for this long = writer died mid-append
+STALE_WRITE_WAIT = 0.05
+
+
+def _align(offset: int) -> int:
+    return (offset + 63) // 64 * 64
+
+
+def _layout(symbols: int, capacity: int) -> Dict[str, int]:
+    directory = _align(HEADER_DTYPE.itemsize)
+    slots = _align(directory + symbols * NAME_DTYPE.itemsize)
+    bars = _align(slots + symbols * SLOT_DTYPE.itemsize)
+    return {'directory': directory, 'slots': slots, 'bars': bars,
+            'size': bars + symbols * 2 * capacity * BAR_DTYPE.itemsize}
+
+
+class BarRing:
+    """
+    A mapped ring file; `create()` for the writer, `open()` for readers
+
+    `latest()` / `since()` return copies taken under the seqlock, so the
+    writer revising the forming bar can't tear a bar the caller is reading.
+    """
+
+    def __init__(self, path: str, writable: bool):
+        self.path = path
+        self.writable = writable
+        self.inode = os.stat(path).st_ino
+        mode = 'r+' if writable else 'r'
+        header = np.fromfile(path, dtype=HEADER_DTYPE, count=1)
+        if len(header) != 1:
+            raise ValueError(f"{path}: truncated bar ring")
+        header = header[0]
+        if header['magic'] != MAGIC or header['version'] != VERSION:
+            raise ValueError(f"{path}: not a version {VERSION} bar ring")
+        self.capacity = int(header['capacity'])
+        count = int(header['symbols'])
+        layout = _layout(count, self.capacity)
+        self._map = np.memmap(path, dtype=np.uint8, mode=mode, shape=(layout['size'],))
+        buffer = self._map
+        names = np.ndarray((count,), NAME_DTYPE, buffer, layout['directory'])
+        self.symbols: List[str] = [name.decode() for name in names]
+        self.index = {symbol: row for row, symbol in enumerate(self.symbols)}
+        self.slots = np.ndarray((count,), SLOT_DTYPE, buffer, layout['slots'])
+        self.bars = np.ndarray((count, 2 * self.capacity), BAR_DTYPE, buffer, layout['bars'])
+
+    # ═══════════════════════════════════════════════════════
+    # OPEN / CREATE
+    # ═══════════════════════════════════════════════════════
+    @classmethod
+    def create(cls, path: str, symbols: Sequence[str], capacity: int = 512) -> "BarRing":
+        """
+        Writer side: reuse the file if its layout matches (restart, or another
+        hunter shard got here first), otherwise build a new one and swap it in.
+        A reused file gets every odd `seq` (writer killed mid-append) bumped to
+        even, so the slot reads again.
+        """
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        symbols = list(symbols)
+        with open(path + '.lock', 'w') as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            try:
+                ring = cls(path, writable=True)
+                if ring.capacity == capacity and ring.symbols == symbols:
+                    # Writer bị kill giữa hai lần tăng seq -> slot lẻ mãi: làm tròn lên chẵn.
+                    # Shard khác có thể đang ghi thật -> chỉ sửa slot vẫn lẻ, không đổi sau STALE_WRITE_WAIT
+                    seq = ring.slots['seq'].copy()
+                    if (seq % 2).any():
+                        time.sleep(STALE_WRITE_WAIT)
+                        stuck = (seq % 2 == 1) & (ring.slots['seq'] == seq)
+                        ring.slots['seq'][stuck] += 1
+                    return ring
+                ring.close()
+            except (OSError, ValueError):
+                pass
+
+            layout = _layout(len(symbols), capacity)
+            tmp_path = f"{path}.{os.getpid()}.tmp"
+            with open(tmp_path, 'wb') as f:
+                f.truncate(layout['size'])
+            mapped = np.memmap(tmp_path, dtype=np.uint8, mode='r+', shape=(layout['size'],))
+            header = np.ndarray((1,), HEADER_DTYPE, mapped, 0)
+            header[0] = (MAGIC, VERSION, capacity, len(symbols))
+            np.ndarray((len(symbols),), NAME_DTYPE, mapped, layout['directory'])[:] = \
+                [s.encode()[:NAME_DTYPE.itemsize] for s in symbols]
+            mapped.flush()
+            del header, mapped
+            os.replace(tmp_path, path)  # reader không bao giờ thấy file dở dang
+            return cls(path, writable=True)
+
+    @classmethod
+    def open(cls, path: str) -> "BarRing":
+        """Reader side (read-only mapping)"""
+        return cls(path, writable=False)
+
+    def replaced(self) -> bool:
+        """True when the writer swapped in a new file (different universe or capacity)"""
+        try:
+            return os.stat(self.path).st_ino != self.inode
+        except OSError:
+            return True
+
+    def close(self):
+        # Views handed out may still point into the map -> unmapped when the last one is gone
+        self.slots = self.bars = self._map = None
+
+    # ═══════════════════════════════════════════════════════
+    # WRITER
+    # ═══════════════════════════════════════════════════════
+    def append(self, symbol: str, bars: np.ndarray) -> int:
+        """
+        Add bars (BAR_DTYPE, oldest first). A bar with the newest stored time
+        replaces it (forming bar revised); older bars are ignored. Returns the
+        number of bars written.
+        """
+        row = self.index.get(symbol)
+        if row is None or not len(bars):
+            return 0
+        slot = self.slots[row:row + 1]
+        count = int(slot['count'][0])
+        cap = self.capacity
+        newest = int(self.bars[row, (count - 1) % cap]['time']) if count else None
+
+        written = 0
+        slot['seq'] += 1  # lẻ: đang ghi
+        try:
+            for bar in bars:
+                t = int(bar['time'])
+                if newest is not None and t < newest:
+                    continue
+                position = (count - 1) % cap if t == newest else count % cap
+                self.bars[row, position] = bar
+                self.bars[row, position + cap] = bar
+                if t != newest:
+                    count += 1
+                    newest = t
+                written += 1
+            slot['count'] = count
+        finally:
+            slot['seq'] += 1  # chẵn: nhất quán
+        return written
+
+    # ═══════════════════════════════════════════════════════
+    # READERS
+    # ═══════════════════════════════════════════════════════
+    def _read(self, row: int, select):
+        slot = self.slots[row:row + 1]
+        for attempt in range(READ_RETRIES):
+            seq = int(slot['seq'][0])
+            if seq % 2 == 0:
+                count = int(slot['count'][0])
+                if count == 0:
+                    view = self.bars[row, :0]
+                else:
+                    end = (count - 1) % self.capacity + self.capacity + 1
+                    view = self.bars[row, end - min(count, self.capacity):end]
+                result = select(view)
+                if result is not None:
+                    result = result.copy()  # đọc hết dữ liệu trước khi kiểm tra lại seq
+                if int(slot['seq'][0]) == seq:
+                    return result
+            time.sleep(0 if attempt < 10 else 0.001)
+        return None
+
+    def latest(self, symbol: str, count: int = 0) -> Optional[np.ndarray]:
+        """Newest `count` bars (all held if 0), oldest first; None for unknown symbols"""
+        row = self.index.get(symbol)
+        if row is None:
+            return None
+        return self._read(row, lambda view: view[-count:] if count else view)
+
+    def since(self, symbol: str, t: int) -> Optional[np.ndarray]:
+        """
+        Bars newer than epoch second `t`, or None when the ring doesn't reach
+        back to `t` (bars in between may be missing -> ask InfluxDB)
+        """
+        row = self.index.get(symbol)
+        if row is None:
+            return None
+
+        def select(view):
+            if not len(view) or view['time'][0] > t:
+                return None
+            return view[int(np.searchsorted(view['time'], t, side='right')):]
+        return self._read(row, select)
+
+
+def open_ring(path: str, current: Optional[BarRing] = None) -> Optional[BarRing]:
+    """Reader helper for each cycle: keep `current`, reopen if replaced, None if unavailable"""
+    if current is not None and not current.replaced():
+        return current
+    if current is not None:
+        current.close()
+    if not path:
+        return None
+    try:
+        return BarRing.open(path)
+    except (OSError, ValueError):
+        return None
@@ -0,0 +1,87 @@
+"""
+VN30-Quantum AI Engine - Columnar Flux Reads
+Flux query results decoded straight into typed NumPy columns
+
+`query_api.query()` builds a FluxRecord (a dict) per row, which costs more
+than the indicator math on the result. Here the CSV response is fetched
+raw and parsed by pandas' C reader, so there are no per-row Python objects:
+each symbol comes back as {'time': int64 epoch seconds, <field>: float64}.
+Used by hunter/signal_agent.py and analyst/main.py.
+"""
+import io
+from typing import Dict, Sequence
+
+import numpy as np
+import pandas as pd
+from influxdb_client import Dialect
+
+BAR_COLUMNS = ('open', 'high', 'low', 'close', 'volume')
+
+# Plain CSV: one header row per table schema, no #datatype/#group/#default annotations
+CSV_DIALECT = Dialect(header=True, delimiter=',', annotations=[], date_time_format='RFC3339')
+
+
+class FluxQueryError(RuntimeError):
+    """Flux reported an error inside an otherwise successful (HTTP 200) response"""
+
+
+def query_columns(query_api, query: str, org: str, columns: Sequence[str] = BAR_COLUMNS,
+                  key: str = 'symbol') -> Dict[str, Dict[str, np.ndarray]]:
+    """
+    Run a pivoted Flux query and split the result by `key` into column arrays
+    sorted by time. Columns missing from the result are NaN.
+    """
+    response = query_api.query_raw(query, org=org, dialect=CSV_DIALECT)
+    try:
+        raw = response.data
+    finally:
+        response.release_conn()
+    return decode_csv(raw, columns, key)
+
+
+def decode_csv(raw: bytes, columns: Sequence[str] = BAR_COLUMNS,
+               key: str = 'symbol') -> Dict[str, Dict[str, np.ndarray]]:
+    frame = _read_tables(raw, columns, key)
+    if frame.empty:
+        return {}
+
+    times = pd.to_datetime(frame['_time'], utc=True, format='ISO8601')
+    seconds = times.to_numpy(dtype='datetime64[s]').astype(np.int64)
+    codes, names = pd.factorize(frame[key], sort=False)
+    order = np.lexsort((seconds, codes))
+    codes, seconds = codes[order], seconds[order]
+    values = {
+        column: (frame[column].to_numpy(dtype=np.float64)[order] if column in frame
+                 else np.full(len(order), np.nan))
+        for column in columns
+    }
+
+    # Các dòng của cùng một mã nằm liền nhau sau khi sắp xếp -> mỗi mã là một lát cắt (view)
+    bounds = np.flatnonzero(np.diff(codes)) + 1
+    starts = np.concatenate(([0], bounds))
+    ends = np.concatenate((bounds, [len(codes)]))
+    result = {}
+    for start, end in zip(starts, ends):
+        if codes[start] < 0:
+            continue  # dòng thiếu key
+        data = {column: array[start:end] for column, array in values.items()}
+        data['time'] = seconds[start:end]
+        result[str(names[codes[start]])] = data
+    return result
+
+
+def _read_tables(raw: bytes, columns: Sequence[str], key: str) -> pd.DataFrame:
+    """Tables with different schemas are separated by a blank line and repeat the header"""
+    dtypes = {column: np.float64 for column in columns}
+    dtypes[key] = str
+    frames = []
+    for block in raw.replace(b'\r\n', b'\n').split(b'\n\n'):
+        if not block.strip():
+            continue
+        frame = pd.read_csv(io.BytesIO(block), dtype=dtypes, usecols=lambda c: c in dtypes or c in ('_time', 'error'))
+        if 'error' in frame.columns:
+            raise FluxQueryError(str(frame['error'].iloc[0]) if len(frame) else 'unknown Flux error')
+        frames.append(frame)
+    if not frames:
+        return pd.DataFrame()
+    return frames[0] if len(frames) == 1 else pd.concat(frames, ignore_index=True)
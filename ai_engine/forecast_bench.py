@@ -0,0 +1,196 @@
+"""
+VN30-Quantum AI Engine - Forecaster Benchmark
+Walk-forward accuracy vs latency of the registered forecasters on stored bars
+
+Every bar from the longest model window onward is predicted from the bars
+before it only, so all models are scored on the same targets. Errors are in
+basis points of the last close; latency is one call over a cycle-sized
+(symbols × window) panel, as the analyst makes it.
+
+Usage:
+    python -m ai_engine.forecast_bench --path replay/          # CSV/Parquet recordings (replay format)
+    python -m ai_engine.forecast_bench --influx --hours 72     # stock_price bars from InfluxDB
+    python -m ai_engine.forecast_bench --synthetic             # random walks (smoke test)
+    python -m ai_engine.forecast_bench --path replay/ --budget-ms 2 --models ols,ar,kalman
+"""
+import argparse
+import glob
+import os
+import sys
+import time
+from typing import Dict, List, NamedTuple
+
+import numpy as np
+
+from . import forecasters
+
+
+class BenchResult(NamedTuple):
+    model: str           # registry name
+    name: str            # with parameters
+    samples: int
+    mae_bps: float
+    rmse_bps: float
+    hit_rate: float      # dự báo đúng chiều (bỏ các bar đứng giá)
+    skill: float         # 1 - MAE / MAE(naive)
+    latency_ms: float    # median, one cycle panel
+
+
+# ═══════════════════════════════════════════════════════
+# DATA
+# ═══════════════════════════════════════════════════════
+def load_files(path: str) -> Dict[str, np.ndarray]:
+    """Closes per symbol from CSV/Parquet files (time, [symbol,] close - same files as the hunter's replay)"""
+    import pandas as pd
+
+    files = sorted(glob.glob(os.path.join(path, '*'))) if os.path.isdir(path) else [path]
+    series = {}
+    for file in files:
+        if file.endswith('.parquet'):
+            df = pd.read_parquet(file)
+        elif file.endswith('.csv'):
+            df = pd.read_csv(file)
+        else:
+            continue
+        if 'symbol' not in df:
+            df['symbol'] = os.path.splitext(os.path.basename(file))[0].upper()
+        df = df.sort_values('time', kind='stable')
+        for symbol, group in df.groupby('symbol', sort=False):
+            series[str(symbol)] = group['close'].to_numpy(dtype=float)
+    return series
+
+
+def load_influx(hours: int) -> Dict[str, np.ndarray]:
+    """Closes per symbol from the stock_price measurement (INFLUX_* environment)"""
+    from influxdb_client import InfluxDBClient
+    from .columnar import query_columns
+
+    bucket = os.getenv('INFLUX_BUCKET', 'market_data')
+    org = os.getenv('INFLUX_ORG', 'vnquant')
+    query = f'''
+    from(bucket: "{bucket}")
+      |> range(start: -{hours}h)
+      |> filter(fn: (r) => r["_measurement"] == "stock_price" and r["_field"] == "close")
+      |> pivot(rowKey:["_time"], columnKey: ["_field"], valueColumn: "_value")
+      |> keep(columns: ["_time", "symbol", "close"])
+    '''
+    with InfluxDBClient(url=os.getenv('INFLUX_URL', 'http://localhost:8086'),
+                        token=os.getenv('INFLUX_TOKEN', 'my-super-secret-auth-token'), org=org) as client:
+        columns = query_columns(client.query_api(), query, org, ('close',))
+    return {symbol: data['close'][~np.isnan(data['close'])] for symbol, data in columns.items()}
+
+
+def synthetic(symbols: int = 30, length: int = 1500, seed: int = 7) -> Dict[str, np.ndarray]:
+    """Random walks with a little momentum in the returns"""
+    rng = np.random.default_rng(seed)
+    series = {}
+    for i in range(symbols):
+        shocks = rng.normal(0, 0.002, length)
+        returns = np.zeros(length)
+        for t in range(1, length):
+            returns[t] = 0.2 * returns[t - 1] + shocks[t]
+        series[f"S{i:02d}"] = 20000 * np.exp(np.cumsum(returns))
+    return series
+
+
+# ═══════════════════════════════════════════════════════
+# BENCHMARK
+# ═══════════════════════════════════════════════════════
+def walk_forward(series: Dict[str, np.ndarray], start: int, window: int) -> np.ndarray:
+    """(samples × window + 1) rows: the `window` bars before each target, then the target"""
+    rows = []
+    for closes in series.values():
+        if len(closes) > start:
+            views = np.lib.stride_tricks.sliding_window_view(closes, window + 1)
+            rows.append(views[start - window:])
+    return np.concatenate(rows) if rows else np.empty((0, window + 1))
+
+
+def _latency_ms(model: forecasters.Forecaster, panel: np.ndarray, repeat: int) -> float:
+    model.predict(panel)  # warm-up
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        model.predict(panel)
+        timings.append((time.perf_counter() - started) * 1000)
+    return float(np.median(timings))
+
+
+def _errors(model: forecasters.Forecaster, series: Dict[str, np.ndarray], start: int):
+    """Walk-forward predictions -> (inputs, error in bps, direction hits)"""
+    samples = walk_forward(series, start, model.window)
+    if not len(samples):
+        raise ValueError(f"Need series longer than {start} bars")
+    inputs, targets, last = samples[:, :-1], samples[:, -1], samples[:, -2]
+    chunks = np.array_split(inputs, max(1, len(inputs) // 20000))
+    predictions = np.concatenate([model.predict(chunk) for chunk in chunks])
+    moved = targets != last
+    hits = np.sign(predictions[moved] - last[moved]) == np.sign(targets[moved] - last[moved])
+    return inputs, (predictions - targets) / last * 1e4, hits
+
+
+def run(series: Dict[str, np.ndarray], models: List[forecasters.Forecaster],
+        cycle_symbols: int = 30, repeat: int = 50) -> List[BenchResult]:
+    start = max(model.window for model in models)
+    _, naive_errors, _ = _errors(forecasters.create('naive', window=2), series, start)
+    naive_mae = float(np.nanmean(np.abs(naive_errors)))
+
+    results = []
+    for model in models:
+        inputs, errors, hits = _errors(model, series, start)
+        mae = float(np.nanmean(np.abs(errors)))
+        results.append(BenchResult(
+            model=model.name, name=repr(model), samples=len(errors), mae_bps=mae,
+            rmse_bps=float(np.sqrt(np.nanmean(errors ** 2))),
+            hit_rate=float(hits.mean()) if len(hits) else float('nan'),
+            skill=1 - mae / naive_mae if naive_mae else float('nan'),
+            latency_ms=_latency_ms(model, inputs[:cycle_symbols], repeat),
+        ))
+    return results
+
+
+def pick(results: List[BenchResult], budget_ms: float) -> BenchResult:
+    """Lowest MAE among models that fit the latency budget (fastest if none does)"""
+    affordable = [r for r in results if r.latency_ms <= budget_ms]
+    if not affordable:
+        return min(results, key=lambda r: r.latency_ms)
+    return min(affordable, key=lambda r: r.mae_bps)
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Walk-forward forecaster benchmark")
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument('--path', help="CSV/Parquet file or directory (replay format)")
+    source.add_argument('--influx', action='store_true', help="read stock_price bars from InfluxDB")
+    source.add_argument('--synthetic', action='store_true', help="random-walk data")
+    parser.add_argument('--hours', type=int, default=72, help="InfluxDB history (with --influx)")
+    parser.add_argument('--models', default=','.join(forecasters.available()),
+                        help="comma-separated registry names")
+    parser.add_argument('--window', type=int, default=0, help="override every model's window")
+    parser.add_argument('--symbols', type=int, default=30, help="panel rows per latency call (one cycle)")
+    parser.add_argument('--budget-ms', type=float, default=0, help="pick the best model within this latency")
+    args = parser.parse_args(argv)
+
+    if args.path:
+        series = load_files(args.path)
+    elif args.influx:
+        series = load_influx(args.hours)
+    else:
+        series = synthetic()
+    params = {'window': args.window} if args.window else {}
+    models = [forecasters.create(name.strip(), **params) for name in args.models.split(',') if name.strip()]
+
+    results = run(series, models, cycle_symbols=args.symbols)
+    print(f"{len(series)} symbols · errors in bps of last close · latency = 1 call × {args.symbols} symbols\n")
+    print(f"{'model':<48} {'samples':>8} {'MAE':>8} {'RMSE':>8} {'hit%':>6} {'skill':>7} {'ms':>8}")
+    for r in sorted(results, key=lambda r: r.mae_bps):
+        print(f"{r.name:<48} {r.samples:>8} {r.mae_bps:>8.2f} {r.rmse_bps:>8.2f} "
+              f"{r.hit_rate * 100:>6.1f} {r.skill:>+7.3f} {r.latency_ms:>8.3f}")
+    if args.budget_ms:
+        best = pick(results, args.budget_ms)
+        print(f"\nBest within {args.budget_ms:g} ms: {best.name} -> ANALYST_FORECASTER={best.model}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,211 @@
+"""
+VN30-Quantum AI Engine - Forecasters
+Next-bar price forecasters behind one interface, looked up by name
+
+Every forecaster takes a (symbols × window) panel of closes, oldest first,
+and returns one forecast per row in a single vectorized call (loops run
+over the window, never over symbols). Rows containing NaN get NaN.
+
+    model = forecasters.create('ar', window=60, order=3)
+    predictions = model.predict(panel)
+
+Built in: 'naive', 'ols', 'ar', 'ses', 'holt', 'kalman'. Compare them on
+recorded bars with `python -m ai_engine.forecast_bench`.
+"""
+from typing import Dict, List, Type
+
+import numpy as np
+
+from .kernels import as_panel
+from .trend import LinearTrend
+
+
+class Forecaster:
+    """
+    Base class: subclasses implement `_predict` on a NaN-free panel
+    (rows × window) and return one value per row
+    """
+
+    name = 'base'
+
+    def __init__(self, window: int = 30):
+        if window < 2:
+            raise ValueError("window must be >= 2")
+        self.window = window
+
+    def predict(self, values) -> np.ndarray:
+        """Forecast per row from the newest `window` values (a scalar for a 1D series)"""
+        panel = as_panel(values)
+        if panel.shape[1] < self.window:
+            panel = np.hstack([np.full((panel.shape[0], self.window - panel.shape[1]), np.nan), panel])
+        panel = panel[:, -self.window:]
+        out = np.full(panel.shape[0], np.nan)
+        valid = ~np.isnan(panel).any(axis=1)
+        if valid.any():
+            out[valid] = self._predict(panel[valid])
+        return out[0] if np.ndim(values) == 1 else out
+
+    def _predict(self, panel: np.ndarray) -> np.ndarray:
+        raise NotImplementedError
+
+    def __repr__(self) -> str:
+        params = ', '.join(f"{k}={v}" for k, v in vars(self).items() if not k.startswith('_'))
+        return f"{type(self).__name__}({params})"
+
+
+# ═══════════════════════════════════════════════════════
+# REGISTRY
+# ═══════════════════════════════════════════════════════
+FORECASTERS: Dict[str, Type[Forecaster]] = {}
+
+
+def register(cls: Type[Forecaster]) -> Type[Forecaster]:
+    """Class decorator: make a forecaster available to `create()` under `cls.name`"""
+    FORECASTERS[cls.name] = cls
+    return cls
+
+
+def available() -> List[str]:
+    return sorted(FORECASTERS)
+
+
+def create(name: str, **params) -> Forecaster:
+    try:
+        return FORECASTERS[name](**params)
+    except KeyError:
+        raise ValueError(f"Unknown forecaster '{name}' (available: {', '.join(available())})") from None
+
+
+# ═══════════════════════════════════════════════════════
+# IMPLEMENTATIONS
+# ═══════════════════════════════════════════════════════
+@register
+class Naive(Forecaster):
+    """Last close (random walk) - the baseline every model has to beat"""
+
+    name = 'naive'
+
+    def _predict(self, panel: np.ndarray) -> np.ndarray:
+        return panel[:, -1]
+
+
+@register
+class RollingOLS(Forecaster):
+    """Straight line through the window, extended one bar (ai_engine.trend)"""
+
+    name = 'ols'
+
+    def __init__(self, window: int = 30):
+        super().__init__(window)
+        self._trend = LinearTrend(window, horizon=1)
+
+    def _predict(self, panel: np.ndarray) -> np.ndarray:
+        return panel @ self._trend.forecast_weights
+
+
+@register
+class AutoRegressive(Forecaster):
+    """
+    AR(p) on price changes, coefficients from the Yule-Walker equations
+
+    Autocovariances of the demeaned changes give a (rows × p × p) Toeplitz
+    system per row, solved in one batched `np.linalg.solve`. Rows with no
+    variance (flat prices) predict no change.
+    """
+
+    name = 'ar'
+
+    def __init__(self, window: int = 60, order: int = 3):
+        super().__init__(window)
+        if not 1 <= order < window - 1:
+            raise ValueError("order must be in [1, window - 2]")
+        self.order = order
+
+    def _predict(self, panel: np.ndarray) -> np.ndarray:
+        p = self.order
+        changes = np.diff(panel, axis=1)
+        mean = changes.mean(axis=1, keepdims=True)
+        x = changes - mean
+        n = x.shape[1]
+        gamma = np.stack([(x[:, k:] * x[:, :n - k]).sum(axis=1) / n for k in range(p + 1)], axis=1)
+
+        lags = np.abs(np.subtract.outer(np.arange(p), np.arange(p)))
+        toeplitz = gamma[:, lags]
+        flat = gamma[:, 0] <= 1e-12 * np.maximum(1.0, np.abs(panel[:, -1])) ** 2
+        toeplitz[flat] = np.eye(p)
+        phi = np.linalg.solve(toeplitz, gamma[:, 1:, np.newaxis])[..., 0]
+        phi[flat] = 0.0
+
+        recent = x[:, ::-1][:, :p]  # x_t, x_{t-1}, ...
+        return panel[:, -1] + mean[:, 0] + (phi * recent).sum(axis=1)
+
+
+@register
+class Holt(Forecaster):
+    """
+    Holt's linear exponential smoothing (level + trend), one-step forecast
+
+    Seeded with the first close and the first change; `beta=0` with a zero
+    trend is simple exponential smoothing (registered as 'ses').
+    """
+
+    name = 'holt'
+
+    def __init__(self, window: int = 30, alpha: float = 0.5, beta: float = 0.1):
+        super().__init__(window)
+        if not 0 < alpha <= 1 or not 0 <= beta <= 1:
+            raise ValueError("alpha must be in (0, 1], beta in [0, 1]")
+        self.alpha = alpha
+        self.beta = beta
+
+    def _predict(self, panel: np.ndarray) -> np.ndarray:
+        level = panel[:, 0].copy()
+        trend = panel[:, 1] - panel[:, 0] if self.beta > 0 else np.zeros(len(panel))
+        for t in range(1, panel.shape[1]):
+            previous = level
+            level = self.alpha * panel[:, t] + (1 - self.alpha) * (level + trend)
+            if self.beta > 0:
+                trend = self.beta * (level - previous) + (1 - self.beta) * trend
+        return level + trend
+
+
+@register
+class SimpleSmoothing(Holt):
+    """Simple exponential smoothing: forecast = smoothed level"""
+
+    name = 'ses'
+
+    def __init__(self, window: int = 30, alpha: float = 0.5):
+        super().__init__(window, alpha=alpha, beta=0.0)
+
+
+@register
+class Kalman(Forecaster):
+    """
+    Scalar Kalman filter, local-level model (price = hidden random walk + noise)
+
+    Measurement noise R is each row's variance of price changes over the
+    window, process noise Q = `q_ratio` × R, so the gain adapts to each
+    symbol's volatility. Forecast = filtered level.
+    """
+
+    name = 'kalman'
+
+    def __init__(self, window: int = 30, q_ratio: float = 0.1):
+        super().__init__(window)
+        if q_ratio <= 0:
+            raise ValueError("q_ratio must be positive")
+        self.q_ratio = q_ratio
+
+    def _predict(self, panel: np.ndarray) -> np.ndarray:
+        r = np.maximum(np.diff(panel, axis=1).var(axis=1), 1e-12)
+        q = self.q_ratio * r
+        level = panel[:, 0].copy()
+        variance = r.copy()
+        for t in range(1, panel.shape[1]):
+            variance = variance + q
+            gain = variance / (variance + r)
+            level = level + gain * (panel[:, t] - level)
+            variance = (1 - gain) * variance
+        return level
+
@@ -0,0 +1,213 @@
+"""
+VN30-Quantum AI Engine - Indicator Graph
+Requested indicators resolved to the distinct computations they share
+
+Every indicator is a node named by kind and parameters, e.g. `rsi(14)`,
+`sma(20)`, `bb_position(20, 2)`, built from the nodes it declares:
+
+    close ─┬─ moves ─┬─ avg_gain(14) ─┬─ rsi(14)
+           │         └─ avg_loss(14) ─┘
+           ├─ ema(12) ─┬─ macd(12, 26) ── macd_signal(12, 26, 9) ── macd_hist(12, 26, 9)
+           ├─ ema(26) ─┘
+           └─ sma(20) ── rolling_std(20) ── bollinger(20, 2) ── bb_upper / bb_lower / ...
+
+An IndicatorGraph walks the requested outputs once and keeps each distinct
+node a single time, in dependency order; `evaluate()` then computes every
+node once per call over the whole (symbols × time) panel and caches it for
+the rest of that call. sma(20) asked for directly is the same node as the
+Bollinger middle band, and a new indicator on top of ema(26) does not
+compute another EMA. Numbers are identical to the ai_engine.kernels
+functions (same building blocks).
+
+    graph = IndicatorGraph(['rsi(14)', 'macd_hist', 'bb_position(20, 2)', 'sma(50)'])
+    values = graph.evaluate(close=panel)        # {'rsi(14)': array, ...}
+
+Register new indicators with @node, listing their inputs.
+"""
+import ast
+import inspect
+from typing import Any, Callable, Dict, List, Mapping, NamedTuple, Sequence, Tuple, Union
+
+import numpy as np
+
+from . import kernels
+
+Key = Tuple  # (kind, *parameters)
+
+# Columns handed to evaluate(); every other node is computed
+INPUTS = ('close', 'high', 'low', 'volume')
+
+
+class Node(NamedTuple):
+    compute: Callable                        # (*input values, *parameters) -> array(s)
+    requires: Callable[..., Sequence[Any]]   # (*parameters) -> input specs
+    defaults: Tuple
+
+
+NODES: Dict[str, Node] = {}
+
+
+def node(kind: str, requires: Callable[..., Sequence[Any]]):
+    """
+    Register `compute` under `kind`. Its signature lists the input values
+    first (no defaults), then the parameters with their defaults; `requires`
+    maps the parameters to the input specs, in the same order.
+    """
+    def register(compute: Callable) -> Callable:
+        defaults = tuple(p.default for p in inspect.signature(compute).parameters.values()
+                         if p.default is not inspect.Parameter.empty)
+        NODES[kind] = Node(compute, requires, defaults)
+        return compute
+    return register
+
+
+def key(spec: Union[str, Key]) -> Key:
+    """'bb_upper(20, 2)' / ('bb_upper', 20) / 'bb_upper' -> ('bb_upper', 20, 2.0) with defaults filled"""
+    if isinstance(spec, str):
+        kind, _, args = spec.partition('(')
+        kind, args = kind.strip(), args.rstrip().rstrip(')').strip()
+        params = ast.literal_eval(f"({args},)") if args else ()
+    else:
+        kind, params = spec[0], tuple(spec[1:])
+    if kind in INPUTS:
+        return (kind,)
+    if kind not in NODES:
+        raise ValueError(f"Unknown indicator '{kind}' (available: {', '.join(sorted(NODES))})")
+    defaults = NODES[kind].defaults
+    if len(params) > len(defaults):
+        raise ValueError(f"{kind} takes at most {len(defaults)} parameters, got {len(params)}")
+    # 2 và 2.0 là cùng một node
+    return (kind, *(type(d)(p) for p, d in zip(params, defaults)), *defaults[len(params):])
+
+
+def _unwrap(value, one_series: bool):
+    if not one_series:
+        return value
+    if isinstance(value, tuple):
+        return type(value)(*(v[0] for v in value))
+    return value[0]
+
+
+class IndicatorGraph:
+    """
+    Evaluation plan for a fixed set of outputs
+
+    `outputs` is a list of specs (results keyed by the spec as given) or a
+    {name: spec} mapping. `steps` is the resolved plan: each distinct node
+    once, inputs before the nodes that use them.
+    """
+
+    def __init__(self, outputs: Union[Sequence[str], Mapping[str, Union[str, Key]]]):
+        if not isinstance(outputs, Mapping):
+            outputs = {spec: spec for spec in outputs}
+        self.outputs: Dict[str, Key] = {name: key(spec) for name, spec in outputs.items()}
+        self.inputs: List[str] = []
+        self.steps: List[Key] = []
+        self._requires: Dict[Key, List[Key]] = {}
+        for target in self.outputs.values():
+            self._resolve(target)
+
+    def _resolve(self, target: Key):
+        if target in self._requires or target[0] in self.inputs:
+            return
+        if target[0] in INPUTS:
+            self.inputs.append(target[0])
+            return
+        requires = [key(spec) for spec in NODES[target[0]].requires(*target[1:])]
+        for dependency in requires:
+            self._resolve(dependency)
+        self._requires[target] = requires
+        self.steps.append(target)
+
+    def evaluate(self, **columns) -> Dict[str, Any]:
+        """
+        Outputs for 1D series or (symbols × time) panels passed by input name
+        (close=..., high=..., ...); results have the input's shape
+        """
+        missing = [name for name in self.inputs if columns.get(name) is None]
+        if missing:
+            raise ValueError(f"Missing input column(s): {', '.join(missing)}")
+        one_series = bool(self.inputs) and np.ndim(columns[self.inputs[0]]) == 1
+        values: Dict[Key, Any] = {(name,): kernels.as_panel(columns[name]) for name in self.inputs}
+        for step in self.steps:
+            arguments = [values[dependency] for dependency in self._requires[step]]
+            values[step] = NODES[step[0]].compute(*arguments, *step[1:])
+        return {name: _unwrap(values[target], one_series) for name, target in self.outputs.items()}
+
+    def __repr__(self) -> str:
+        return f"IndicatorGraph({len(self.outputs)} outputs, {len(self.steps)} nodes)"
+
+
+# ═══════════════════════════════════════════════════════
+# NODES
+# ═══════════════════════════════════════════════════════
+@node('ema', lambda period: ['close'])
+def _ema(close, period: int = 12):
+    return kernels._ema(close, period)
+
+
+@node('sma', lambda period: ['close'])
+def _sma(close, period: int = 20):
+    return kernels._rolling_mean(close, period)
+
+
+@node('rolling_std', lambda period: ['close', ('sma', period)])
+def _rolling_std(close, mean, period: int = 20):
+    return kernels._rolling_std(close, period, mean)
+
+
+@node('moves', lambda: ['close'])
+def _moves(close):
+    return kernels._moves(close)
+
+
+@node('avg_gain', lambda period: ['moves'])
+def _avg_gain(moves, period: int = 14):
+    return kernels._wilder(moves[0], period)
+
+
+@node('avg_loss', lambda period: ['moves'])
+def _avg_loss(moves, period: int = 14):
+    return kernels._wilder(moves[1], period)
+
+
+@node('rsi', lambda period: ['close', ('avg_gain', period), ('avg_loss', period)])
+def _rsi(close, avg_gain, avg_loss, period: int = 14):
+    if close.shape[1] <= period:
+        return np.full(close.shape, np.nan)
+    return kernels._rsi_from_averages(avg_gain, avg_loss)
+
+
+@node('macd', lambda fast, slow: ['close', ('ema', fast), ('ema', slow)])
+def _macd(close, fast_ema, slow_ema, fast: int = 12, slow: int = 26):
+    return kernels._macd_line(close, fast_ema, slow_ema, slow)
+
+
+@node('macd_signal', lambda fast, slow, signal: [('macd', fast, slow)])
+def _macd_signal(line, fast: int = 12, slow: int = 26, signal: int = 9):
+    return kernels._signal_line(line, signal)
+
+
+@node('macd_hist', lambda fast, slow, signal: [('macd', fast, slow), ('macd_signal', fast, slow, signal)])
+def _macd_hist(line, signal_line, fast: int = 12, slow: int = 26, signal: int = 9):
+    return line - signal_line
+
+
+@node('bollinger', lambda period, num_std: ['close', ('sma', period), ('rolling_std', period)])
+def _bollinger(close, middle, std, period: int = 20, num_std: float = 2.0):
+    return kernels._bands(close, middle, std, num_std)
+
+
+def _band(field: str):
+    def compute(bands, period: int = 20, num_std: float = 2.0):
+        return getattr(bands, field)
+    return compute
+
+
+for _field in kernels.BollingerSeries._fields:
+    node(f'bb_{_field}', lambda period, num_std: [('bollinger', period, num_std)])(_band(_field))
+
+
+@node('sar', lambda step, max_step: ['high', 'low'])
+def _sar(high, low, step: float = 0.02, max_step: float = 0.2):
+    return kernels.parabolic_sar(high, low, step, max_step)
@@ -7,6 +7,9 @@ from typing import List, Dict, Optional, Tuple
 from dataclasses import dataclass
 from enum import Enum
 
+from . import kernels
+from .indicator_graph import IndicatorGraph
+
 
 class SignalStrength(Enum):
     STRONG_BUY = 2
@@ -25,6 +28,18 @@ class IndicatorResult:
     description: str
 
 
+# Everything calculate_all_indicators reads, resolved to shared computations
+ALL_INDICATORS = IndicatorGraph({
+    'rsi': 'rsi(14)',
+    'macd': 'macd(12, 26)',
+    'macd_signal': 'macd_signal(12, 26, 9)',
+    'macd_hist': 'macd_hist(12, 26, 9)',
+    'bollinger': 'bollinger(20, 2)',
+    'sma_20': 'sma(20)',
+    'sma_50': 'sma(50)',
+})
+
+
 class TechnicalIndicators:
     """
     Technical Analysis Engine
@@ -40,19 +55,11 @@ class TechnicalIndicators:
         """
         if len(prices) < period + 1:
             return 50.0, SignalStrength.NEUTRAL
-        
-        deltas = np.diff(prices)
-        gains = np.where(deltas > 0, deltas, 0)
-        losses = np.where(deltas < 0, -deltas, 0)
-        
-        avg_gain = np.mean(gains[-period:])
-        avg_loss = np.mean(losses[-period:])
-        
-        if avg_loss == 0:
-            rsi = 100.0
-        else:
-            rs = avg_gain / avg_loss
-            rsi = 100 - (100 / (1 + rs))
+        return TechnicalIndicators._rsi_reading(kernels.rsi(prices, period))
+    
+    @staticmethod
+    def _rsi_reading(series: np.ndarray) -> Tuple[float, SignalStrength]:
+        rsi = kernels.last_value(series, 50.0)
         
         # Determine signal
         if rsi <= 20:
@@ -82,26 +89,14 @@ class TechnicalIndicators:
         """
         if len(prices) < slow_period + signal_period:
             return {"macd": 0, "signal": 0, "histogram": 0}, SignalStrength.NEUTRAL
-        
-        prices_array = np.array(prices)
-        
-        # Calculate EMAs
-        ema_fast = TechnicalIndicators._ema(prices_array, fast_period)
-        ema_slow = TechnicalIndicators._ema(prices_array, slow_period)
-        
-        # MACD line
-        macd_line = ema_fast - ema_slow
-        
-        # Signal line (EMA of MACD)
-        signal_line = TechnicalIndicators._ema(macd_line, signal_period)
-        
-        # Histogram
-        histogram = macd_line - signal_line
-        
-        current_macd = macd_line[-1]
-        current_signal = signal_line[-1]
-        current_histogram = histogram[-1]
-        prev_histogram = histogram[-2] if len(histogram) > 1 else 0
+        return TechnicalIndicators._macd_reading(kernels.macd(prices, fast_period, slow_period, signal_period))
+    
+    @staticmethod
+    def _macd_reading(series: kernels.MACDSeries) -> Tuple[Dict[str, float], SignalStrength]:
+        current_macd = float(series.macd[-1])
+        current_signal = float(series.signal[-1])
+        current_histogram = float(series.histogram[-1])
+        prev_histogram = float(series.histogram[-2])
         
         # Determine signal
         if current_histogram > 0 and prev_histogram <= 0:
@@ -133,21 +128,18 @@ class TechnicalIndicators:
         Price near upper band = potential SELL
         """
         if len(prices) < period:
-            current_price = prices[-1] if prices else 0
             return {"upper": 0, "middle": 0, "lower": 0, "width": 0}, SignalStrength.NEUTRAL
-        
-        prices_array = np.array(prices[-period:])
-        middle = np.mean(prices_array)
-        std = np.std(prices_array)
-        
-        upper = middle + (num_std * std)
-        lower = middle - (num_std * std)
-        width = (upper - lower) / middle * 100
-        
-        current_price = prices[-1]
+        return TechnicalIndicators._bollinger_reading(kernels.bollinger(prices[-period:], period, num_std))
+    
+    @staticmethod
+    def _bollinger_reading(bands: kernels.BollingerSeries) -> Tuple[Dict[str, float], SignalStrength]:
+        upper = float(bands.upper[-1])
+        middle = float(bands.middle[-1])
+        lower = float(bands.lower[-1])
+        width = float(bands.width[-1])
         
         # Determine signal based on price position
-        price_position = (current_price - lower) / (upper - lower) if upper != lower else 0.5
+        price_position = float(bands.position[-1])
         
         if price_position <= 0.1:
             signal = SignalStrength.STRONG_BUY
@@ -173,7 +165,7 @@ class TechnicalIndicators:
         """Simple Moving Average"""
         if len(prices) < period:
             return np.mean(prices) if prices else 0
-        return np.mean(prices[-period:])
+        return kernels.last_value(kernels.sma(prices[-period:], period))
     
     @staticmethod
     def calculate_ema(prices: List[float], period: int) -> float:
@@ -184,15 +176,8 @@ class TechnicalIndicators:
     
     @staticmethod
     def _ema(data: np.ndarray, period: int) -> np.ndarray:
-        """Calculate EMA using pandas-like method"""
-        alpha = 2 / (period + 1)
-        ema = np.zeros_like(data, dtype=float)
-        ema[0] = data[0]
-        
-        for i in range(1, len(data)):
-            ema[i] = alpha * data[i] + (1 - alpha) * ema[i-1]
-        
-        return ema
+        """EMA series seeded with the first value (same as pandas ewm(adjust=False))"""
+        return kernels.ema(data, period)
     
     @staticmethod
     def calculate_volume_analysis(
@@ -241,11 +226,18 @@ class TechnicalIndicators:
         prices: List[float],
         volumes: List[float] = None
     ) -> Dict[str, IndicatorResult]:
-        """Calculate all indicators at once"""
+        """
+        Calculate all indicators at once
+        One ALL_INDICATORS evaluation: EMAs, Wilder averages and the 20-bar
+        mean are computed once and shared by RSI, MACD, Bollinger and the MAs
+        """
         results = {}
+        values = ALL_INDICATORS.evaluate(close=prices)
+        bars = len(prices)
         
         # RSI
-        rsi_value, rsi_signal = TechnicalIndicators.calculate_rsi(prices)
+        rsi_value, rsi_signal = TechnicalIndicators._rsi_reading(values['rsi']) if bars >= 15 \
+            else (50.0, SignalStrength.NEUTRAL)
         results['rsi'] = IndicatorResult(
             name='RSI (14)',
             value=rsi_value,
@@ -254,7 +246,9 @@ class TechnicalIndicators:
         )
         
         # MACD
-        macd_values, macd_signal = TechnicalIndicators.calculate_macd(prices)
+        macd_series = kernels.MACDSeries(values['macd'], values['macd_signal'], values['macd_hist'])
+        macd_values, macd_signal = TechnicalIndicators._macd_reading(macd_series) if bars >= 35 \
+            else ({"macd": 0, "signal": 0, "histogram": 0}, SignalStrength.NEUTRAL)
         results['macd'] = IndicatorResult(
             name='MACD (12,26,9)',
             value=macd_values['histogram'],
@@ -263,7 +257,8 @@ class TechnicalIndicators:
         )
         
         # Bollinger Bands
-        bb_values, bb_signal = TechnicalIndicators.calculate_bollinger_bands(prices)
+        bb_values, bb_signal = TechnicalIndicators._bollinger_reading(values['bollinger']) if bars >= 20 \
+            else ({"upper": 0, "middle": 0, "lower": 0, "width": 0}, SignalStrength.NEUTRAL)
         results['bollinger'] = IndicatorResult(
             name='Bollinger Bands (20,2)',
             value=bb_values.get('position', 0.5),
@@ -272,8 +267,8 @@ class TechnicalIndicators:
         )
         
         # Moving Averages
-        sma_20 = TechnicalIndicators.calculate_sma(prices, 20)
-        sma_50 = TechnicalIndicators.calculate_sma(prices, 50)
+        sma_20 = kernels.last_value(values['sma_20']) if bars >= 20 else (np.mean(prices) if prices else 0)
+        sma_50 = kernels.last_value(values['sma_50']) if bars >= 50 else (np.mean(prices) if prices else 0)
         current_price = prices[-1] if prices else 0
         
         ma_signal = SignalStrength.BUY if current_price > sma_20 > sma_50 else \
@@ -0,0 +1,124 @@
+"""
+VN30-Quantum AI Engine - Kernel Benchmark
+Wall time of the recursive indicator kernels per backend on long series
+
+Backends, fastest first when available:
+    numba    compiled loops (kernels.NUMBA_AVAILABLE)
+    scipy    lfilter for EMA / RSI (the SAR runs as without it)
+    numpy    no optional dependency: closed-form blocks, SAR stepped over
+             time for tall panels and looped in Python for narrow ones
+    loop     one bar at a time in Python (kernel_check references)
+
+Numba compile time is reported separately (first call, cached on disk
+after that). Every backend's output is checked against the first one.
+
+Usage:
+    python -m ai_engine.kernel_bench                    # 1M bars, one symbol
+    python -m ai_engine.kernel_bench --bars 200000 --rows 30
+    python -m ai_engine.kernel_bench --no-loop          # skip the interpreted baseline
+"""
+import argparse
+import sys
+import time
+from typing import Callable, Dict, List
+
+import numpy as np
+
+from . import kernels
+from .kernel_check import _close, _with_backends, ref_ema, ref_rsi, ref_sar
+
+
+def synthetic_bars(rows: int, bars: int, seed: int = 23):
+    """Random-walk closes with a high/low range around them"""
+    rng = np.random.default_rng(seed)
+    close = 20000 * np.exp(np.cumsum(rng.normal(0, 0.001, (rows, bars)), axis=1))
+    spread = rng.uniform(0, 0.002, (rows, bars))
+    return close, close * (1 + spread), close * (1 - spread)
+
+
+def _timed(function: Callable, repeat: int):
+    """
+    (best ms of up to `repeat` runs, result); a run over a second is not
+    repeated. Numba compiles in compile_ms() first, so timed runs never include it
+    """
+    result = None
+    best = float('inf')
+    for _ in range(max(1, repeat)):
+        started = time.perf_counter()
+        result = function()
+        best = min(best, time.perf_counter() - started)
+        if best > 1.0:
+            break
+    return best * 1000, result
+
+
+def run(rows: int, bars: int, repeat: int = 3, loop: bool = True) -> Dict[str, Dict[str, float]]:
+    """{indicator: {backend: ms}}; raises if a backend disagrees with the fastest one"""
+    close, high, low = synthetic_bars(rows, bars)
+    indicators = {
+        'ema': (lambda: kernels.ema(close, 26),
+                lambda: [ref_ema(list(row), 26) for row in close]),
+        'rsi': (lambda: kernels.rsi(close, 14),
+                lambda: [ref_rsi(list(row), 14) for row in close]),
+        'macd': (lambda: kernels.macd(close).macd, None),
+        'sar': (lambda: kernels.parabolic_sar(high, low).sar,
+                lambda: [ref_sar(list(h), list(l), 0.02, 0.2)[0] for h, l in zip(high, low)]),
+    }
+    backends = [name for name, available in (
+        ('numba', kernels.NUMBA_AVAILABLE), ('scipy', kernels.SCIPY_AVAILABLE), ('numpy', True),
+    ) if available]
+
+    timings: Dict[str, Dict[str, float]] = {}
+    for indicator, (vectorized, reference) in indicators.items():
+        timings[indicator] = {}
+        expected = None
+        for backend in backends:
+            ms, result = _with_backends(backend == 'numba', backend == 'scipy',
+                                        lambda: _timed(vectorized, repeat))
+            if expected is None:
+                expected = result
+            elif not _close(result, expected, 1e-7):
+                raise AssertionError(f"{indicator}: {backend} disagrees with {backends[0]}")
+            timings[indicator][backend] = ms
+        if loop and reference is not None:
+            timings[indicator]['loop'], _ = _timed(reference, 1)
+    return timings
+
+
+def compile_ms() -> float:
+    """Time to get every compiled kernel ready in a fresh process (0 without Numba)"""
+    if not kernels.NUMBA_AVAILABLE:
+        return 0.0
+    close, high, low = synthetic_bars(2, 40)
+    started = time.perf_counter()
+    kernels.ema(close, 26)
+    kernels.rsi(close, 14)
+    kernels.parabolic_sar(high, low)
+    return (time.perf_counter() - started) * 1000
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Recursive indicator kernel benchmark")
+    parser.add_argument('--bars', type=int, default=1_000_000, help="bars per symbol")
+    parser.add_argument('--rows', type=int, default=1, help="symbols in the panel")
+    parser.add_argument('--repeat', type=int, default=3, help="timed runs per backend (best is kept)")
+    parser.add_argument('--no-loop', action='store_true', help="skip the one-bar-at-a-time Python baseline")
+    args = parser.parse_args(argv)
+
+    startup = compile_ms()
+    timings = run(args.rows, args.bars, args.repeat, loop=not args.no_loop)
+    backends: List[str] = list(dict.fromkeys(b for row in timings.values() for b in row))
+
+    print(f"{args.rows} × {args.bars:,} bars · best of {args.repeat} · ms")
+    if kernels.NUMBA_AVAILABLE:
+        print(f"Numba ready in {startup:.0f} ms (compile or disk cache)")
+    print(f"\n{'kernel':<8}" + ''.join(f"{b:>10}" for b in backends) + f"{'speedup':>10}")
+    for indicator, row in timings.items():
+        cells = ''.join(f"{row[b]:>10.1f}" if b in row else f"{'-':>10}" for b in backends)
+        baseline = row.get('loop', row['numpy'])
+        print(f"{indicator:<8}{cells}{baseline / min(row.values()):>9.1f}x")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
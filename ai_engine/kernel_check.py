@@ -0,0 +1,427 @@
+"""
+VN30-Quantum AI Engine - Kernel Accuracy Check
+Compares ai_engine.kernels (and ai_engine.trend / forecasters / streaming / indicator_graph / bar_ring) against closed-form values, plain-loop reference
+implementations, pandas and the `ta` library (when installed), and every
+kernel backend (Numba / scipy / NumPy) against the others
+
+Usage:
+    python -m ai_engine.kernel_check
+"""
+import math
+import os
+import sys
+import tempfile
+from typing import Callable, List, Tuple
+
+import numpy as np
+
+from . import forecasters, kernels, trend
+from .bar_ring import BAR_DTYPE, BarRing
+from .indicator_graph import IndicatorGraph
+from .indicators import TechnicalIndicators
+from .streaming import IndicatorState
+
+TOLERANCE = 1e-9
+
+# `ta` seeds RSI with the first move (ewm, adjust=False), the kernels with the
+# SMA of the first `period` moves (Wilder). The gap decays by (13/14) per bar:
+# ~2 RSI points at 40 bars, <0.001 from 150 on. RSI is compared from there.
+TA_RSI_WARM_UP = 150
+TA_RSI_TOLERANCE = 0.01
+
+
+# ═══════════════════════════════════════════════════════
+# REFERENCE IMPLEMENTATIONS (one bar at a time, straight from the definitions)
+# ═══════════════════════════════════════════════════════
+def ref_ema(prices: List[float], period: int) -> List[float]:
+    alpha = 2 / (period + 1)
+    out, value = [], None
+    for price in prices:
+        value = price if value is None else alpha * price + (1 - alpha) * value
+        out.append(value)
+    return out
+
+
+def ref_rsi(prices: List[float], period: int) -> List[float]:
+    out = [math.nan] * len(prices)
+    avg_gain = avg_loss = None
+    gains, losses = [], []
+    for i in range(1, len(prices)):
+        delta = prices[i] - prices[i - 1]
+        gain, loss = max(delta, 0.0), max(-delta, 0.0)
+        if avg_gain is None:
+            gains.append(gain)
+            losses.append(loss)
+            if len(gains) < period:
+                continue
+            avg_gain, avg_loss = sum(gains) / period, sum(losses) / period
+        else:
+            avg_gain = (avg_gain * (period - 1) + gain) / period
+            avg_loss = (avg_loss * (period - 1) + loss) / period
+        out[i] = 100.0 if avg_loss == 0 else 100 - 100 / (1 + avg_gain / avg_loss)
+    return out
+
+
+def ref_macd(prices: List[float], fast: int, slow: int, signal: int) -> Tuple[List[float], List[float]]:
+    fast_ema, slow_ema = ref_ema(prices, fast), ref_ema(prices, slow)
+    line = [math.nan if i < slow - 1 else f - s for i, (f, s) in enumerate(zip(fast_ema, slow_ema))]
+    tail = ref_ema(line[slow - 1:], signal) if len(prices) >= slow else []
+    return line, [math.nan] * (len(prices) - len(tail)) + tail
+
+
+def ref_bollinger(prices: List[float], period: int, num_std: float) -> Tuple[List[float], List[float]]:
+    upper, lower = [], []
+    for i in range(len(prices)):
+        if i < period - 1:
+            upper.append(math.nan)
+            lower.append(math.nan)
+            continue
+        window = prices[i - period + 1:i + 1]
+        mean = sum(window) / period
+        std = math.sqrt(sum((x - mean) ** 2 for x in window) / period)
+        upper.append(mean + num_std * std)
+        lower.append(mean - num_std * std)
+    return upper, lower
+
+
+def ref_sar(highs: List[float], lows: List[float], step: float, max_step: float) -> Tuple[List[float], List[float]]:
+    sar, direction = [math.nan] * len(highs), [math.nan] * len(highs)
+    if len(highs) < 2:
+        return sar, direction
+    long = highs[1] + lows[1] >= highs[0] + lows[0]
+    stop, extreme, factor = (lows[0], highs[0], step) if long else (highs[0], lows[0], step)
+    for i in range(1, len(highs)):
+        stop += factor * (extreme - stop)
+        if long:
+            stop = min([stop] + lows[max(0, i - 2):i])
+            if lows[i] < stop:
+                long, stop, extreme, factor = False, extreme, lows[i], step
+            elif highs[i] > extreme:
+                extreme, factor = highs[i], min(factor + step, max_step)
+        else:
+            stop = max([stop] + highs[max(0, i - 2):i])
+            if highs[i] > stop:
+                long, stop, extreme, factor = True, extreme, highs[i], step
+            elif lows[i] < extreme:
+                extreme, factor = lows[i], min(factor + step, max_step)
+        sar[i], direction[i] = stop, 1.0 if long else -1.0
+    return sar, direction
+
+
+# ═══════════════════════════════════════════════════════
+# CHECKS
+# ═══════════════════════════════════════════════════════
+def _close(actual, expected, tolerance: float = TOLERANCE) -> bool:
+    actual, expected = np.asarray(actual, dtype=float), np.asarray(expected, dtype=float)
+    if actual.shape != expected.shape or not np.array_equal(np.isnan(actual), np.isnan(expected)):
+        return False
+    valid = ~np.isnan(expected)
+    scale = np.maximum(1.0, np.abs(expected[valid]))
+    return bool(np.all(np.abs(actual[valid] - expected[valid]) <= tolerance * scale))
+
+
+def _random_panel(rows: int = 12, length: int = 400, seed: int = 7) -> Tuple[np.ndarray, List[np.ndarray]]:
+    """Random-walk closes with ragged history lengths (right-aligned)"""
+    rng = np.random.default_rng(seed)
+    series = [
+        20000 * np.exp(np.cumsum(rng.normal(0, 0.01, rng.integers(1, length + 1))))
+        for _ in range(rows)
+    ]
+    series[0] = np.full(60, 25000.0)  # giá đứng yên
+    return kernels.align_right(series, length), series
+
+
+def check_closed_form() -> bool:
+    """Values that follow directly from the definitions"""
+    ramp = np.arange(200, dtype=float)
+    alpha = 2 / 11
+    lag = (1 - alpha) / alpha * (1 - (1 - alpha) ** ramp)
+    up, down = np.arange(1.0, 41.0), np.arange(40.0, 0.0, -1.0)
+    alternating = 100 + np.where(np.arange(40) % 2 == 0, 1.0, -1.0)
+    bands = kernels.bollinger(alternating, 20)
+    flat = kernels.macd(np.full(60, 50.0))
+    return all((
+        _close(kernels.ema(ramp, 10), ramp - lag),
+        _close(kernels.rsi(up, 14)[14:], np.full(26, 100.0)),
+        _close(kernels.rsi(down, 14)[14:], np.zeros(26)),
+        _close(bands.upper[19:], np.full(21, 102.0)),
+        _close(bands.lower[19:], np.full(21, 98.0)),
+        _close(flat.histogram[33:], np.zeros(27)),
+    ))
+
+
+def check_reference() -> bool:
+    """Panel results row by row against the loop implementations"""
+    panel, series = _random_panel()
+    rsi, macd, bands = kernels.rsi(panel, 14), kernels.macd(panel), kernels.bollinger(panel, 20)
+    ema = kernels.ema(panel, 12)
+    length = panel.shape[1]
+
+    def pad(values):
+        return [math.nan] * (length - len(values)) + list(values)
+
+    for row, prices in enumerate(series):
+        prices = list(prices)
+        line, signal = ref_macd(prices, 12, 26, 9)
+        upper, lower = ref_bollinger(prices, 20, 2.0)
+        if not all((
+            _close(ema[row], pad(ref_ema(prices, 12))),
+            _close(rsi[row], pad(ref_rsi(prices, 14))),
+            _close(macd.macd[row], pad(line)),
+            _close(macd.signal[row], pad(signal)),
+            _close(bands.upper[row], pad(upper)),
+            _close(bands.lower[row], pad(lower)),
+        )):
+            return False
+    return True
+
+
+def _with_backends(numba: bool, scipy: bool, compute: Callable[[], tuple]) -> tuple:
+    saved = kernels.NUMBA_AVAILABLE, kernels.SCIPY_AVAILABLE
+    kernels.NUMBA_AVAILABLE, kernels.SCIPY_AVAILABLE = numba and saved[0], scipy and saved[1]
+    try:
+        return compute()
+    finally:
+        kernels.NUMBA_AVAILABLE, kernels.SCIPY_AVAILABLE = saved
+
+
+def check_backends() -> bool:
+    """Numba loops, scipy lfilter and the NumPy fallbacks must agree"""
+    panel, _ = _random_panel(length=2000, seed=11)
+    rng = np.random.default_rng(11)
+    high = panel * (1 + rng.uniform(0, 0.01, panel.shape))
+    low = panel * (1 - rng.uniform(0, 0.01, panel.shape))
+
+    def compute():
+        return (kernels.ema(panel, 26), kernels.rsi(panel, 14), *kernels.parabolic_sar(high, low),
+                *kernels.parabolic_sar(np.tile(high, (3, 1)), np.tile(low, (3, 1))))
+
+    numpy_only = _with_backends(False, False, compute)
+    others = [_with_backends(numba, scipy, compute) for numba, scipy in ((True, False), (False, True))]
+    return all(_close(a, b) for result in others for a, b in zip(result, numpy_only))
+
+
+def check_sar() -> bool:
+    """Parabolic SAR (every kernel) against the loop reference, row by row"""
+    panel, series = _random_panel(length=300, seed=19)
+    rng = np.random.default_rng(19)
+    spread = rng.uniform(0, 0.01, panel.shape)
+    high, low = panel * (1 + spread), panel * (1 - spread)
+    length = panel.shape[1]
+    default = kernels.SAR_STEP_ROWS
+    # compiled loop, Python loop, NumPy stepping
+    for numba, step_rows in ((True, default), (False, default), (False, 0)):
+        kernels.SAR_STEP_ROWS = step_rows
+        try:
+            sar, direction = _with_backends(numba, True, lambda: kernels.parabolic_sar(high, low))
+        finally:
+            kernels.SAR_STEP_ROWS = default
+        for row, prices in enumerate(series):
+            offset = length - len(prices)
+            ref, ref_direction = ref_sar(list(high[row, offset:]), list(low[row, offset:]), 0.02, 0.2)
+            if not (_close(sar[row, offset:], ref) and _close(direction[row, offset:], ref_direction)):
+                return False
+            if not np.isnan(sar[row, :offset]).all():
+                return False
+    return True
+
+
+def check_pandas() -> bool:
+    """EMA and Bollinger against pandas ewm / rolling"""
+    try:
+        import pandas as pd
+    except ImportError:
+        return True
+    _, series = _random_panel(rows=1, length=300, seed=3)
+    closes = pd.Series(series[0])
+    rolling = closes.rolling(20)
+    mean, std = rolling.mean(), rolling.std(ddof=0)
+    bands = kernels.bollinger(closes.to_numpy(), 20)
+    return all((
+        _close(kernels.ema(closes.to_numpy(), 12), closes.ewm(span=12, adjust=False).mean()),
+        _close(bands.upper, mean + 2 * std, 1e-7),
+        _close(bands.lower, mean - 2 * std, 1e-7),
+    ))
+
+
+def check_ta() -> bool:
+    """RSI (after TA_RSI_WARM_UP bars), MACD and Bollinger against the `ta` library"""
+    try:
+        import pandas as pd
+        from ta.momentum import RSIIndicator
+        from ta.trend import MACD
+        from ta.volatility import BollingerBands
+    except ImportError:
+        return True
+    rng = np.random.default_rng(19)
+    for _ in range(5):
+        closes = 20000 * np.exp(np.cumsum(rng.normal(0, 0.01, 400)))
+        series = pd.Series(closes)
+        rsi = kernels.rsi(closes, 14)[TA_RSI_WARM_UP:]
+        expected_rsi = RSIIndicator(series, 14).rsi().to_numpy()[TA_RSI_WARM_UP:]
+        if not np.all(np.abs(rsi - expected_rsi) <= TA_RSI_TOLERANCE):
+            return False
+        macd, expected = kernels.macd(closes, 12, 26, 9), MACD(series, 26, 12, 9)
+        # ta's signal line waits for 9 MACD values, the kernels' starts at the first
+        signal, expected_signal = macd.signal.copy(), expected.macd_signal().to_numpy()
+        signal[np.isnan(expected_signal)] = np.nan
+        bands, expected_bands = kernels.bollinger(closes, 20, 2.0), BollingerBands(series, 20, 2)
+        if not all((
+            _close(macd.macd, expected.macd().to_numpy()),
+            _close(signal, expected_signal),
+            _close(bands.upper, expected_bands.bollinger_hband().to_numpy(), 1e-7),
+            _close(bands.lower, expected_bands.bollinger_lband().to_numpy(), 1e-7),
+        )):
+            return False
+    return True
+
+
+def check_bar_ring() -> bool:
+    """A slot left odd by a writer killed mid-append reads again once the ring is reopened"""
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'bars.ring')
+        ring = BarRing.create(path, ['AAA', 'BBB'], capacity=8)
+        bars = np.zeros(3, dtype=BAR_DTYPE)
+        bars['time'] = [60, 120, 180]
+        bars['close'] = [1.0, 2.0, 3.0]
+        ring.append('AAA', bars)
+        ring.append('BBB', bars)
+        ring.slots['seq'][0] += 1  # bị kill giữa hai lần tăng seq
+        if ring.latest('AAA') is not None:
+            return False
+        ring.close()
+
+        ring = BarRing.create(path, ['AAA', 'BBB'], capacity=8)
+        latest = ring.latest('AAA')
+        if latest is None or list(latest['close']) != [1.0, 2.0, 3.0]:
+            return False
+        bars['time'] += 180
+        return ring.append('AAA', bars) == 3 and len(ring.latest('AAA')) == 6 \
+            and not (ring.slots['seq'] % 2).any() and len(ring.latest('BBB')) == 3
+
+
+def check_trend() -> bool:
+    """Closed-form trend vs np.polyfit, batch vs rolling vs incremental"""
+    panel, series = _random_panel(length=120, seed=5)
+    model = trend.LinearTrend(30)
+    fit = model.fit(panel)
+    for row, prices in enumerate(series):
+        if len(prices) < 30:
+            if not np.isnan(fit.forecast[row]):
+                return False
+            continue
+        slope, intercept = np.polyfit(np.arange(30), prices[-30:], 1)
+        if not all((
+            _close(fit.slope[row], slope, 1e-7),
+            _close(fit.intercept[row], intercept, 1e-7),
+            _close(fit.forecast[row], intercept + slope * 30, 1e-7),
+        )):
+            return False
+
+    state = trend.TrendState(len(series), 30)
+    state.seed(panel)
+    return all((
+        _close(model.rolling(panel).forecast[:, -1], fit.forecast),
+        _close(state.fit().forecast, fit.forecast),
+    ))
+
+
+def check_streaming() -> bool:
+    """O(1)-per-bar IndicatorState readings against the full-series kernels"""
+    _, series = _random_panel(length=300, seed=13)
+    for prices in series:
+        if len(prices) < 30:
+            continue
+        state = IndicatorState()
+        for t, price in enumerate(prices):
+            state.update(t, price, price, price, price)
+        values = state.values()
+        macd, bands = kernels.macd(prices), kernels.bollinger(prices, 20)
+        if not all((
+            _close(values.rsi, kernels.last_value(kernels.rsi(prices, 14))),
+            _close(values.macd, kernels.last_value(macd.macd)),
+            _close(values.macd_signal, kernels.last_value(macd.signal)),
+            # tổng bình phương chạy -> sai số lớn hơn so với std trực tiếp
+            _close(values.bb_upper, kernels.last_value(bands.upper), 1e-7),
+            _close(values.bb_lower, kernels.last_value(bands.lower), 1e-7),
+        )):
+            return False
+    return True
+
+
+def check_forecasters() -> bool:
+    """Every registered forecaster: one value per row, NaN rows stay NaN, flat prices stay flat"""
+    panel, series = _random_panel(length=120, seed=17)
+    ragged = np.array([len(s) < 60 for s in series])
+    for name in forecasters.available():
+        model = forecasters.create(name, window=60)
+        predictions = model.predict(panel)
+        if predictions.shape != (len(series),) or not np.array_equal(np.isnan(predictions), ragged):
+            return False
+        if not _close(model.predict(np.full(80, 25000.0)), 25000.0, 1e-9):
+            return False
+    return _close(forecasters.create('ols', window=30).predict(panel), trend.LinearTrend(30).forecast(panel))
+
+
+def check_graph() -> bool:
+    """Indicator graph: one node per distinct computation, same numbers as the kernels"""
+    panel, series = _random_panel(length=200, seed=29)
+    graph = IndicatorGraph(['rsi(14)', 'macd_hist', 'macd_signal(12, 26, 9)', 'bb_position(20, 2)',
+                            'bb_upper', 'sma(20)', 'sma(50)', 'ema(26)'])
+    # ema(26) / sma(20) are the nodes MACD / Bollinger use, not extra ones
+    if len(set(graph.steps)) != len(graph.steps) or len(graph.steps) != 15:
+        return False
+    values = graph.evaluate(close=panel)
+    macd, bands = kernels.macd(panel), kernels.bollinger(panel, 20)
+    if not all(np.array_equal(a, b, equal_nan=True) for a, b in (
+        (values['rsi(14)'], kernels.rsi(panel, 14)),
+        (values['macd_hist'], macd.histogram),
+        (values['macd_signal(12, 26, 9)'], macd.signal),
+        (values['bb_position(20, 2)'], bands.position),
+        (values['bb_upper'], bands.upper),
+        (values['sma(50)'], kernels.sma(panel, 50)),
+        (values['ema(26)'], kernels.ema(panel, 26)),
+    )):
+        return False
+
+    # calculate_all_indicators (one graph evaluation) == the individual calculate_* calls
+    for prices in series:
+        prices = list(prices)
+        results = TechnicalIndicators.calculate_all_indicators(prices)
+        if (results['rsi'].value, results['rsi'].signal) != TechnicalIndicators.calculate_rsi(prices):
+            return False
+        macd_values, macd_signal = TechnicalIndicators.calculate_macd(prices)
+        if (results['macd'].value, results['macd'].signal) != (macd_values['histogram'], macd_signal):
+            return False
+        bb_values, bb_signal = TechnicalIndicators.calculate_bollinger_bands(prices)
+        if (results['bollinger'].value, results['bollinger'].signal) != (bb_values.get('position', 0.5), bb_signal):
+            return False
+    return True
+
+
+CHECKS: List[Tuple[str, Callable[[], bool]]] = [
+    ("Closed-form values", check_closed_form),
+    ("Loop reference (ragged panel)", check_reference),
+    ("Numba / scipy / NumPy backend parity", check_backends),
+    ("Parabolic SAR loop reference", check_sar),
+    ("pandas ewm / rolling", check_pandas),
+    (f"ta library (RSI from bar {TA_RSI_WARM_UP})", check_ta),
+    ("Bar ring recovery after a killed writer", check_bar_ring),
+    ("Linear trend (batch / rolling / incremental)", check_trend),
+    ("Streaming state vs kernels", check_streaming),
+    ("Forecaster registry", check_forecasters),
+    ("Indicator graph (shared nodes)", check_graph),
+]
+
+
+def main() -> int:
+    failed = 0
+    for name, check in CHECKS:
+        ok = check()
+        failed += not ok
+        print(f"{'✅' if ok else '❌'} {name}")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
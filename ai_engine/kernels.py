@@ -0,0 +1,429 @@
+"""
+VN30-Quantum AI Engine - Indicator Kernels
+Vectorized EMA / RSI / MACD / Bollinger series over (symbols × time) panels
+
+Shared by ai_engine.indicators, hunter/signal_agent.py and analyst/main.py,
+so every service reads the same number for the same bars.
+
+Conventions (identical to ai_engine/streaming.py):
+- Input is a 1D series or a 2D panel, one row per symbol, oldest bar first.
+  Rows of different length are right-aligned with leading NaN padding
+  (see `align_right`); gaps inside a row must be filled by the caller.
+- EMA: alpha = 2 / (period + 1), seeded with the first close (pandas
+  `ewm(adjust=False)`).
+- RSI: Wilder - simple mean of the first `period` moves, then
+  avg = (avg * (period - 1) + x) / period.
+- MACD: EMA(fast) - EMA(slow) from the `slow`-th bar; the signal line is an
+  EMA of the MACD line seeded at its first value.
+- Bollinger: rolling mean ± num_std × population std.
+- Parabolic SAR: Wilder, acceleration `step` up to `max_step`; the first
+  bar's direction follows the second bar's midpoint.
+Outputs have the input's shape and are NaN until the indicator is warmed up.
+
+Recursions run as Numba-compiled loops when numba is installed, otherwise
+through scipy `lfilter` / NumPy (`python -m ai_engine.kernel_bench` times
+them; `kernel_check` holds every backend to the same numbers).
+"""
+import math
+from typing import Dict, NamedTuple, Sequence, Tuple
+
+import numpy as np
+
+try:
+    from scipy.signal import lfilter
+    SCIPY_AVAILABLE = True
+except ImportError:
+    SCIPY_AVAILABLE = False
+
+try:
+    import numba
+    NUMBA_AVAILABLE = not numba.config.DISABLE_JIT
+except ImportError:
+    numba = None
+    NUMBA_AVAILABLE = False
+
+
+# Without Numba: step panels at least this tall over time with NumPy, loop over smaller ones
+SAR_STEP_ROWS = 32
+
+
+def _jit(function):
+    """Numba-compile when installed (cached on disk, GIL released); the Python version stays as `.py_func`"""
+    if numba is None:
+        return function
+    return numba.njit(cache=True, nogil=True)(function)
+
+
+class MACDSeries(NamedTuple):
+    macd: np.ndarray
+    signal: np.ndarray
+    histogram: np.ndarray
+
+
+class BollingerSeries(NamedTuple):
+    upper: np.ndarray
+    middle: np.ndarray
+    lower: np.ndarray
+    width: np.ndarray      # (upper - lower) / middle × 100
+    position: np.ndarray   # 0 = lower band, 1 = upper band (clamped)
+
+
+class SARSeries(NamedTuple):
+    sar: np.ndarray        # trailing stop level
+    direction: np.ndarray  # 1 = long (stop below price), -1 = short
+
+
+# ═══════════════════════════════════════════════════════
+# PANEL HELPERS
+# ═══════════════════════════════════════════════════════
+def as_panel(values) -> np.ndarray:
+    """float64 2D view of a series (1 row) or panel"""
+    panel = np.asarray(values, dtype=float)
+    if panel.ndim == 1:
+        return panel[np.newaxis, :]
+    if panel.ndim != 2:
+        raise ValueError(f"Expected a 1D series or 2D panel, got {panel.ndim} dimensions")
+    return panel
+
+
+def _like_input(values, panel: np.ndarray) -> np.ndarray:
+    return panel[0] if np.ndim(values) == 1 else panel
+
+
+def align_right(series: Sequence[Sequence[float]], length: int = 0) -> np.ndarray:
+    """Stack series of different lengths into a panel, newest bars aligned on the right"""
+    length = length or max((len(s) for s in series), default=0)
+    panel = np.full((len(series), length), np.nan)
+    for row, values in enumerate(series):
+        values = np.asarray(values, dtype=float)[-length:] if length else []
+        if len(values):
+            panel[row, length - len(values):] = values
+    return panel
+
+
+def first_valid(panel: np.ndarray) -> np.ndarray:
+    """Column of each row's first non-NaN value (row length if none)"""
+    if panel.shape[1] == 0:
+        return np.zeros(panel.shape[0], dtype=np.int64)
+    valid = ~np.isnan(panel)
+    return np.where(valid.any(axis=1), valid.argmax(axis=1), panel.shape[1])
+
+
+def last_value(series, default: float = math.nan) -> np.ndarray:
+    """Newest value of each row (scalar for a 1D series); NaN -> default"""
+    panel = as_panel(series)
+    if panel.shape[1] == 0:
+        last = np.full(panel.shape[0], default)
+    else:
+        last = np.where(np.isnan(panel[:, -1]), default, panel[:, -1])
+    return float(last[0]) if np.ndim(series) == 1 else last
+
+
+# ═══════════════════════════════════════════════════════
+# RECURSIVE FILTER
+# ═══════════════════════════════════════════════════════
+def _recursive(panel: np.ndarray, alpha: float, start: np.ndarray) -> np.ndarray:
+    """
+    y[t] = alpha * x[t] + (1 - alpha) * y[t - 1], with y[start] = x[start]
+
+    Columns before `start` are held at the seed while filtering (so the
+    recursion sees a constant) and set to NaN afterwards.
+    """
+    rows, length = panel.shape
+    out = np.full((rows, length), np.nan)
+    live = start < length
+    if length == 0 or not live.any():
+        return out
+
+    x = panel[live]
+    seed_at = start[live]
+    seed = x[np.arange(len(x)), seed_at]
+    columns = np.arange(length)
+    x = np.where(columns < seed_at[:, None], seed[:, None], x)
+
+    decay = 1.0 - alpha
+    if NUMBA_AVAILABLE:
+        y = _recursive_rows(x, alpha, seed)
+    elif SCIPY_AVAILABLE:
+        y, _ = lfilter([alpha], [1.0, -decay], x, axis=1, zi=(decay * seed)[:, None])
+    else:
+        y = _recursive_blocks(x, alpha, seed)
+
+    out[live] = np.where(columns < seed_at[:, None], np.nan, y)
+    return out
+
+
+def _recursive_blocks(x: np.ndarray, alpha: float, seed: np.ndarray) -> np.ndarray:
+    """
+    NumPy-only evaluation of the same filter in closed form, block by block:
+    y[k] = decay^k * (decay * y_prev + alpha * cumsum(x[j] * decay^-j))
+    Blocks are sized so decay^-k stays far from overflow.
+    """
+    decay = 1.0 - alpha
+    y = np.empty_like(x)
+    if decay <= 0.0:
+        y[:] = x
+        return y
+    block = max(1, min(x.shape[1], int(200 / -math.log(decay))))
+    powers = decay ** np.arange(block)
+    state = seed.copy()
+    for begin in range(0, x.shape[1], block):
+        chunk = x[:, begin:begin + block]
+        width = chunk.shape[1]
+        scaled = np.cumsum(chunk * (alpha / powers[:width]), axis=1)
+        y[:, begin:begin + width] = powers[:width] * (decay * state[:, None] + scaled)
+        state = y[:, begin + width - 1]
+    return y
+
+
+@_jit
+def _recursive_rows(x, alpha, seed):
+    """The same filter as a plain loop per row (compiled by Numba)"""
+    decay = 1.0 - alpha
+    y = np.empty_like(x)
+    for row in range(x.shape[0]):
+        value = seed[row]
+        for t in range(x.shape[1]):
+            value = alpha * x[row, t] + decay * value
+            y[row, t] = value
+    return y
+
+
+# ═══════════════════════════════════════════════════════
+# TRAILING STOP (branching recursion - no closed form)
+# ═══════════════════════════════════════════════════════
+@_jit
+def _sar_rows(high, low, start, step, max_step):
+    """Parabolic SAR one row at a time (compiled by Numba)"""
+    rows, length = high.shape
+    sar = np.full((rows, length), np.nan)
+    direction = np.full((rows, length), np.nan)
+    for row in range(rows):
+        first = start[row]
+        if first + 1 >= length:
+            continue
+        long = high[row, first + 1] + low[row, first + 1] >= high[row, first] + low[row, first]
+        stop = low[row, first] if long else high[row, first]
+        extreme = high[row, first] if long else low[row, first]
+        factor = step
+        for t in range(first + 1, length):
+            stop += factor * (extreme - stop)
+            if long:
+                # Không được vượt qua đáy của 2 nến trước
+                stop = min(stop, low[row, t - 1])
+                if t - 2 >= first:
+                    stop = min(stop, low[row, t - 2])
+                if low[row, t] < stop:
+                    long, stop, extreme, factor = False, extreme, low[row, t], step
+                elif high[row, t] > extreme:
+                    extreme, factor = high[row, t], min(factor + step, max_step)
+            else:
+                stop = max(stop, high[row, t - 1])
+                if t - 2 >= first:
+                    stop = max(stop, high[row, t - 2])
+                if high[row, t] > stop:
+                    long, stop, extreme, factor = True, extreme, high[row, t], step
+                elif low[row, t] < extreme:
+                    extreme, factor = low[row, t], min(factor + step, max_step)
+            sar[row, t] = stop
+            direction[row, t] = 1.0 if long else -1.0
+    return sar, direction
+
+
+def _sar_panel(high, low, start, step, max_step):
+    """
+    NumPy fallback: the same recursion stepped over time for all rows at once.
+    Each step costs a few dozen array ops, so below SAR_STEP_ROWS rows the
+    plain loop (`_sar_rows.py_func`) is faster.
+    """
+    rows, length = high.shape
+    sar = np.full((rows, length), np.nan)
+    direction = np.full((rows, length), np.nan)
+    live = start + 1 < length
+    if not live.any():
+        return sar, direction
+
+    index = np.arange(rows)
+    first = np.minimum(start, length - 2)
+    long = high[index, first + 1] + low[index, first + 1] >= high[index, first] + low[index, first]
+    stop = np.where(long, low[index, first], high[index, first])
+    extreme = np.where(long, high[index, first], low[index, first])
+    factor = np.full(rows, step)
+    for t in range(int(start[live].min()) + 1, length):
+        active = live & (t > start)
+        two_back = t - 2 >= start
+        floor = np.where(two_back, np.minimum(low[:, t - 1], low[:, t - 2]), low[:, t - 1])
+        ceiling = np.where(two_back, np.maximum(high[:, t - 1], high[:, t - 2]), high[:, t - 1])
+        candidate = stop + factor * (extreme - stop)
+        candidate = np.where(long, np.minimum(candidate, floor), np.maximum(candidate, ceiling))
+        flip = np.where(long, low[:, t] < candidate, high[:, t] > candidate)
+        further = ~flip & np.where(long, high[:, t] > extreme, low[:, t] < extreme)
+
+        new_stop = np.where(flip, extreme, candidate)
+        new_extreme = np.where(flip, np.where(long, low[:, t], high[:, t]),
+                               np.where(further, np.where(long, high[:, t], low[:, t]), extreme))
+        new_factor = np.where(flip, step, np.where(further, np.minimum(factor + step, max_step), factor))
+        stop = np.where(active, new_stop, stop)
+        extreme = np.where(active, new_extreme, extreme)
+        factor = np.where(active, new_factor, factor)
+        long = np.where(active, long ^ flip, long)
+        sar[active, t] = stop[active]
+        direction[active, t] = np.where(long[active], 1.0, -1.0)
+    return sar, direction
+
+
+# ═══════════════════════════════════════════════════════
+# BUILDING BLOCKS (shared with ai_engine.indicator_graph)
+# ═══════════════════════════════════════════════════════
+def _ema(panel: np.ndarray, period: int) -> np.ndarray:
+    return _recursive(panel, 2.0 / (period + 1), first_valid(panel))
+
+
+def _moves(panel: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Gains and losses bar to bar (one column shorter, NaN where a close is missing)"""
+    deltas = np.diff(panel, axis=1)
+    gains = np.where(deltas > 0, deltas, 0.0)
+    losses = np.where(deltas < 0, -deltas, 0.0)
+    gains[np.isnan(deltas)] = np.nan
+    losses[np.isnan(deltas)] = np.nan
+    return gains, losses
+
+
+def _wilder(moves: np.ndarray, period: int) -> np.ndarray:
+    """Wilder average: simple mean of the first `period` values, then alpha = 1 / period"""
+    # Vị trí seed: biến động thứ `period` của mỗi dòng, giá trị = trung bình đơn giản
+    start = first_valid(moves)
+    seed_at = start + period - 1
+    live = seed_at < moves.shape[1]
+    index = np.arange(len(moves))[live]
+    seed_at_live = seed_at[live]
+    window = seed_at_live[:, None] - np.arange(period)[::-1]
+    seeded = moves.copy()
+    seeded[index, seed_at_live] = moves[index[:, None], window].mean(axis=1)
+    return _recursive(seeded, 1.0 / period, np.where(live, seed_at, moves.shape[1]))
+
+
+def _rsi_from_averages(avg_gain: np.ndarray, avg_loss: np.ndarray) -> np.ndarray:
+    """RSI on the close grid (first column NaN) from Wilder-averaged gains / losses"""
+    out = np.full((avg_gain.shape[0], avg_gain.shape[1] + 1), np.nan)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        value = 100.0 - 100.0 / (1.0 + avg_gain / avg_loss)
+    out[:, 1:] = np.where((avg_loss == 0) & ~np.isnan(avg_gain), 100.0, value)
+    return out
+
+
+def _macd_line(panel: np.ndarray, fast_ema: np.ndarray, slow_ema: np.ndarray, slow: int) -> np.ndarray:
+    line = fast_ema - slow_ema
+    # Chỉ có MACD từ nến thứ `slow` (EMA chậm mới có ý nghĩa)
+    line[np.arange(panel.shape[1]) < (first_valid(panel) + slow - 1)[:, None]] = np.nan
+    return line
+
+
+def _signal_line(line: np.ndarray, signal: int) -> np.ndarray:
+    return _recursive(line, 2.0 / (signal + 1), first_valid(line))
+
+
+def _rolling_mean(panel: np.ndarray, period: int) -> np.ndarray:
+    out = np.full(panel.shape, np.nan)
+    if panel.shape[1] >= period:
+        windows = np.lib.stride_tricks.sliding_window_view(panel, period, axis=1)
+        out[:, period - 1:] = windows.mean(axis=2)
+    return out
+
+
+def _rolling_std(panel: np.ndarray, period: int, mean: np.ndarray) -> np.ndarray:
+    """Population std over `period` bars around an already computed rolling mean"""
+    out = np.full(panel.shape, np.nan)
+    if panel.shape[1] >= period:
+        windows = np.lib.stride_tricks.sliding_window_view(panel, period, axis=1)
+        spread = windows - mean[:, period - 1:, np.newaxis]
+        out[:, period - 1:] = np.sqrt((spread * spread).mean(axis=2))
+    return out
+
+
+def _bands(panel: np.ndarray, middle: np.ndarray, std: np.ndarray, num_std: float) -> BollingerSeries:
+    upper = middle + num_std * std
+    lower = middle - num_std * std
+    with np.errstate(divide='ignore', invalid='ignore'):
+        width = (upper - lower) / middle * 100
+        position = np.where(upper != lower, (panel - lower) / (upper - lower), 0.5)
+    position = np.where(np.isnan(middle), np.nan, np.clip(position, 0.0, 1.0))
+    return BollingerSeries(upper, middle, lower, width, position)
+
+
+# ═══════════════════════════════════════════════════════
+# INDICATORS
+# ═══════════════════════════════════════════════════════
+def ema(values, period: int) -> np.ndarray:
+    """Exponential moving average seeded with the first value"""
+    return _like_input(values, _ema(as_panel(values), period))
+
+
+def sma(values, period: int) -> np.ndarray:
+    """Simple moving average over `period` bars"""
+    return _like_input(values, _rolling_mean(as_panel(values), period))
+
+
+def rsi(values, period: int = 14) -> np.ndarray:
+    """
+    Wilder RSI; first value at the `period`-th move
+    Seeded with the SMA of the first `period` moves, so short histories read
+    slightly differently from `ta` (ewm seeded with the first move); the two
+    agree within 0.01 from ~150 bars (kernel_check.TA_RSI_WARM_UP)
+    """
+    panel = as_panel(values)
+    if panel.shape[1] <= period:
+        return _like_input(values, np.full(panel.shape, np.nan))
+    gains, losses = _moves(panel)
+    return _like_input(values, _rsi_from_averages(_wilder(gains, period), _wilder(losses, period)))
+
+
+def macd(values, fast: int = 12, slow: int = 26, signal: int = 9) -> MACDSeries:
+    """MACD line, signal line and histogram"""
+    panel = as_panel(values)
+    line = _macd_line(panel, _ema(panel, fast), _ema(panel, slow), slow)
+    signal_line = _signal_line(line, signal)
+    return MACDSeries(*(_like_input(values, s) for s in (line, signal_line, line - signal_line)))
+
+
+def bollinger(values, period: int = 20, num_std: float = 2.0) -> BollingerSeries:
+    """Bollinger Bands with population standard deviation"""
+    panel = as_panel(values)
+    middle = _rolling_mean(panel, period)
+    bands = _bands(panel, middle, _rolling_std(panel, period, middle), num_std)
+    return BollingerSeries(*(_like_input(values, s) for s in bands))
+
+
+def parabolic_sar(high, low, step: float = 0.02, max_step: float = 0.2) -> SARSeries:
+    """Wilder's Parabolic SAR (trailing stop and trend direction); first value at the second bar"""
+    highs, lows = as_panel(high), as_panel(low)
+    if highs.shape != lows.shape:
+        raise ValueError("high and low must have the same shape")
+    start = np.maximum(first_valid(highs), first_valid(lows))
+    if NUMBA_AVAILABLE:
+        kernel = _sar_rows
+    elif highs.shape[0] >= SAR_STEP_ROWS:
+        kernel = _sar_panel
+    else:
+        kernel = getattr(_sar_rows, 'py_func', _sar_rows)
+    sar, direction = kernel(np.ascontiguousarray(highs), np.ascontiguousarray(lows),
+                            start.astype(np.int64), float(step), float(max_step))
+    return SARSeries(_like_input(high, sar), _like_input(high, direction))
+
+
+def indicator_panel(closes, rsi_period: int = 14, bb_period: int = 20,
+                    fast: int = 12, slow: int = 26, signal: int = 9) -> Dict[str, np.ndarray]:
+    """Full RSI / MACD / Bollinger series for a whole panel in one call"""
+    macd_series = macd(closes, fast, slow, signal)
+    bands = bollinger(closes, bb_period)
+    return {
+        'rsi': rsi(closes, rsi_period),
+        'macd': macd_series.macd,
+        'macd_signal': macd_series.signal,
+        'macd_hist': macd_series.histogram,
+        'bb_upper': bands.upper,
+        'bb_middle': bands.middle,
+        'bb_lower': bands.lower,
+        'bb_width': bands.width,
+        'bb_position': bands.position,
+    }
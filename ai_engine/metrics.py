@@ -0,0 +1,51 @@
+"""
+VN30-Quantum AI Engine - Prometheus Metrics
+Buckets, per-service metric families and the /metrics endpoint shared by
+the hunter, the signal agent and the analyst
+
+Every service names its families `<service>_...` with the same buckets
+and labels, so one dashboard query works across services.
+"""
+from typing import Callable
+
+from prometheus_client import Histogram, start_http_server
+
+LATENCY_BUCKETS = (0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+CYCLE_BUCKETS = (0.5, 1, 2.5, 5, 10, 20, 30, 45, 60, 90, 120, 300)
+LAG_BUCKETS = (5, 15, 30, 60, 90, 120, 180, 300, 600, 1800, 3600, 86400)
+
+
+def cycle_histogram(service: str, stages: str) -> Histogram:
+    """`<service>_cycle_duration_seconds` by stage"""
+    return Histogram(f'{service}_cycle_duration_seconds', f'Cycle duration by stage ({stages})',
+                     ['stage'], buckets=CYCLE_BUCKETS)
+
+
+def query_histogram(service: str, label: str) -> Histogram:
+    """`<service>_query_latency_seconds` per `label` (symbol / shard)"""
+    return Histogram(f'{service}_query_latency_seconds', 'InfluxDB price query latency',
+                     [label], buckets=LATENCY_BUCKETS)
+
+
+def data_lag_histogram(service: str) -> Histogram:
+    """`<service>_data_lag_seconds`: wall clock minus the newest bar the service saw"""
+    return Histogram(f'{service}_data_lag_seconds', 'Wall clock minus newest bar time seen',
+                     buckets=LAG_BUCKETS)
+
+
+def event_latency_histogram(service: str, until: str) -> Histogram:
+    """`<service>_event_latency_seconds`: bar event published -> `until`"""
+    return Histogram(f'{service}_event_latency_seconds', f'Bar-written event published -> {until}',
+                     buckets=LATENCY_BUCKETS)
+
+
+def start_metrics_server(port: int, service: str,
+                         info: Callable[[str], None] = print, warning: Callable[[str], None] = print):
+    """Serve /metrics on `port` in a daemon thread (0 disables)"""
+    if port <= 0:
+        return
+    try:
+        start_http_server(port)
+        info(f"📈 [{service}] Prometheus metrics: http://0.0.0.0:{port}/metrics")
+    except OSError as e:
+        warning(f"[{service}] Không mở được cổng metrics {port}: {e}")
@@ -0,0 +1,190 @@
+"""
+VN30-Quantum AI Engine - Parallel Panel Analysis
+Per-symbol arrays packed into one shared-memory block + a process pool that maps over it
+
+Used by hunter/signal_agent.py and analyst/main.py once the universe is
+larger than one core can handle. Tasks carry only (symbol, offset, length)
+tuples and the block name; workers map the block and build NumPy views,
+so bar data is never pickled per task. Only the (small) results come back.
+"""
+import math
+import multiprocessing as mp
+import os
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+# (block name, fields, total bars) - enough for a worker to map the block
+PanelSpec = Tuple[str, Tuple[str, ...], int]
+
+
+def resolve_workers(workers: int) -> int:
+    """0 = one worker per core"""
+    return workers if workers > 0 else (os.cpu_count() or 1)
+
+
+class SharedPanel:
+    """
+    Ragged per-symbol columns in one float64 shared-memory block
+
+    Layout: one row per field, symbols back to back along the row, so
+    `arrays(symbol)` is a set of zero-copy views. The creating process
+    owns the block and must `unlink()` it (the context manager does).
+    """
+
+    def __init__(self, shm: shared_memory.SharedMemory, fields: Sequence[str], total: int,
+                 index: Dict[str, Tuple[int, int]], owner: bool):
+        self.shm = shm
+        self.fields = tuple(fields)
+        self.total = total
+        self.index = index
+        self.owner = owner
+        self.block = np.ndarray((len(self.fields), max(total, 1)), dtype=np.float64, buffer=shm.buf)
+
+    @classmethod
+    def create(cls, data: Dict[str, Dict[str, Any]], fields: Sequence[str]) -> "SharedPanel":
+        index: Dict[str, Tuple[int, int]] = {}
+        offset = 0
+        for symbol, columns in data.items():
+            length = len(columns[fields[0]])
+            index[symbol] = (offset, length)
+            offset += length
+
+        size = max(offset, 1) * len(fields) * 8
+        panel = cls(shared_memory.SharedMemory(create=True, size=size), fields, offset, index, owner=True)
+        for symbol, (start, length) in index.items():
+            for row, field in enumerate(panel.fields):
+                panel.block[row, start:start + length] = data[symbol][field]
+        return panel
+
+    @classmethod
+    def attach(cls, spec: PanelSpec) -> "SharedPanel":
+        name, fields, total = spec
+        # Pool workers share the parent's resource tracker, so the block is unlinked exactly once
+        return cls(shared_memory.SharedMemory(name=name), fields, total, {}, owner=False)
+
+    @property
+    def spec(self) -> PanelSpec:
+        return (self.shm.name, self.fields, self.total)
+
+    def view(self, start: int, length: int) -> Dict[str, np.ndarray]:
+        return {field: self.block[row, start:start + length] for row, field in enumerate(self.fields)}
+
+    def arrays(self, symbol: str) -> Dict[str, np.ndarray]:
+        return self.view(*self.index[symbol])
+
+    def close(self):
+        self.block = None
+        self.shm.close()
+        if self.owner:
+            self.shm.unlink()
+
+    def __enter__(self) -> "SharedPanel":
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+# ═══════════════════════════════════════════════════════
+# WORKER SIDE
+# ═══════════════════════════════════════════════════════
+_attached: Dict[str, SharedPanel] = {}
+
+
+def _worker_panel(spec: PanelSpec) -> SharedPanel:
+    panel = _attached.get(spec[0])
+    if panel is None:
+        # Mỗi cycle một block mới -> bỏ block cũ
+        for old in _attached.values():
+            old.close()
+        _attached.clear()
+        panel = _attached[spec[0]] = SharedPanel.attach(spec)
+    return panel
+
+
+def _ready() -> int:
+    return os.getpid()
+
+
+def _run_chunk(func: Callable, spec: PanelSpec, chunk: List[Tuple[str, int, int]]) -> List[Tuple[str, Any, Optional[str]]]:
+    panel = _worker_panel(spec)
+    results = []
+    for symbol, start, length in chunk:
+        try:
+            results.append((symbol, func(symbol, panel.view(start, length)), None))
+        except Exception as e:
+            results.append((symbol, None, f"{type(e).__name__}: {e}"))
+    return results
+
+
+# ═══════════════════════════════════════════════════════
+# POOL
+# ═══════════════════════════════════════════════════════
+class PanelPool:
+    """
+    Maps `func(symbol, arrays) -> result` over the symbols of a SharedPanel
+
+    `func` must be a module-level function of an importable module (e.g.
+    ai_engine.scoring), not the entry script; workers re-run the entry
+    script's top level, so it must guard its startup. With one worker everything runs
+    in-process (no pool, no copies). Symbols are sent in chunks (default:
+    ~4 chunks per worker) to amortize task overhead. Failures come back as
+    error strings instead of aborting the whole map.
+    """
+
+    def __init__(self, workers: int = 1, chunk_size: int = 0):
+        self.workers = resolve_workers(workers)
+        self.chunk_size = chunk_size
+        self._executor: Optional[ProcessPoolExecutor] = None
+        if self.workers > 1:
+            # Không fork từ process đã có thread (Telegram, metrics, writer flush):
+            # worker fork từ forkserver (không thread) và chạy lại script chính
+            # dưới tên __mp_main__ -> side effect phải nằm trong if __name__ == "__main__"
+            methods = mp.get_all_start_methods()
+            context = mp.get_context('forkserver' if 'forkserver' in methods else 'spawn')
+            self._executor = ProcessPoolExecutor(max_workers=self.workers, mp_context=context)
+            self._warm_up()
+
+    def _warm_up(self):
+        """Start the workers now (create the pool before any thread) instead of on the first map"""
+        for future in [self._executor.submit(_ready) for _ in range(self.workers)]:
+            future.result()
+
+    def map(self, func: Callable, data: Dict[str, Dict[str, Any]],
+            fields: Sequence[str]) -> Tuple[Dict[str, Any], Dict[str, str]]:
+        """Returns ({symbol: result}, {symbol: error})"""
+        results: Dict[str, Any] = {}
+        errors: Dict[str, str] = {}
+        if not data:
+            return results, errors
+
+        if self._executor is None:
+            for symbol, arrays in data.items():
+                try:
+                    results[symbol] = func(symbol, arrays)
+                except Exception as e:
+                    errors[symbol] = f"{type(e).__name__}: {e}"
+            return results, errors
+
+        with SharedPanel.create(data, fields) as panel:
+            tasks = [(symbol, start, length) for symbol, (start, length) in panel.index.items()]
+            size = self.chunk_size or max(1, math.ceil(len(tasks) / (self.workers * 4)))
+            futures = [
+                self._executor.submit(_run_chunk, func, panel.spec, tasks[i:i + size])
+                for i in range(0, len(tasks), size)
+            ]
+            for future in futures:
+                for symbol, result, error in future.result():
+                    if error is None:
+                        results[symbol] = result
+                    else:
+                        errors[symbol] = error
+        return results, errors
+
+    def close(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
@@ -0,0 +1,110 @@
+"""
+VN30-Quantum AI Engine - Oracle Scoring
+RSI / Bollinger / MACD / forecast readings -> signal score for analyst/main.py
+
+Lives in ai_engine (not the analyst script) so analysis pool workers can
+import it without running the analyst's startup code.
+"""
+import math
+from typing import Dict, Optional
+
+import numpy as np
+
+from . import kernels
+
+
+def _present(value) -> bool:
+    return value is not None and not math.isnan(value)
+
+
+def score_stock(symbol: str, bars: Dict[str, np.ndarray], predictions: Optional[Dict[str, float]] = None) -> dict:
+    """
+    Pure computation on one symbol's full bar history (runs in the analysis pool):
+    1. Technical indicators (RSI, MACD, BB)
+    2. AI price prediction (from `predictions`; last close if missing)
+    3. Signal scoring
+    """
+    closes = np.asarray(bars['close'], dtype=float)
+
+    # ═══ 1. TÍNH TOÁN INDICATORS ═══
+    rsi = kernels.last_value(kernels.rsi(closes, 14))
+    bands = kernels.bollinger(closes, 20, 2.0)
+    bb_upper = kernels.last_value(bands.upper)
+    bb_lower = kernels.last_value(bands.lower)
+    macd_series = kernels.macd(closes, 12, 26, 9)
+    macd_val = kernels.last_value(macd_series.macd)
+    macd_sig = kernels.last_value(macd_series.signal)
+    price = float(closes[-1])
+
+    # ═══ 2. AI PRICE PREDICTION ═══
+    predicted_price = (predictions or {}).get(symbol, price)
+
+    return score_readings(symbol, price, predicted_price, rsi, bb_upper, bb_lower, macd_val, macd_sig)
+
+
+def score_readings(symbol: str, price: float, predicted_price: float, rsi: float,
+                   bb_upper: float, bb_lower: float, macd_val: float, macd_sig: float) -> dict:
+    """Signal scoring from the latest indicator readings (full recompute or streaming state)"""
+    # ═══ 3. SIGNAL SCORING ═══
+    signal_score = 0
+    reasons = []
+
+    # RSI Logic
+    if _present(rsi):
+        if rsi < 30:
+            signal_score += 2
+            reasons.append(f"RSI={rsi:.1f} Quá bán")
+        elif rsi < 40:
+            signal_score += 1
+        elif rsi > 70:
+            signal_score -= 2
+            reasons.append(f"RSI={rsi:.1f} Quá mua")
+        elif rsi > 60:
+            signal_score -= 1
+
+    # Bollinger Bands Logic
+    if _present(bb_lower) and bb_lower > 0:
+        if price < bb_lower:
+            signal_score += 2
+            reasons.append("Giá chạm BB dưới")
+        elif price > bb_upper:
+            signal_score -= 2
+            reasons.append("Giá chạm BB trên")
+
+    # AI Prediction Logic
+    if predicted_price > price * 1.002:  # AI predicts +0.2%
+        signal_score += 1
+        reasons.append(f"AI: +{((predicted_price-price)/price*100):.2f}%")
+    elif predicted_price < price * 0.998:  # AI predicts -0.2%
+        signal_score -= 1
+        reasons.append(f"AI: {((predicted_price-price)/price*100):.2f}%")
+
+    # MACD Logic
+    if _present(macd_val) and _present(macd_sig):
+        if macd_val > macd_sig:
+            signal_score += 1
+        else:
+            signal_score -= 1
+
+    # ═══ 4. DETERMINE SIGNAL ═══
+    if signal_score >= 4:
+        signal_type = "STRONG_BUY"
+    elif signal_score >= 2:
+        signal_type = "BUY"
+    elif signal_score <= -4:
+        signal_type = "STRONG_SELL"
+    elif signal_score <= -2:
+        signal_type = "SELL"
+    else:
+        signal_type = "NEUTRAL"
+
+    return {
+        'symbol': symbol,
+        'signal': signal_type,
+        'score': signal_score,
+        'price': price,
+        'predicted': predicted_price,
+        'rsi': rsi if _present(rsi) else 50,
+        'macd': macd_val if _present(macd_val) else 0.0,
+        'reasons': reasons
+    }
@@ -0,0 +1,309 @@
+"""
+VN30-Quantum AI Engine - Streaming Indicators
+Per-symbol running RSI / EMA / MACD / Bollinger state with O(1) bar updates
+
+Used by hunter/signal_agent.py and analyst/main.py: after a full history
+fold, each cycle only folds the bars newer than a symbol's watermark.
+Readings match ai_engine.kernels on the same bars (see kernel_check).
+"""
+import json
+import math
+import os
+import time
+from collections import deque
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+STATE_VERSION = 1
+# Tổng/tổng bình phương Bollinger được tính lại định kỳ để tránh trôi số học
+BB_RESUM_EVERY = 1000
+
+
+@dataclass
+class IndicatorValues:
+    """Indicator readings after the latest bar"""
+    price: float
+    rsi: float
+    macd: float
+    macd_signal: float
+    macd_hist: float
+    bb_upper: float
+    bb_middle: float
+    bb_lower: float
+    bb_position: float
+    bars: int
+    candles: Tuple[List[float], List[float], List[float], List[float]]  # opens, highs, lows, closes (≤3)
+
+
+class IndicatorState:
+    """
+    Running indicator state for one symbol
+
+    - RSI: Wilder averages (simple mean of the first `rsi_period` moves, then
+      avg = (avg * (n - 1) + x) / n)
+    - EMA12/26, MACD signal = EMA9 of MACD, seeded at the first value
+    - Bollinger: rolling sum and sum of squares over `bb_period` closes
+    Every update touches a fixed number of values, regardless of history length.
+    """
+
+    def __init__(self, rsi_period: int = 14, bb_period: int = 20):
+        self.rsi_period = rsi_period
+        self.bb_period = bb_period
+        self.last_time = 0          # epoch seconds of the newest folded bar
+        self.bars = 0
+        self.last_close = math.nan
+        self.gain_sum = 0.0         # RSI warm-up sums
+        self.loss_sum = 0.0
+        self.avg_gain = math.nan
+        self.avg_loss = math.nan
+        self.ema12 = math.nan
+        self.ema26 = math.nan
+        self.macd_signal = math.nan
+        self.window = deque(maxlen=bb_period)
+        self.bb_sum = 0.0
+        self.bb_sumsq = 0.0
+        self.candles = deque(maxlen=3)
+
+    # ═══════════════════════════════════════════════════════
+    # UPDATE
+    # ═══════════════════════════════════════════════════════
+    def update(self, t: int, o: float, h: float, l: float, c: float):
+        """Fold one closed bar into the state"""
+        self.bars += 1
+        self.last_time = t
+        self.candles.append((o, h, l, c))
+
+        if not math.isnan(self.last_close):
+            self._update_rsi(c - self.last_close)
+        self.last_close = c
+
+        self.ema12 = c if math.isnan(self.ema12) else self.ema12 + (c - self.ema12) * (2 / 13)
+        self.ema26 = c if math.isnan(self.ema26) else self.ema26 + (c - self.ema26) * (2 / 27)
+        if self.bars >= 26:
+            macd = self.ema12 - self.ema26
+            self.macd_signal = macd if math.isnan(self.macd_signal) else \
+                self.macd_signal + (macd - self.macd_signal) * (2 / 10)
+
+        if len(self.window) == self.bb_period:
+            dropped = self.window[0]
+            self.bb_sum -= dropped
+            self.bb_sumsq -= dropped * dropped
+        self.window.append(c)
+        self.bb_sum += c
+        self.bb_sumsq += c * c
+        if self.bars % BB_RESUM_EVERY == 0:
+            self.bb_sum = float(sum(self.window))
+            self.bb_sumsq = float(sum(x * x for x in self.window))
+
+    def _update_rsi(self, delta: float):
+        gain, loss = max(delta, 0.0), max(-delta, 0.0)
+        n = self.rsi_period
+        moves = self.bars - 1  # số biến động giá đã thấy, kể cả lần này
+        if moves <= n:
+            self.gain_sum += gain
+            self.loss_sum += loss
+            if moves == n:
+                self.avg_gain = self.gain_sum / n
+                self.avg_loss = self.loss_sum / n
+        else:
+            self.avg_gain = (self.avg_gain * (n - 1) + gain) / n
+            self.avg_loss = (self.avg_loss * (n - 1) + loss) / n
+
+    # ═══════════════════════════════════════════════════════
+    # READ
+    # ═══════════════════════════════════════════════════════
+    def values(self) -> IndicatorValues:
+        price = self.last_close
+
+        if math.isnan(self.avg_gain):
+            rsi = 50.0  # Neutral khi chưa đủ dữ liệu
+        elif self.avg_loss == 0:
+            rsi = 100.0
+        else:
+            rsi = 100 - 100 / (1 + self.avg_gain / self.avg_loss)
+
+        if self.bars >= 26:
+            macd = self.ema12 - self.ema26
+            signal = self.macd_signal
+        else:
+            macd = signal = 0.0
+
+        if len(self.window) == self.bb_period:
+            mean = self.bb_sum / self.bb_period
+            std = math.sqrt(max(0.0, self.bb_sumsq / self.bb_period - mean * mean))
+            upper, lower = mean + 2 * std, mean - 2 * std
+            position = (price - lower) / (upper - lower) if upper != lower else 0.5
+            position = max(0.0, min(1.0, position))
+        else:
+            upper = mean = lower = 0.0
+            position = 0.5
+
+        candles = tuple(list(column) for column in zip(*self.candles)) if self.candles else ([], [], [], [])
+        return IndicatorValues(
+            price=float(price), rsi=float(rsi), macd=float(macd), macd_signal=float(signal),
+            macd_hist=float(macd - signal), bb_upper=float(upper), bb_middle=float(mean),
+            bb_lower=float(lower), bb_position=float(position), bars=self.bars, candles=candles
+        )
+
+    def peek(self, t: int, o: float, h: float, l: float, c: float) -> IndicatorValues:
+        """Values as if a (still forming) bar were folded in, without changing the state"""
+        probe = self.clone()
+        probe.update(t, o, h, l, c)
+        return probe.values()
+
+    # ═══════════════════════════════════════════════════════
+    # SERIALIZATION
+    # ═══════════════════════════════════════════════════════
+    SCALARS = ('last_time', 'bars', 'last_close', 'gain_sum', 'loss_sum', 'avg_gain', 'avg_loss',
+               'ema12', 'ema26', 'macd_signal', 'bb_sum', 'bb_sumsq')
+
+    def clone(self) -> "IndicatorState":
+        other = IndicatorState(self.rsi_period, self.bb_period)
+        for name in self.SCALARS:
+            setattr(other, name, getattr(self, name))
+        other.window = deque(self.window, maxlen=self.bb_period)
+        other.candles = deque(self.candles, maxlen=3)
+        return other
+
+    def to_dict(self) -> dict:
+        data = {name: getattr(self, name) for name in self.SCALARS}
+        # JSON không có NaN chuẩn -> lưu None
+        data = {k: (None if isinstance(v, float) and math.isnan(v) else v) for k, v in data.items()}
+        data['window'] = list(self.window)
+        data['candles'] = [list(c) for c in self.candles]
+        return data
+
+    @classmethod
+    def from_dict(cls, data: dict, rsi_period: int, bb_period: int) -> "IndicatorState":
+        state = cls(rsi_period, bb_period)
+        for name in cls.SCALARS:
+            value = data.get(name)
+            setattr(state, name, math.nan if value is None else value)
+        state.last_time = int(state.last_time)
+        state.bars = int(state.bars)
+        state.window = deque(data.get('window', []), maxlen=bb_period)
+        state.candles = deque((tuple(c) for c in data.get('candles', [])), maxlen=3)
+        return state
+
+
+class StreamingIndicators:
+    """
+    Indicator states for many symbols, checkpointed to a JSON file
+
+    Each cycle the agent only needs bars newer than a symbol's last folded
+    bar. All bars but the newest are folded into the state; the newest is
+    usually still forming, so it is only peeked at and gets folded with
+    its final values once a later bar arrives. The checkpoint (tmp file
+    + rename) lets a restart resume without re-reading history.
+    """
+
+    def __init__(self, path: str, rsi_period: int = 14, bb_period: int = 20,
+                 max_gap: float = 7 * 86400, save_interval: float = 60.0):
+        self.path = path
+        self.rsi_period = rsi_period
+        self.bb_period = bb_period
+        self.max_gap = max_gap
+        self.save_interval = save_interval
+        self.states: Dict[str, IndicatorState] = {}
+        self._last_save = time.time()
+
+    @property
+    def params(self) -> dict:
+        return {'rsi_period': self.rsi_period, 'bb_period': self.bb_period}
+
+    def load(self) -> int:
+        """Restore states from the checkpoint; returns the number of symbols restored"""
+        if not os.path.exists(self.path):
+            return 0
+        with open(self.path) as f:
+            data = json.load(f)
+        if data.get('version') != STATE_VERSION or data.get('params') != self.params:
+            return 0
+        self.states = {
+            symbol: IndicatorState.from_dict(state, self.rsi_period, self.bb_period)
+            for symbol, state in data.get('symbols', {}).items()
+        }
+        return len(self.states)
+
+    def save(self):
+        os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+        tmp_path = self.path + '.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump({
+                'version': STATE_VERSION,
+                'params': self.params,
+                'saved': datetime.now(timezone.utc).isoformat(),
+                'symbols': {symbol: state.to_dict() for symbol, state in self.states.items()},
+            }, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.path)
+        self._last_save = time.time()
+
+    def maybe_save(self):
+        if time.time() - self._last_save >= self.save_interval:
+            self.save()
+
+    def plan(self, symbols: List[str], now: Optional[float] = None) -> Tuple[List[str], List[str], Optional[datetime]]:
+        """
+        Split symbols into (cold, warm, since): cold symbols need full history,
+        warm ones only bars after `since` (the oldest warm watermark)
+        """
+        now = now or time.time()
+        cold, warm = [], []
+        for symbol in symbols:
+            state = self.states.get(symbol)
+            if state is None or state.bars == 0 or now - state.last_time > self.max_gap:
+                self.states.pop(symbol, None)
+                cold.append(symbol)
+            else:
+                warm.append(symbol)
+        since = None
+        if warm:
+            oldest = min(self.states[s].last_time for s in warm)
+            since = datetime.fromtimestamp(oldest + 1, timezone.utc)
+        return cold, warm, since
+
+    def ingest(self, symbol: str, data: Dict) -> Optional[IndicatorValues]:
+        """
+        Fold new closed bars of `data` (column arrays incl. 'times' in epoch
+        seconds) into the symbol's state and return values including the
+        newest (forming) bar; None if there is nothing to report
+        """
+        state = self.states.get(symbol)
+        if state is None:
+            state = self.states[symbol] = IndicatorState(self.rsi_period, self.bb_period)
+        return fold_bars(state, data)
+
+    def adopt(self, symbol: str, state: dict):
+        """Install a state built elsewhere (e.g. folded in a worker process, see `fold_cold`)"""
+        self.states[symbol] = IndicatorState.from_dict(state, self.rsi_period, self.bb_period)
+
+
+def fold_bars(state: IndicatorState, data: Dict) -> Optional[IndicatorValues]:
+    """Fold all but the newest bar of `data` into `state`; values including the newest"""
+    times = data['times']
+    if len(times) == 0:
+        return state.values() if state.bars else None
+
+    start = int(np.searchsorted(times, state.last_time, side='right'))
+    last = len(times) - 1
+    opens, highs, lows, closes = data['opens'], data['highs'], data['lows'], data['prices']
+    for i in range(start, last):
+        state.update(int(times[i]), float(opens[i]), float(highs[i]), float(lows[i]), float(closes[i]))
+
+    if times[last] <= state.last_time:
+        return state.values()
+    return state.peek(int(times[last]), float(opens[last]), float(highs[last]), float(lows[last]),
+                      float(closes[last]))
+
+
+def fold_cold(symbol: str, data: Dict, rsi_period: int = 14,
+              bb_period: int = 20) -> Tuple[dict, Optional[IndicatorValues]]:
+    """Build a state from a full history (pool task for cold symbols); returns (state dict, values)"""
+    state = IndicatorState(rsi_period, bb_period)
+    values = fold_bars(state, data)
+    return state.to_dict(), values
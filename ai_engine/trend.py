@@ -0,0 +1,147 @@
+"""
+VN30-Quantum AI Engine - Linear Trend Predictor
+Fixed-window OLS slope / intercept / next-bar forecast over (symbols × time) panels
+
+With x = 0..window-1 the design matrix never changes, so its statistics
+are computed once: slope, intercept and the h-step forecast are each a
+fixed weight vector, and fitting every symbol is one matrix product.
+Same numbers as sklearn LinearRegression on (range(window), closes).
+
+`TrendState` keeps the window sums per symbol and updates them in O(1)
+per bar for consumers that see bars one at a time.
+"""
+import math
+from typing import NamedTuple, Optional, Sequence
+
+import numpy as np
+
+from .kernels import as_panel, _like_input
+
+
+def _per_row(values, result: np.ndarray):
+    """One value per row; a scalar for a 1D series"""
+    return result[0] if np.ndim(values) == 1 else result
+
+
+class TrendFit(NamedTuple):
+    slope: np.ndarray
+    intercept: np.ndarray   # value of the line at the oldest bar of the window
+    forecast: np.ndarray    # value of the line `horizon` bars after the newest
+
+
+class LinearTrend:
+    """
+    OLS line through the last `window` closes of each row
+
+    Rows with fewer than `window` valid closes (NaN padding from
+    `kernels.align_right`) get NaN.
+    """
+
+    def __init__(self, window: int = 30, horizon: int = 1):
+        if window < 2:
+            raise ValueError("window must be >= 2")
+        self.window = window
+        self.horizon = horizon
+        x = np.arange(window, dtype=float)
+        self.x_mean = (window - 1) / 2
+        self.sxx = window * (window * window - 1) / 12
+        self.slope_weights = (x - self.x_mean) / self.sxx
+        self.mean_weights = np.full(window, 1.0 / window)
+        self.forecast_weights = self.mean_weights + self.slope_weights * (window - 1 + horizon - self.x_mean)
+
+    def _window(self, values) -> np.ndarray:
+        panel = as_panel(values)
+        if panel.shape[1] < self.window:
+            pad = np.full((panel.shape[0], self.window - panel.shape[1]), np.nan)
+            panel = np.hstack([pad, panel])
+        return panel[:, -self.window:]
+
+    def fit(self, values) -> TrendFit:
+        """Slope / intercept / forecast from the newest `window` bars of each row"""
+        window = self._window(values)
+        slope = window @ self.slope_weights
+        intercept = window @ self.mean_weights - slope * self.x_mean
+        forecast = window @ self.forecast_weights
+        return TrendFit(*(_per_row(values, a) for a in (slope, intercept, forecast)))
+
+    def forecast(self, values) -> np.ndarray:
+        """Next-bar forecast per row (a scalar for a 1D series)"""
+        return _per_row(values, self._window(values) @ self.forecast_weights)
+
+    def rolling(self, values) -> TrendFit:
+        """Fit at every bar (input shape, NaN until `window` bars are available)"""
+        panel = as_panel(values)
+        out = [np.full(panel.shape, np.nan) for _ in range(3)]
+        if panel.shape[1] >= self.window:
+            windows = np.lib.stride_tricks.sliding_window_view(panel, self.window, axis=1)
+            slope = windows @ self.slope_weights
+            out[0][:, self.window - 1:] = slope
+            out[1][:, self.window - 1:] = windows @ self.mean_weights - slope * self.x_mean
+            out[2][:, self.window - 1:] = windows @ self.forecast_weights
+        return TrendFit(*(_like_input(values, a) for a in out))
+
+
+class TrendState:
+    """
+    Incremental LinearTrend for `rows` symbols
+
+    Keeps each row's last `window` closes in a ring buffer plus Σy and Σx·y
+    (x = 0 for the oldest bar). When a bar arrives every remaining bar's x
+    drops by one, so Σx·y' = Σx·y - (Σy - y_oldest) + (window - 1)·y_new.
+    Sums are recomputed from the buffer once per full turn of the ring to
+    keep floating-point drift bounded.
+    """
+
+    def __init__(self, rows: int, window: int = 30, horizon: int = 1):
+        self.trend = LinearTrend(window, horizon)
+        self.window = window
+        self.buffer = np.zeros((rows, window))
+        self.count = np.zeros(rows, dtype=np.int64)
+        self.sum_y = np.zeros(rows)
+        self.sum_xy = np.zeros(rows)
+
+    def seed(self, values):
+        """Start from history (right-aligned panel, NaN = no bar)"""
+        panel = as_panel(values)
+        self.count[:] = 0
+        self.sum_y[:] = 0.0
+        self.sum_xy[:] = 0.0
+        for column in panel.T:
+            self.update(column)
+
+    def update(self, closes: Sequence[float], rows: Optional[np.ndarray] = None):
+        """One new close per row (NaN = no new bar); `rows` selects a subset"""
+        rows = np.arange(len(self.count)) if rows is None else np.asarray(rows)
+        closes = np.asarray(closes, dtype=float)
+        has_bar = ~np.isnan(closes)
+        rows, closes = rows[has_bar], closes[has_bar]
+        if not len(rows):
+            return
+
+        w = self.window
+        count = self.count[rows]
+        slot = count % w
+        full = count >= w
+        oldest = np.where(full, self.buffer[rows, slot], 0.0)
+        # Cửa sổ chưa đầy: bar mới có x = count, không bar nào bị đẩy ra
+        position = np.where(full, w - 1, count)
+        shift = np.where(full, self.sum_y[rows] - oldest, 0.0)
+        self.sum_xy[rows] += position * closes - shift
+        self.sum_y[rows] += closes - oldest
+        self.buffer[rows, slot] = closes
+        self.count[rows] = count + 1
+
+        wrapped = rows[full & (slot == w - 1)]
+        if len(wrapped):
+            exact = self.buffer[wrapped]  # slot 0 = oldest sau một vòng
+            self.sum_y[wrapped] = exact.sum(axis=1)
+            self.sum_xy[wrapped] = exact @ np.arange(w, dtype=float)
+
+    def fit(self) -> TrendFit:
+        """Current slope / intercept / forecast per row (NaN until `window` bars)"""
+        t = self.trend
+        ready = self.count >= self.window
+        slope = np.where(ready, (self.sum_xy - t.x_mean * self.sum_y) / t.sxx, math.nan)
+        intercept = np.where(ready, self.sum_y / self.window - slope * t.x_mean, math.nan)
+        forecast = intercept + slope * (self.window - 1 + t.horizon)
+        return TrendFit(slope, intercept, forecast)
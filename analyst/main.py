@@ -3,21 +3,37 @@
 VN30-Quantum Oracle - The AI Prediction & Alert System
 Phase 3-4: AI Price Prediction + Telegram Sentinel
 """
+import queue
+import sqlite3
+import threading
 import time
 import os
+import sys
 import requests
 import numpy as np
-import pandas as pd
-from datetime import datetime
-from sklearn.linear_model import LinearRegression
+from collections import deque
+from datetime import datetime, timezone
+from functools import partial
+from typing import Tuple
 from influxdb_client import InfluxDBClient, Point
 from influxdb_client.client.write_api import SYNCHRONOUS
+from prometheus_client import Counter, Gauge, Histogram
 
-# Technical Analysis library
-import ta
-from ta.momentum import RSIIndicator, StochasticOscillator
-from ta.trend import MACD, SMAIndicator, EMAIndicator
-from ta.volatility import BollingerBands
+try:
+    import redis
+except ImportError:
+    redis = None
+
+# Indicator kernels + process pool dùng chung với ai_engine / signal agent (image: /app/ai_engine/)
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from ai_engine import kernels, metrics
+from ai_engine.bar_events import BarSubscriber
+from ai_engine.bar_ring import open_ring
+from ai_engine.columnar import query_columns
+from ai_engine.parallel import PanelPool, resolve_workers
+from ai_engine.scoring import score_readings, score_stock
+from ai_engine.streaming import StreamingIndicators, fold_cold
+from ai_engine import forecasters
 
 # ═══════════════════════════════════════════════════════
 # CONFIG
@@ -40,6 +56,56 @@ VN30_STOCKS = [
 
 # Cooldown: Avoid spam (seconds)
 ALERT_COOLDOWN = 900  # 15 minutes
+# Per (symbol, signal type), shared by all replicas via Redis; SQLite file when Redis is unavailable
+COOLDOWN_PREFIX = 'vn30:alert-cooldown'
+COOLDOWN_DB = os.getenv('ANALYST_COOLDOWN_DB', './data/alert_cooldown.db')
+
+# Telegram dispatch: the scan only enqueues, a background thread sends (full queue -> alert dropped)
+TELEGRAM_QUEUE_SIZE = int(os.getenv('TELEGRAM_QUEUE_SIZE', '100'))
+TELEGRAM_RETRIES = int(os.getenv('TELEGRAM_RETRIES', '3'))
+TELEGRAM_TIMEOUT = float(os.getenv('TELEGRAM_TIMEOUT', '10'))
+
+# Prometheus /metrics port (0 = off)
+METRICS_PORT = int(os.getenv('METRICS_PORT', '9103'))
+
+# Bar events from the hunter (Redis pub/sub): rescan only the symbols just written.
+# Không có Redis / không có sự kiện -> quét toàn bộ mỗi POLL_INTERVAL giây
+REDIS_URL = os.getenv('REDIS_URL', '')
+BAR_CHANNEL = os.getenv('BAR_EVENTS_CHANNEL', 'vn30:bars')
+POLL_INTERVAL = float(os.getenv('ANALYST_POLL_INTERVAL', '60'))
+
+# Price forecaster (ai_engine.forecasters registry; compare with `python -m ai_engine.forecast_bench`)
+FORECASTER = forecasters.create(os.getenv('ANALYST_FORECASTER', 'ols'),
+                                window=int(os.getenv('ANALYST_FORECAST_WINDOW', '30')))
+
+# Scoring processes (1 = in-process, 0 = one per core); bars are shared via shared memory
+ANALYST_WORKERS = resolve_workers(int(os.getenv('ANALYST_WORKERS', '1')))
+
+# Incremental mode: indicator state carried between scans, each scan only reads/folds new bars.
+# Đọc lại đủ HISTORY khi gặp mã lần đầu, sau restart, hoặc khi mất dữ liệu > ANALYST_MAX_GAP giây
+INCREMENTAL = os.getenv('ANALYST_INCREMENTAL', '1') == '1'
+HISTORY = '-6h'
+MAX_GAP = float(os.getenv('ANALYST_MAX_GAP', str(6 * 3600)))
+# Hunter's shared bar ring: incremental scans read new bars from it instead of InfluxDB ('' = off)
+BAR_RING_PATH = os.getenv('BAR_RING_PATH', '')
+
+# ═══════════════════════════════════════════════════════
+# METRICS
+# ═══════════════════════════════════════════════════════
+# Buckets and cycle / query / lag / event families shared with the hunter and signal agent
+CYCLE_DURATION = metrics.cycle_histogram('analyst', 'query, compute, total')
+QUERY_LATENCY = metrics.query_histogram('analyst', 'symbol')
+WRITE_LATENCY = Histogram('analyst_write_latency_seconds', 'InfluxDB signal write latency',
+                          buckets=metrics.LATENCY_BUCKETS)
+WRITE_ERRORS = Counter('analyst_write_errors_total', 'Failed InfluxDB signal writes')
+ANALYSIS_ERRORS = Counter('analyst_errors_total', 'Symbols that failed analysis', ['symbol'])
+DATA_LAG = metrics.data_lag_histogram('analyst')
+TELEGRAM_SENT = Counter('analyst_telegram_alerts_total', 'Telegram alerts by outcome (sent, failed, dropped)', ['outcome'])
+TELEGRAM_RETRIED = Counter('analyst_telegram_retries_total', 'Telegram send attempts that were retried')
+TELEGRAM_QUEUE = Gauge('analyst_telegram_queue_depth', 'Telegram alerts waiting to be sent')
+TELEGRAM_DELIVERY = Histogram('analyst_telegram_delivery_seconds', 'Alert enqueued -> accepted by Telegram',
+                              buckets=metrics.LATENCY_BUCKETS)
+EVENT_LATENCY = metrics.event_latency_histogram('analyst', 'scan finished')
 
 # ═══════════════════════════════════════════════════════
 # COLORS
@@ -53,13 +119,16 @@ class Colors:
     BOLD = '\033[1m'
     RESET = '\033[0m'
 
-# Memory for cooldown
-last_alert_time = {}
+# Time spent in InfluxDB queries during the current scan
+query_timer = {'query': 0.0}
 
 # ═══════════════════════════════════════════════════════
 # STARTUP BANNER
 # ═══════════════════════════════════════════════════════
-print(f"""
+# Analysis pool workers (forkserver/spawn) re-run this script as __mp_main__:
+# banner and DB connection only in the real entry point
+if __name__ == "__main__":
+    print(f"""
 {Colors.PURPLE}{Colors.BOLD}
 ╔═══════════════════════════════════════════════════════╗
 ║        🔮 VN30-QUANTUM ORACLE                        ║
@@ -68,30 +137,119 @@ print(f"""
 {Colors.RESET}
 🎯 Phân tích: {Colors.BOLD}{len(VN30_STOCKS)} mã VN30{Colors.RESET}
 📡 Database: {INFLUX_URL}
-🔬 AI: Linear Regression Price Prediction
+🔬 AI: {FORECASTER!r} Price Prediction
 📱 Telegram: {'✅ Configured' if 'YOUR_' not in TELE_TOKEN else '❌ Not configured'}
 ⏱ Alert Cooldown: {ALERT_COOLDOWN}s
+🧮 Workers: {ANALYST_WORKERS}
+♻️ Incremental: {'✅' if INCREMENTAL else '❌ (full recompute)'}
 """)
 
 # ═══════════════════════════════════════════════════════
 # DATABASE SETUP
 # ═══════════════════════════════════════════════════════
-try:
-    client = InfluxDBClient(url=INFLUX_URL, token=INFLUX_TOKEN, org=INFLUX_ORG)
-    query_api = client.query_api()
-    write_api = client.write_api(write_options=SYNCHRONOUS)
-    print(f"{Colors.GREEN}✅ Kết nối InfluxDB thành công!{Colors.RESET}")
-except Exception as e:
-    print(f"{Colors.RED}❌ Lỗi kết nối InfluxDB: {e}{Colors.RESET}")
-    exit(1)
+if __name__ == "__main__":
+    try:
+        client = InfluxDBClient(url=INFLUX_URL, token=INFLUX_TOKEN, org=INFLUX_ORG)
+        query_api = client.query_api()
+        write_api = client.write_api(write_options=SYNCHRONOUS)
+        print(f"{Colors.GREEN}✅ Kết nối InfluxDB thành công!{Colors.RESET}")
+    except Exception as e:
+        print(f"{Colors.RED}❌ Lỗi kết nối InfluxDB: {e}{Colors.RESET}")
+        exit(1)
+
+# ═══════════════════════════════════════════════════════
+# BAR EVENTS
+# ═══════════════════════════════════════════════════════
+# Subscriber shared with the signal agent; falls back to POLL_INTERVAL polling
+bar_events = BarSubscriber(REDIS_URL, BAR_CHANNEL,
+                           info=lambda msg: print(f"{Colors.CYAN}{msg}{Colors.RESET}"),
+                           warning=lambda msg: print(f"{Colors.YELLOW}⚠️ {msg}{Colors.RESET}"))
+
+# ═══════════════════════════════════════════════════════
+# ALERT COOLDOWN
+# ═══════════════════════════════════════════════════════
+cooldown = {'redis': None, 'retry_at': 0.0, 'db': None}
+
+def cooldown_redis():
+    if not REDIS_URL or redis is None or time.time() < cooldown['retry_at']:
+        return None
+    if cooldown['redis'] is None:
+        cooldown['redis'] = redis.Redis.from_url(REDIS_URL, socket_timeout=5)
+    return cooldown['redis']
+
+def cooldown_db() -> sqlite3.Connection:
+    if cooldown['db'] is None:
+        os.makedirs(os.path.dirname(COOLDOWN_DB) or '.', exist_ok=True)
+        db = sqlite3.connect(COOLDOWN_DB, timeout=10, isolation_level=None)
+        db.execute('PRAGMA journal_mode=WAL')
+        db.execute('CREATE TABLE IF NOT EXISTS alert_cooldown (key TEXT PRIMARY KEY, expires REAL NOT NULL)')
+        cooldown['db'] = db
+    return cooldown['db']
+
+def acquire_cooldowns_sqlite(keys: list, ttl: float) -> set:
+    db = cooldown_db()
+    now = time.time()
+    db.execute('BEGIN IMMEDIATE')  # khóa ghi: kiểm tra + đặt là một bước với các process khác
+    try:
+        db.execute('DELETE FROM alert_cooldown WHERE expires <= ?', (now,))
+        marks = ','.join('?' * len(keys))
+        held = {row[0] for row in db.execute(f'SELECT key FROM alert_cooldown WHERE key IN ({marks})', keys)}
+        acquired = [key for key in keys if key not in held]
+        db.executemany('INSERT INTO alert_cooldown (key, expires) VALUES (?, ?)',
+                       [(key, now + ttl) for key in acquired])
+        db.execute('COMMIT')
+    except Exception:
+        db.execute('ROLLBACK')
+        raise
+    return set(acquired)
+
+def acquire_cooldowns(keys: list, ttl: float = ALERT_COOLDOWN) -> set:
+    """
+    Check-and-set for a whole cycle: returns the keys ("SYMBOL:SIGNAL") that
+    were not cooling down and starts their cooldown. Redis: SET NX EX per
+    key, one pipelined round trip, atomic across replicas. Falls back to the
+    SQLite file (per host) when Redis is not configured or unreachable.
+    """
+    keys = list(dict.fromkeys(keys))
+    if not keys:
+        return set()
+    client = cooldown_redis()
+    if client is not None:
+        try:
+            pipe = client.pipeline(transaction=False)
+            for key in keys:
+                pipe.set(f"{COOLDOWN_PREFIX}:{key}", int(time.time()), nx=True, ex=max(1, int(ttl)))
+            return {key for key, acquired in zip(keys, pipe.execute()) if acquired}
+        except redis.RedisError as e:
+            print(f"{Colors.YELLOW}⚠️ Redis cooldown lỗi ({str(e)[:60]}) - dùng SQLite{Colors.RESET}")
+            cooldown['redis'] = None
+            cooldown['retry_at'] = time.time() + 30
+    return acquire_cooldowns_sqlite(keys, ttl)
+
+def release_cooldowns(keys: list):
+    """Drop cooldowns taken this cycle whose alert was never queued (same store as acquire_cooldowns)"""
+    keys = list(dict.fromkeys(keys))
+    if not keys:
+        return
+    client = cooldown_redis()
+    if client is not None:
+        try:
+            client.delete(*(f"{COOLDOWN_PREFIX}:{key}" for key in keys))
+            return
+        except redis.RedisError as e:
+            print(f"{Colors.YELLOW}⚠️ Redis cooldown lỗi ({str(e)[:60]}) - dùng SQLite{Colors.RESET}")
+            cooldown['redis'] = None
+            cooldown['retry_at'] = time.time() + 30
+    marks = ','.join('?' * len(keys))
+    cooldown_db().execute(f'DELETE FROM alert_cooldown WHERE key IN ({marks})', keys)
 
 # ═══════════════════════════════════════════════════════
 # TELEGRAM SENTINEL
 # ═══════════════════════════════════════════════════════
-def send_telegram(symbol: str, signal: str, price: float, rsi: float, prediction: float):
-    """Send formatted alert to Telegram"""
+def send_telegram(symbol: str, signal: str, price: float, rsi: float, prediction: float) -> bool:
+    """Queue a formatted alert for the Telegram worker (never blocks the scan); False if not queued"""
     if "YOUR_" in TELE_TOKEN:
-        return  # Not configured
+        return False  # Not configured
     
     icon = "🚀" if "BUY" in signal else "🔻"
     color = "🟢" if "BUY" in signal else "🔴"
@@ -111,210 +269,304 @@ def send_telegram(symbol: str, signal: str, price: float, rsi: float, prediction
 """
     
     try:
-        url = f"https://api.telegram.org/bot{TELE_TOKEN}/sendMessage"
-        response = requests.post(url, json={
-            "chat_id": TELE_CHAT_ID,
-            "text": msg,
-            "parse_mode": "Markdown"
-        }, timeout=10)
-        if response.ok:
+        telegram_queue.put_nowait((time.time(), msg))
+        TELEGRAM_QUEUE.set(telegram_queue.qsize())
+        return True
+    except queue.Full:
+        TELEGRAM_SENT.labels('dropped').inc()
+        print(f"{Colors.YELLOW}📱 Hàng đợi Telegram đầy - bỏ cảnh báo {symbol}{Colors.RESET}")
+        return False
+
+telegram_queue = queue.Queue(maxsize=TELEGRAM_QUEUE_SIZE)
+telegram_session = requests.Session()
+
+def deliver_telegram(msg: str) -> bool:
+    """POST one message, retrying network errors, 429 (retry_after) and 5xx with backoff"""
+    url = f"https://api.telegram.org/bot{TELE_TOKEN}/sendMessage"
+    payload = {"chat_id": TELE_CHAT_ID, "text": msg, "parse_mode": "Markdown"}
+    for attempt in range(TELEGRAM_RETRIES + 1):
+        delay = min(2 ** attempt, 30)
+        try:
+            response = telegram_session.post(url, json=payload, timeout=TELEGRAM_TIMEOUT)
+            if response.ok:
+                return True
+            if response.status_code == 429:
+                try:
+                    delay = float(response.json().get('parameters', {}).get('retry_after', delay))
+                except ValueError:
+                    pass
+            elif response.status_code < 500:
+                print(f"{Colors.YELLOW}📱 Telegram error: {response.text}{Colors.RESET}")
+                return False  # Sai token / chat_id: thử lại cũng vô ích
+            error = f"HTTP {response.status_code}"
+        except requests.RequestException as e:
+            error = str(e)
+        if attempt < TELEGRAM_RETRIES:
+            TELEGRAM_RETRIED.inc()
+            time.sleep(delay)
+    print(f"{Colors.RED}❌ Telegram error: {error[:80]}{Colors.RESET}")
+    return False
+
+def telegram_worker():
+    """Background sender: one alert at a time over a pooled HTTP session"""
+    while True:
+        item = telegram_queue.get()
+        TELEGRAM_QUEUE.set(telegram_queue.qsize())
+        if item is None:
+            return
+        queued_at, msg = item
+        if deliver_telegram(msg):
+            TELEGRAM_SENT.labels('sent').inc()
+            TELEGRAM_DELIVERY.observe(time.time() - queued_at)
             print(f"{Colors.GREEN}📱 Telegram: Đã gửi thành công!{Colors.RESET}")
         else:
-            print(f"{Colors.YELLOW}📱 Telegram error: {response.text}{Colors.RESET}")
-    except Exception as e:
-        print(f"{Colors.RED}❌ Telegram error: {e}{Colors.RESET}")
+            TELEGRAM_SENT.labels('failed').inc()
+
+def start_telegram() -> threading.Thread:
+    thread = threading.Thread(target=telegram_worker, name='telegram', daemon=True)
+    thread.start()
+    return thread
+
+def stop_telegram(thread: threading.Thread, timeout: float = 15.0):
+    """Let queued alerts go out before exit (bounded by `timeout`)"""
+    try:
+        telegram_queue.put(None, timeout=timeout)
+    except queue.Full:
+        return
+    thread.join(timeout=timeout)
 
 # ═══════════════════════════════════════════════════════
-# AI PREDICTION ENGINE (LINEAR REGRESSION)
+# AI PREDICTION ENGINE (PLUGGABLE FORECASTER)
 # ═══════════════════════════════════════════════════════
-def predict_next_price(prices: list) -> float:
+def predict_prices(closes: dict) -> dict:
     """
-    Use Linear Regression to predict next candle price
-    Takes last 30 data points, fits a line, predicts step 31
+    Next-candle forecast for every symbol in one FORECASTER call over the
+    last FORECASTER.window candles. Symbols with fewer candles keep their last price.
     """
-    if len(prices) < 30:
-        return prices[-1] if prices else 0
+    symbols = list(closes)
+    if not symbols:
+        return {}
+    forecasts = FORECASTER.predict(kernels.align_right([closes[s] for s in symbols], FORECASTER.window))
+    return {
+        symbol: float(forecast) if np.isfinite(forecast) else float(closes[symbol][-1])
+        for symbol, forecast in zip(symbols, forecasts)
+    }
+
+# ═══════════════════════════════════════════════════════
+# ANALYSIS FUNCTIONS
+# ═══════════════════════════════════════════════════════
+BAR_FIELDS = ('open', 'high', 'low', 'close', 'volume')
+
+def query_bars(symbol: str, start: str = HISTORY, min_bars: int = 30) -> dict:
+    """Bars since `start` for one symbol as column arrays incl. 'time' (None if < min_bars / no bars)"""
+    query = f'''
+    from(bucket: "{INFLUX_BUCKET}")
+      |> range(start: {start}) 
+      |> filter(fn: (r) => r["_measurement"] == "stock_price")
+      |> filter(fn: (r) => r["symbol"] == "{symbol}")
+      |> pivot(rowKey:["_time"], columnKey: ["_field"], valueColumn: "_value")
+      |> keep(columns: ["_time", "symbol", "open", "high", "low", "close", "price", "volume"])
+    '''
     
-    data = prices[-30:]  # Last 30 candles
-    X = np.array(range(len(data))).reshape(-1, 1)
-    y = np.array(data)
+    query_started = time.time()
+    with QUERY_LATENCY.labels(symbol).time():
+        columns = query_columns(query_api, query, INFLUX_ORG, BAR_FIELDS + ('price',)).get(symbol)
+    query_timer['query'] += time.time() - query_started
     
-    model = LinearRegression()
-    model.fit(X, y)
+    if columns is None or len(columns['time']) < max(min_bars, 1):
+        return None
     
-    # Predict next step
-    next_index = np.array([[30]])
-    predicted = model.predict(next_index)[0]
+    # Tick cũ chỉ có 'price' -> dùng làm OHLC khi thiếu (hoặc = 0)
+    price = np.nan_to_num(columns['price'])
+    bars = {}
+    for field in ('open', 'high', 'low', 'close'):
+        values = columns[field]
+        bars[field] = np.where(np.isnan(values) | (values == 0), price, values)
+    bars['volume'] = np.nan_to_num(columns['volume'])
+    bars['time'] = columns['time']
     
-    return float(predicted)
+    DATA_LAG.observe(max(0.0, time.time() - float(columns['time'][-1])))
+    return bars
+
+def publish_result(result: dict, timestamp: datetime, alert: bool = False) -> Tuple[Point, bool]:
+    """
+    Telegram alert (if it passed the cooldown) + console output; returns the
+    signal point for the batched write and whether the alert was queued
+    """
+    symbol = result['symbol']
+    signal_type = result['signal']
+    price = result['price']
+    predicted_price = result['predicted']
+    
+    # ═══ 5. TELEGRAM ALERT ═══
+    queued = False
+    if alert:
+        print(f"{Colors.PURPLE}📱 Gửi Telegram: {symbol} - {signal_type}{Colors.RESET}")
+        queued = send_telegram(symbol, signal_type, price, result['rsi'], predicted_price)
+    
+    # ═══ 6. PRINT OUTPUT ═══
+    trend = "↑" if predicted_price > price else "↓"
+    if "STRONG" in signal_type:
+        color = Colors.GREEN if "BUY" in signal_type else Colors.RED
+        emoji = "🟢🟢" if "BUY" in signal_type else "🔴🔴"
+        print(f"  {color}{emoji} {symbol}: {signal_type} | Giá={price:,.0f} | AI={predicted_price:,.0f} {trend}{Colors.RESET}")
+    
+    point = Point("strategy_signal") \
+        .tag("symbol", symbol) \
+        .tag("signal_type", signal_type) \
+        .field("price", float(price)) \
+        .field("predicted_price", float(predicted_price)) \
+        .field("rsi", float(result['rsi'])) \
+        .field("macd", float(result['macd'])) \
+        .field("signal_score", int(result['score'])) \
+        .field("signal_text", signal_type) \
+        .field("reasons", "; ".join(result['reasons'])) \
+        .time(timestamp)
+    return point, queued
+
+def fetch_bars(symbols: list, plan: dict = None) -> dict:
+    """query_bars for each symbol; `plan` maps symbol -> (start, min_bars), default = full HISTORY"""
+    bars = {}
+    for symbol in symbols:
+        start, min_bars = (plan or {}).get(symbol, (HISTORY, 30))
+        try:
+            data = query_bars(symbol, start, min_bars)
+        except Exception as e:
+            ANALYSIS_ERRORS.labels(symbol).inc()
+            print(f"{Colors.YELLOW}⚠️ Lỗi {symbol}: {str(e)[:50]}{Colors.RESET}")
+            continue
+        if data is not None:
+            bars[symbol] = data
+    return bars
+
+def score_full(symbols: list) -> tuple:
+    """Full recompute over HISTORY for every symbol (in the process pool when ANALYST_WORKERS > 1)"""
+    bars = fetch_bars(symbols)
+    predictions = predict_prices({symbol: data['close'] for symbol, data in bars.items()})
+    return analysis_pool.map(partial(score_stock, predictions=predictions), bars, BAR_FIELDS)
 
 # ═══════════════════════════════════════════════════════
-# ANALYSIS FUNCTION
+# INCREMENTAL STATE
 # ═══════════════════════════════════════════════════════
-def analyze_stock(symbol: str) -> dict:
+STREAM_FIELDS = ('times', 'opens', 'highs', 'lows', 'prices')
+
+# Không checkpoint: restart = đọc lại HISTORY và tính lại toàn bộ
+indicator_state = StreamingIndicators(path='', max_gap=MAX_GAP)
+# Last FORECASTER.window (time, close) per symbol for the price prediction
+forecast_windows = {}
+bar_ring = {'ring': None}
+
+def ring_bars(symbol: str, since: int) -> dict:
+    """Bars after epoch `since` from the hunter's ring as analyst columns (None = not covered / no ring)"""
+    bar_ring['ring'] = open_ring(BAR_RING_PATH, bar_ring['ring'])
+    if bar_ring['ring'] is None:
+        return None
+    bars = bar_ring['ring'].since(symbol, since)
+    if bars is None or not len(bars):
+        return None
+    DATA_LAG.observe(max(0.0, time.time() - float(bars['time'][-1])))
+    return {field: bars[field] for field in BAR_FIELDS + ('time',)}
+
+def stream_columns(bars: dict) -> dict:
+    """analyst bar columns -> ai_engine.streaming column names"""
+    return {'times': bars['time'], 'opens': bars['open'], 'highs': bars['high'],
+            'lows': bars['low'], 'prices': bars['close']}
+
+def remember_closes(symbol: str, bars: dict):
+    """Append new closes to the forecast window; the forming bar is overwritten when it is read again"""
+    window = forecast_windows.setdefault(symbol, deque(maxlen=FORECASTER.window))
+    times, closes = bars['time'][-FORECASTER.window:], bars['close'][-FORECASTER.window:]
+    for t, close in zip(times.tolist(), closes.tolist()):
+        if window and t <= window[-1][0]:
+            if t == window[-1][0]:
+                window[-1] = (t, close)
+            continue
+        window.append((t, close))
+
+def score_incremental(symbols: list) -> tuple:
     """
-    Complete analysis with:
-    1. Technical indicators (RSI, MACD, BB)
-    2. AI Price Prediction
-    3. Telegram Alerts
+    Read and fold only bars newer than each symbol's watermark (from the bar
+    ring when it reaches back that far, else InfluxDB). Symbols seen for the
+    first time (or after a gap > MAX_GAP) are read over HISTORY and folded
+    from scratch in the analysis pool. Symbols without new bars are skipped.
     """
+    cold, warm, _ = indicator_state.plan(symbols)
+    bars = {}
+    plan = {}
+    for symbol in warm:
+        last_time = indicator_state.states[symbol].last_time
+        data = ring_bars(symbol, last_time)
+        if data is not None:
+            bars[symbol] = data
+            continue
+        since = datetime.fromtimestamp(last_time + 1, timezone.utc)
+        plan[symbol] = (since.strftime('%Y-%m-%dT%H:%M:%SZ'), 1)
+    for symbol in cold:
+        forecast_windows.pop(symbol, None)
     
-    query = f'''
-    from(bucket: "{INFLUX_BUCKET}")
-      |> range(start: -6h) 
-      |> filter(fn: (r) => r["_measurement"] == "stock_price")
-      |> filter(fn: (r) => r["symbol"] == "{symbol}")
-      |> pivot(rowKey:["_time"], columnKey: ["_field"], valueColumn: "_value")
-      |> sort(columns: ["_time"])
-    '''
+    bars.update(fetch_bars([s for s in symbols if s not in bars], plan))
+    for symbol, data in bars.items():
+        remember_closes(symbol, data)
+    
+    readings = {}
+    cold_bars = {symbol: stream_columns(bars[symbol]) for symbol in cold if symbol in bars}
+    folded, errors = analysis_pool.map(fold_cold, cold_bars, STREAM_FIELDS)
+    for symbol, (state, values) in folded.items():
+        indicator_state.adopt(symbol, state)
+        readings[symbol] = values
+    for symbol in warm:
+        if symbol in bars:
+            readings[symbol] = indicator_state.ingest(symbol, stream_columns(bars[symbol]))
+    
+    readings = {symbol: v for symbol, v in readings.items() if v is not None and v.bars >= 30}
+    predictions = predict_prices({symbol: [c for _, c in forecast_windows[symbol]] for symbol in readings})
+    scored = {
+        symbol: score_readings(symbol, v.price, predictions[symbol], v.rsi,
+                               v.bb_upper, v.bb_lower, v.macd, v.macd_signal)
+        for symbol, v in readings.items()
+    }
+    return scored, errors
+
+def analyze_stocks(symbols: list) -> list:
+    """
+    Score every symbol (incremental state or full recompute),
+    then alert and write all signals in one batch
+    """
+    scored, errors = score_incremental(symbols) if INCREMENTAL else score_full(symbols)
+    for symbol, error in errors.items():
+        ANALYSIS_ERRORS.labels(symbol).inc()
+        print(f"{Colors.YELLOW}⚠️ Lỗi {symbol}: {error[:50]}{Colors.RESET}")
     
+    timestamp = datetime.utcnow()
+    results = [scored[symbol] for symbol in symbols if symbol in scored]
+    
+    strong = [f"{r['symbol']}:{r['signal']}" for r in results if "STRONG" in r['signal']]
     try:
-        tables = query_api.query(query, org=INFLUX_ORG)
-        
-        # Convert to DataFrame
-        records = []
-        for table in tables:
-            for record in table.records:
-                records.append({
-                    'time': record.get_time(),
-                    'open': float(record.values.get('open', 0) or record.values.get('price', 0)),
-                    'high': float(record.values.get('high', 0) or record.values.get('price', 0)),
-                    'low': float(record.values.get('low', 0) or record.values.get('price', 0)),
-                    'close': float(record.values.get('close', 0) or record.values.get('price', 0)),
-                    'volume': float(record.values.get('volume', 0))
-                })
-        
-        if not records or len(records) < 30:
-            return None
-        
-        df = pd.DataFrame(records)
-        df = df.set_index('time')
-        
-        # ═══ 1. TÍNH TOÁN INDICATORS ═══
-        rsi_indicator = RSIIndicator(close=df['close'], window=14)
-        df['RSI'] = rsi_indicator.rsi()
-        
-        bb_indicator = BollingerBands(close=df['close'], window=20, window_dev=2)
-        df['BB_upper'] = bb_indicator.bollinger_hband()
-        df['BB_lower'] = bb_indicator.bollinger_lband()
-        
-        macd_indicator = MACD(close=df['close'], window_slow=26, window_fast=12, window_sign=9)
-        df['MACD'] = macd_indicator.macd()
-        df['MACD_signal'] = macd_indicator.macd_signal()
-        
-        last = df.iloc[-1]
-        price = last['close']
-        rsi = last.get('RSI', 50)
-        
-        # ═══ 2. AI PRICE PREDICTION ═══
-        prices_list = df['close'].tolist()
-        predicted_price = predict_next_price(prices_list)
-        
-        # ═══ 3. SIGNAL SCORING ═══
-        signal_score = 0
-        reasons = []
-        
-        # RSI Logic
-        if pd.notna(rsi):
-            if rsi < 30:
-                signal_score += 2
-                reasons.append(f"RSI={rsi:.1f} Quá bán")
-            elif rsi < 40:
-                signal_score += 1
-            elif rsi > 70:
-                signal_score -= 2
-                reasons.append(f"RSI={rsi:.1f} Quá mua")
-            elif rsi > 60:
-                signal_score -= 1
-        
-        # Bollinger Bands Logic
-        bb_lower = last.get('BB_lower', 0)
-        bb_upper = last.get('BB_upper', 0)
-        if pd.notna(bb_lower) and bb_lower > 0:
-            if price < bb_lower:
-                signal_score += 2
-                reasons.append("Giá chạm BB dưới")
-            elif price > bb_upper:
-                signal_score -= 2
-                reasons.append("Giá chạm BB trên")
-        
-        # AI Prediction Logic
-        if predicted_price > price * 1.002:  # AI predicts +0.2%
-            signal_score += 1
-            reasons.append(f"AI: +{((predicted_price-price)/price*100):.2f}%")
-        elif predicted_price < price * 0.998:  # AI predicts -0.2%
-            signal_score -= 1
-            reasons.append(f"AI: {((predicted_price-price)/price*100):.2f}%")
-        
-        # MACD Logic
-        macd_val = last.get('MACD', 0)
-        macd_sig = last.get('MACD_signal', 0)
-        if pd.notna(macd_val) and pd.notna(macd_sig):
-            if macd_val > macd_sig:
-                signal_score += 1
-            else:
-                signal_score -= 1
-        
-        # ═══ 4. DETERMINE SIGNAL ═══
-        if signal_score >= 4:
-            signal_type = "STRONG_BUY"
-            color = Colors.GREEN
-        elif signal_score >= 2:
-            signal_type = "BUY"
-            color = Colors.GREEN
-        elif signal_score <= -4:
-            signal_type = "STRONG_SELL"
-            color = Colors.RED
-        elif signal_score <= -2:
-            signal_type = "SELL"
-            color = Colors.RED
-        else:
-            signal_type = "NEUTRAL"
-            color = Colors.YELLOW
-        
-        # ═══ 5. TELEGRAM ALERT (COOLDOWN) ═══
-        now = time.time()
-        if "STRONG" in signal_type:
-            last_sent = last_alert_time.get(symbol, 0)
-            if now - last_sent > ALERT_COOLDOWN:
-                print(f"{Colors.PURPLE}📱 Gửi Telegram: {symbol} - {signal_type}{Colors.RESET}")
-                send_telegram(symbol, signal_type, price, rsi if pd.notna(rsi) else 50, predicted_price)
-                last_alert_time[symbol] = now
-        
-        # ═══ 6. WRITE TO DATABASE ═══
-        point = Point("strategy_signal") \
-            .tag("symbol", symbol) \
-            .tag("signal_type", signal_type) \
-            .field("price", float(price)) \
-            .field("predicted_price", float(predicted_price)) \
-            .field("rsi", float(rsi) if pd.notna(rsi) else 50.0) \
-            .field("macd", float(macd_val) if pd.notna(macd_val) else 0.0) \
-            .field("signal_score", int(signal_score)) \
-            .field("signal_text", signal_type) \
-            .field("reasons", "; ".join(reasons)) \
-            .time(datetime.utcnow())
-        
-        write_api.write(bucket=INFLUX_BUCKET, org=INFLUX_ORG, record=point)
-        
-        # ═══ 7. PRINT OUTPUT ═══
-        trend = "↑" if predicted_price > price else "↓"
-        if "STRONG" in signal_type:
-            emoji = "🟢🟢" if "BUY" in signal_type else "🔴🔴"
-            print(f"  {color}{emoji} {symbol}: {signal_type} | Giá={price:,.0f} | AI={predicted_price:,.0f} {trend}{Colors.RESET}")
-        
-        return {
-            'symbol': symbol,
-            'signal': signal_type,
-            'score': signal_score,
-            'price': price,
-            'predicted': predicted_price,
-            'rsi': rsi if pd.notna(rsi) else 50,
-            'reasons': reasons
-        }
-        
+        alerts = acquire_cooldowns(strong)
     except Exception as e:
-        print(f"{Colors.YELLOW}⚠️ Lỗi {symbol}: {str(e)[:50]}{Colors.RESET}")
-        return None
+        alerts = set()  # Không xác định được cooldown -> không gửi (tránh spam)
+        print(f"{Colors.RED}❌ Lỗi cooldown store: {str(e)[:80]}{Colors.RESET}")
+    points = []
+    unsent = []
+    for r in results:
+        key = f"{r['symbol']}:{r['signal']}"
+        point, queued = publish_result(r, timestamp, key in alerts)
+        points.append(point)
+        if key in alerts and not queued:
+            unsent.append(key)
+    # Cảnh báo không vào được hàng đợi -> trả cooldown, cycle sau gửi lại
+    try:
+        release_cooldowns(unsent)
+    except Exception as e:
+        print(f"{Colors.RED}❌ Lỗi cooldown store: {str(e)[:80]}{Colors.RESET}")
+    if points:
+        try:
+            with WRITE_LATENCY.time():
+                write_api.write(bucket=INFLUX_BUCKET, org=INFLUX_ORG, record=points)
+        except Exception as e:
+            WRITE_ERRORS.inc()
+            print(f"{Colors.RED}❌ Lỗi ghi {len(points)} tín hiệu: {str(e)[:80]}{Colors.RESET}")
+    return results
 
 # ═══════════════════════════════════════════════════════
 # MAIN LOOP
@@ -322,30 +574,34 @@ def analyze_stock(symbol: str) -> dict:
 def main_loop():
     """Main analysis loop with AI prediction"""
     cycle = 0
+    symbols = VN30_STOCKS
     
     while True:
         cycle += 1
         start_time = time.time()
         
         print(f"\n{Colors.CYAN}{'═'*55}")
-        print(f"      🔮 ORACLE SCANNING - Cycle #{cycle}")
+        print(f"      🔮 ORACLE SCANNING - Cycle #{cycle} · {len(symbols)} mã")
         print(f"{'═'*55}{Colors.RESET}")
         
         buy_signals = []
         sell_signals = []
         predictions = []
+        query_timer['query'] = 0.0
         
-        for symbol in VN30_STOCKS:
-            result = analyze_stock(symbol)
-            
-            if result:
-                predictions.append(result)
-                if "BUY" in result['signal']:
-                    buy_signals.append(result)
-                elif "SELL" in result['signal']:
-                    sell_signals.append(result)
+        for result in analyze_stocks(symbols):
+            predictions.append(result)
+            if "BUY" in result['signal']:
+                buy_signals.append(result)
+            elif "SELL" in result['signal']:
+                sell_signals.append(result)
         
         elapsed = time.time() - start_time
+        CYCLE_DURATION.labels('query').observe(query_timer['query'])
+        CYCLE_DURATION.labels('compute').observe(elapsed - query_timer['query'])
+        CYCLE_DURATION.labels('total').observe(elapsed)
+        if bar_events.last_event and bar_events.last_event.get('published'):
+            EVENT_LATENCY.observe(max(0.0, time.time() - bar_events.last_event['published']))
         
         # Summary
         print(f"\n{Colors.BOLD}📊 TỔNG KẾT:{Colors.RESET}")
@@ -364,16 +620,24 @@ def main_loop():
             print(f"{Colors.RED}⚠️ TOP BÁN: {top_sell['symbol']} (Score: {top_sell['score']:+d})")
             print(f"   💰 Giá: {top_sell['price']:,.0f} → AI: {top_sell['predicted']:,.0f}{Colors.RESET}")
         
-        print(f"\n⏳ Đợi 60s cho nến tiếp theo...")
-        time.sleep(60)
+        print(f"\n⏳ Đợi nến tiếp theo (bar event hoặc {POLL_INTERVAL:.0f}s)...")
+        symbols = bar_events.wait_for(VN30_STOCKS, POLL_INTERVAL)
 
 # ═══════════════════════════════════════════════════════
 # ENTRY POINT
 # ═══════════════════════════════════════════════════════
 if __name__ == "__main__":
+    # Workers start before the Telegram / metrics threads
+    analysis_pool = PanelPool(ANALYST_WORKERS)
+    telegram_thread = start_telegram()
+    metrics.start_metrics_server(METRICS_PORT, 'analyst',
+                                 info=lambda msg: print(f"{Colors.CYAN}{msg}{Colors.RESET}"),
+                                 warning=lambda msg: print(f"{Colors.YELLOW}⚠️ {msg}{Colors.RESET}"))
     try:
         main_loop()
     except KeyboardInterrupt:
         print(f"\n{Colors.YELLOW}👋 Oracle đã dừng.{Colors.RESET}")
     finally:
+        analysis_pool.close()
+        stop_telegram(telegram_thread)
         client.close()
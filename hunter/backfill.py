@@ -0,0 +1,263 @@
+#!/usr/bin/env python3
+"""
+VN30-Quantum Hunter - Historical Backfill
+Parallel, resumable load of `history_days` of 1m bars into InfluxDB
+
+Usage:
+    python backfill.py                      # HISTORY_DAYS of bars for SYMBOL_UNIVERSE
+    python backfill.py --days 5 --symbols FPT,VNM
+    python backfill.py --reset              # ignore the checkpoint and start over
+"""
+import argparse
+import asyncio
+import json
+import os
+import time
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta
+from typing import Iterable, List, Set
+
+from config import (
+    hunter_config, influx_config, writer_config,
+    log_error, log_header, log_info, log_success, log_warning
+)
+from collector import VN_TZ, bars_to_points
+from data_sources import BARS_PER_SESSION, DataSource, create_data_source
+from influx_writer import writer_from_config
+from rate_limit import TokenBucket
+from scheduler import HoseCalendar
+from universe import load_universe
+
+# Backfill ghi theo lô lớn hơn nhiều so với chu kỳ realtime
+BACKFILL_WRITE_BATCH = 20_000
+
+CHECKPOINT_FLUSH_SECONDS = 5.0
+# Chunk chỉ vào checkpoint khi writer đã xả hết (vào InfluxDB hoặc spill file)
+FLUSH_TIMEOUT = 120.0
+FINAL_COMMIT_ATTEMPTS = 3
+
+
+@dataclass(frozen=True)
+class Chunk:
+    """One unit of backfill work: a symbol over a run of trading days"""
+    symbol: str
+    days: tuple
+
+    @property
+    def key(self) -> str:
+        return f"{self.symbol}:{self.days[0].isoformat()}:{self.days[-1].isoformat()}"
+
+    @property
+    def start(self) -> datetime:
+        return datetime.combine(self.days[0], datetime.min.time(), VN_TZ)
+
+    @property
+    def end(self) -> datetime:
+        return datetime.combine(self.days[-1] + timedelta(days=1), datetime.min.time(), VN_TZ)
+
+
+def plan_chunks(symbols: Iterable[str], days: int, chunk_days: int,
+                calendar: HoseCalendar, today: date = None) -> List[Chunk]:
+    """Split (symbol, date range) into chunks of `chunk_days` trading days"""
+    today = today or datetime.now(VN_TZ).date()
+    trading_days = [today - timedelta(days=offset) for offset in range(days, -1, -1)]
+    trading_days = [d for d in trading_days if calendar.is_trading_day(d)]
+
+    chunks = []
+    for symbol in symbols:
+        for i in range(0, len(trading_days), chunk_days):
+            chunks.append(Chunk(symbol, tuple(trading_days[i:i + chunk_days])))
+    return chunks
+
+
+class Checkpoint:
+    """Set of completed chunk keys, persisted atomically (tmp file + rename)"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.done: Set[str] = set()
+        if os.path.exists(path):
+            with open(path) as f:
+                self.done = set(json.load(f).get('done', []))
+
+    def save(self, keys: Iterable[str]):
+        self.done.update(keys)
+        os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+        tmp_path = self.path + '.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump({'done': sorted(self.done), 'updated': datetime.now().isoformat()}, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.path)
+
+    def reset(self):
+        self.done = set()
+        if os.path.exists(self.path):
+            os.remove(self.path)
+
+
+class Backfill:
+    """
+    Fetches chunks concurrently on one event loop and streams bars into a
+    large-batch InfluxBatchWriter. A chunk is only checkpointed after the
+    writer has flushed it (to InfluxDB or its spill file), so a crash at
+    any point resumes without gaps; re-fetched chunks overwrite in place.
+    """
+
+    def __init__(self, source: DataSource, writer, checkpoint: Checkpoint,
+                 bucket: str, concurrency: int, request_interval: float):
+        self.source = source
+        self.writer = writer
+        self.checkpoint = checkpoint
+        self.bucket = bucket
+        self.request_interval = request_interval
+        self._semaphore = asyncio.Semaphore(concurrency)
+        self._limiter = TokenBucket.from_delay(request_interval)
+        self._completed: List[str] = []
+        self._last_checkpoint = time.time()
+        self.bars = 0
+        self.failed: List[Chunk] = []
+        # Chunk có dòng bị bỏ vì spill file đầy: không ghi checkpoint, lần chạy sau nạp lại
+        self.lost: List[str] = []
+        self._spill_dropped = writer.stats.spill_dropped
+
+    async def run_chunk(self, chunk: Chunk):
+        count_back = len(chunk.days) * BARS_PER_SESSION + 10
+        try:
+            async with self._semaphore:
+                await self._limiter.acquire()
+                df = await self.source.fetch_bars(
+                    chunk.symbol, count_back=count_back, to=int(chunk.end.timestamp())
+                )
+        except Exception as e:
+            log_warning(f"Lỗi {chunk.key}: {str(e)[:60]}")
+            self.failed.append(chunk)
+            return
+
+        if not df.empty:
+            df = df[(df['time'] >= chunk.start) & (df['time'] < chunk.end)]
+            points = bars_to_points(chunk.symbol, df)
+            self.writer.write(self.bucket, record=points)
+            self.bars += len(points)
+
+        self._completed.append(chunk.key)
+        if time.time() - self._last_checkpoint >= CHECKPOINT_FLUSH_SECONDS:
+            await self.commit()
+
+    async def commit(self) -> bool:
+        """
+        Flush the writer, then persist the chunks it covered. If the flush
+        times out the chunks stay pending (not checkpointed) for the next try;
+        if the writer dropped lines because its spill file was full, they are
+        never checkpointed, so a rerun re-fetches them.
+        """
+        keys, self._completed = self._completed, []
+        self._last_checkpoint = time.time()
+        if not keys:
+            return True
+        flushed = await asyncio.to_thread(self.writer.flush, FLUSH_TIMEOUT)
+        dropped = self.writer.stats.spill_dropped - self._spill_dropped
+        if dropped:
+            self._spill_dropped += dropped
+            self.lost.extend(keys)
+            log_error(f"Spill file đầy - bỏ {dropped} dòng, {len(keys)} chunk không ghi checkpoint")
+            return False
+        if not flushed:
+            self._completed = keys + self._completed
+            log_warning(f"Writer chưa xả xong sau {FLUSH_TIMEOUT:.0f}s - "
+                        f"{len(keys)} chunk chưa ghi checkpoint, thử lại sau")
+            return False
+        self.checkpoint.save(keys)
+        return True
+
+    async def run(self, chunks: List[Chunk]) -> bool:
+        """False if some chunks could not be checkpointed (a rerun re-fetches them)"""
+        await asyncio.gather(*(self.run_chunk(chunk) for chunk in chunks))
+        for _ in range(FINAL_COMMIT_ATTEMPTS):
+            if await self.commit():
+                return not self.lost
+        return False
+
+
+async def run_backfill(args) -> int:
+    if args.symbols:
+        symbols = [s.strip().upper() for s in args.symbols.split(',')]
+    else:
+        symbols = load_universe(hunter_config.symbol_universe, cache_dir=writer_config.spill_dir,
+                                provider=hunter_config.vnstock_provider)
+    checkpoint = Checkpoint(args.checkpoint)
+    if args.reset:
+        checkpoint.reset()
+
+    chunks = plan_chunks(symbols, args.days, args.chunk_days, HoseCalendar())
+    pending = [c for c in chunks if c.key not in checkpoint.done]
+
+    log_header("VN30-QUANTUM BACKFILL")
+    log_info(f"{len(symbols)} mã × {args.days} ngày → {len(chunks)} chunk "
+             f"({len(chunks) - len(pending)} đã xong, {len(pending)} còn lại)")
+    log_info(f"Song song: {args.concurrency} | Giãn cách request: {args.request_interval}s")
+    if not pending:
+        log_success("Không còn gì để backfill")
+        return 0
+
+    if hunter_config.data_source.lower() == 'replay':
+        log_error("Backfill cần nguồn dữ liệu live (DATA_SOURCE=tcbs | vnstock)")
+        return 1
+    source = create_data_source(
+        hunter_config.data_source,
+        pool_size=max(args.concurrency, 1),
+        timeout=hunter_config.request_timeout,
+        vnstock_provider=hunter_config.vnstock_provider
+    )
+    writer = writer_from_config(
+        influx_config.url, influx_config.token, influx_config.org,
+        name='backfill', batch_size=BACKFILL_WRITE_BATCH
+    )
+    backfill = Backfill(source, writer, checkpoint, influx_config.bucket,
+                        args.concurrency, args.request_interval)
+    started = time.time()
+    try:
+        await source.start()
+        committed = await backfill.run(pending)
+    finally:
+        await source.close()
+        writer.close()
+
+    elapsed = time.time() - started
+    log_success(f"Đã nạp {backfill.bars:,} nến trong {elapsed:.1f}s "
+                f"({backfill.bars / max(elapsed, 1e-9):,.0f} nến/s)")
+    if backfill.failed:
+        log_error(f"{len(backfill.failed)} chunk lỗi - chạy lại lệnh để tiếp tục từ checkpoint")
+        return 1
+    if backfill.lost:
+        log_error(f"{len(backfill.lost)} chunk mất dữ liệu do spill file đầy - chạy lại lệnh để nạp lại")
+        return 1
+    if not committed:
+        log_error("Chưa ghi được checkpoint cho các chunk cuối - chạy lại lệnh để nạp lại")
+        return 1
+    return 0
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Backfill 1m bars into InfluxDB")
+    parser.add_argument('--days', type=int, default=hunter_config.history_days,
+                        help="Calendar days of history (default: HISTORY_DAYS)")
+    parser.add_argument('--symbols', type=str, default='',
+                        help="Comma-separated symbols (default: SYMBOL_UNIVERSE)")
+    parser.add_argument('--chunk-days', type=int, default=hunter_config.batch_size,
+                        help="Trading days per fetch chunk (default: BATCH_SIZE)")
+    parser.add_argument('--concurrency', type=int, default=hunter_config.max_concurrency,
+                        help="Concurrent requests (default: MAX_CONCURRENCY)")
+    parser.add_argument('--request-interval', type=float, default=hunter_config.rate_limit_delay,
+                        help="Min seconds between request starts (default: RATE_LIMIT_DELAY)")
+    parser.add_argument('--checkpoint', type=str,
+                        default=os.path.join(writer_config.spill_dir, 'backfill_checkpoint.json'))
+    parser.add_argument('--reset', action='store_true', help="Ignore and clear the checkpoint")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    try:
+        exit(asyncio.run(run_backfill(parse_args())))
+    except KeyboardInterrupt:
+        log_warning("Backfill đã dừng - chạy lại để tiếp tục từ checkpoint")
@@ -0,0 +1,95 @@
+"""
+VN30-Quantum Hunter - Bar Events
+Publishing side of the bar event channel (format and subscriber: ai_engine/bar_events.py)
+"""
+import queue
+import threading
+from datetime import datetime
+from typing import Iterable, List, Optional, Set
+
+from config import log_info, log_warning
+from ai_engine.bar_events import REDIS_AVAILABLE, encode_event
+
+if REDIS_AVAILABLE:
+    import redis
+
+
+class BarPublisher:
+    """
+    Publishes bar events once the writer has actually landed the bars
+
+    The hunter cycle only enqueues; a background thread flushes the writer
+    (which sends immediately instead of waiting out its batching window),
+    then publishes. Nothing is published while InfluxDB is down - the bars
+    are in the spill file, not queryable, and subscribers fall back to
+    their polling interval.
+    """
+
+    def __init__(self, url: str, channel: str, writer, source: str = 'hunter', flush_timeout: float = 30.0):
+        self.channel = channel
+        self.writer = writer
+        self.source = source
+        self.flush_timeout = flush_timeout
+        self.published = 0
+        self._redis = redis.Redis.from_url(url) if (url and REDIS_AVAILABLE) else None
+        self._pending: "queue.Queue[Optional[tuple]]" = queue.Queue()
+        self._error_logged = False
+        self._thread = None
+        if self._redis is not None:
+            self._thread = threading.Thread(target=self._run, name=f'{source}-bar-events', daemon=True)
+            self._thread.start()
+            log_info(f"📣 Bar events → redis {channel}")
+        elif url:
+            log_warning("REDIS_URL đã đặt nhưng thiếu thư viện redis - tắt bar events")
+
+    @property
+    def enabled(self) -> bool:
+        return self._redis is not None
+
+    def publish(self, symbols: Iterable[str], bar_time: Optional[datetime] = None):
+        """Queue a notification for bars just handed to the writer (never blocks)"""
+        symbols = list(symbols)
+        if self.enabled and symbols:
+            self._pending.put((symbols, bar_time))
+
+    def close(self):
+        if self._thread is not None:
+            self._pending.put(None)
+            self._thread.join(timeout=self.flush_timeout)
+
+    def _run(self):
+        while True:
+            item = self._pending.get()
+            if item is None:
+                return
+            symbols, bar_time = set(item[0]), item[1]
+            # Các cycle dồn lại (ví dụ replay nhanh) -> một lần flush, một sự kiện
+            stop = False
+            while not self._pending.empty():
+                more = self._pending.get_nowait()
+                if more is None:
+                    stop = True
+                    break
+                symbols.update(more[0])
+                bar_time = max(filter(None, (bar_time, more[1])), default=None)
+
+            if self.writer.flush(self.flush_timeout) and self.writer.healthy:
+                self._send(symbols, bar_time)
+            if stop:
+                return
+
+    def _send(self, symbols: Set[str], bar_time: Optional[datetime]):
+        try:
+            self._redis.publish(self.channel, encode_event(symbols, bar_time, self.source))
+            self.published += 1
+            self._error_logged = False
+        except redis.RedisError as e:
+            if not self._error_logged:
+                log_warning(f"Không publish được bar event: {str(e)[:80]}")
+                self._error_logged = True
+
+
+def newest_bar_time(points: List) -> Optional[datetime]:
+    """Newest bar time among the cycle's bar points (collector.BarPoint)"""
+    times = [p.bar_time for p in points if getattr(p, 'bar_time', None) is not None]
+    return max(times) if times else None
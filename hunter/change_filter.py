@@ -0,0 +1,75 @@
+"""
+VN30-Quantum Hunter - Change Detection
+Suppresses InfluxDB writes whose values haven't changed since the last write
+"""
+import hashlib
+import re
+import threading
+import time
+from typing import Dict, FrozenSet, Optional, Tuple
+
+# Measurements whose timestamp is the bar time: a new bar is always new data.
+# Everything else (signals, health) is a snapshot stamped at write time.
+BAR_MEASUREMENTS: FrozenSet[str] = frozenset({'stock_price'})
+
+# Dấu phẩy / dấu bằng / khoảng trắng không bị escape (tách measurement, tag, field set, timestamp)
+_UNESCAPED_COMMA = re.compile(r'(?<!\\),')
+_UNESCAPED_EQUALS = re.compile(r'(?<!\\)=')
+_UNESCAPED_SPACE = re.compile(r'(?<!\\) ')
+
+
+def split_line(line: str) -> Tuple[str, Dict[str, str], str, Optional[str]]:
+    """
+    Split one line protocol record into (measurement, tags, field set, timestamp)
+    The timestamp is None when the line carries none.
+    """
+    series, rest = _UNESCAPED_SPACE.split(line, 1)
+    measurement, *tags = _UNESCAPED_COMMA.split(series)
+    fields, sep, timestamp = rest.rpartition(' ')
+    # Field set luôn chứa '=' ở token cuối (chuỗi kết thúc bằng '"') -> token toàn số là timestamp
+    if not sep or not timestamp.isdigit():
+        fields, timestamp = rest, None
+    return measurement, dict(_UNESCAPED_EQUALS.split(tag, 1) for tag in tags), fields, timestamp
+
+
+class ChangeFilter:
+    """
+    Per-(measurement, symbol) cache of an 8-byte hash of the last written values
+
+    Works on the serialized line protocol. A line is written when its hash
+    differs from the cached one, or when `heartbeat` seconds have passed
+    since that key was last written, so "last value" panels never go stale.
+    For bar measurements the bar time is part of the hash (the
+    still-forming bar is only rewritten when it changes); for snapshots
+    the write time is ignored.
+    """
+
+    def __init__(self, heartbeat: float = 300.0, bar_measurements: FrozenSet[str] = BAR_MEASUREMENTS):
+        self.heartbeat = heartbeat
+        self.bar_measurements = bar_measurements
+        self._last: Dict[Tuple[str, str], Tuple[bytes, float]] = {}
+        self._lock = threading.Lock()
+        self.suppressed = 0
+
+    def should_write(self, line: str, now: Optional[float] = None) -> bool:
+        now = time.time() if now is None else now
+        measurement, tags, fields, timestamp = split_line(line)
+        key = (measurement, tags.get('symbol') or self._tag_key(tags))
+        digest = self._digest(line if measurement in self.bar_measurements
+                              else f"{measurement},{self._tag_key(tags)} {fields}")
+
+        with self._lock:
+            last = self._last.get(key)
+            if last is not None and last[0] == digest and now - last[1] < self.heartbeat:
+                self.suppressed += 1
+                return False
+            self._last[key] = (digest, now)
+            return True
+
+    @staticmethod
+    def _digest(text: str) -> bytes:
+        return hashlib.blake2b(text.encode('utf-8'), digest_size=8).digest()
+
+    @staticmethod
+    def _tag_key(tags: Dict[str, str]) -> str:
+        return ','.join(f"{k}={v}" for k, v in sorted(tags.items()))
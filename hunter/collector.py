@@ -0,0 +1,148 @@
+"""
+VN30-Quantum Hunter - Async Collector Engine
+One event loop, one long-lived data source, bounded concurrency per cycle
+"""
+import asyncio
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional, Tuple
+
+import pandas as pd
+from influxdb_client import Point
+
+from watermark import WatermarkStore
+from rate_limit import UpstreamGuard
+from metrics import BARS_INGESTED, FETCH_LATENCY, RATE_LIMIT_WAIT, observe_bar_lag
+
+# Giờ Việt Nam (UTC+7, không có DST)
+VN_TZ = timezone(timedelta(hours=7))
+
+# Một phiên HOSE có ~270 nến 1 phút -> countBack mặc định đủ cho cả ngày
+INTRADAY_COUNT_BACK = 300
+
+BAR_COLUMNS = ['time', 'open', 'high', 'low', 'close', 'volume']
+
+
+def normalize_bars(df: Optional[pd.DataFrame]) -> pd.DataFrame:
+    """
+    Normalize a bar frame (TCBS `tradingDate` or vnstock `time`) to
+    (time, open, high, low, close, volume) with UTC bar timestamps.
+    Naive timestamps are exchange-local (Asia/Ho_Chi_Minh).
+    """
+    if df is None or df.empty:
+        return pd.DataFrame(columns=BAR_COLUMNS)
+
+    df = df.copy()
+    times = pd.to_datetime(df['tradingDate'] if 'tradingDate' in df else df['time'])
+    if times.dt.tz is None:
+        times = times.dt.tz_localize(VN_TZ)
+    df['time'] = times.dt.tz_convert(timezone.utc)
+
+    for col in ('open', 'high', 'low', 'close', 'volume'):
+        if col not in df:
+            df[col] = df['close']
+        df[col] = df[col].astype(float)
+
+    return df[BAR_COLUMNS].sort_values('time').reset_index(drop=True)
+
+
+def bars_to_frame(rows: List[dict]) -> pd.DataFrame:
+    """Convert raw TCBS bar rows to a normalized bar frame"""
+    return normalize_bars(pd.DataFrame(rows))
+
+
+class BarPoint(Point):
+    """
+    stock_price Point that keeps the bar it was built from: `symbol`,
+    `bar_time` and `bar` = (epoch s, open, high, low, close, volume),
+    so the ring mirror and bar events never read Point internals
+    """
+
+    def __init__(self, symbol: str, bar: Tuple[int, float, float, float, float, float],
+                 timestamp: datetime):
+        super().__init__("stock_price")
+        self.symbol = symbol
+        self.bar = bar
+        self.bar_time = timestamp
+        _, open_, high, low, close, volume = bar
+        self.tag("symbol", symbol) \
+            .tag("market", "VN30") \
+            .field("price", close) \
+            .field("open", open_) \
+            .field("high", high) \
+            .field("low", low) \
+            .field("close", close) \
+            .field("volume", volume) \
+            .time(timestamp)
+
+
+def bar_to_point(symbol: str, bar, timestamp: datetime) -> BarPoint:
+    """Build the stock_price Point for one OHLCV bar"""
+    price = float(bar['close'])
+    return BarPoint(symbol, (
+        int(timestamp.timestamp()),
+        float(bar['open']) if 'open' in bar else price,
+        float(bar['high']) if 'high' in bar else price,
+        float(bar['low']) if 'low' in bar else price,
+        price,
+        float(bar['volume']),
+    ), timestamp)
+
+
+def bars_to_points(symbol: str, df: pd.DataFrame) -> List[BarPoint]:
+    """One Point per bar, stamped with the bar's own time"""
+    return [bar_to_point(symbol, bar, bar['time'].to_pydatetime())
+            for _, bar in df.iterrows()]
+
+
+# ═══════════════════════════════════════════════════════
+# COLLECTOR
+# ═══════════════════════════════════════════════════════
+def bars_for_cycle(symbol: str, df: pd.DataFrame, watermarks: WatermarkStore,
+                   now=None) -> List[BarPoint]:
+    """Record freshness of a fetched frame and turn its new bars into points"""
+    if df is not None and not df.empty:
+        observe_bar_lag(symbol, df['time'].iloc[-1], now)
+    points = bars_to_points(symbol, watermarks.new_bars(symbol, df))
+    BARS_INGESTED.inc(len(points))
+    return points
+
+
+class AsyncCollector:
+    """
+    Fan out one cycle of symbol fetches on the running event loop
+    Concurrency is bounded by a semaphore instead of a thread count,
+    so hundreds of symbols cost coroutines, not threads. Every request
+    takes a token from the shared limiter, and symbols whose breaker is
+    open are skipped until their cooldown ends.
+    """
+
+    def __init__(self, source, watermarks: WatermarkStore, guard: UpstreamGuard,
+                 max_concurrency: int = 16):
+        self.source = source
+        self.watermarks = watermarks
+        self.guard = guard
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+
+    async def fetch_symbol(self, symbol: str) -> List[BarPoint]:
+        """Fetch bars newer than the symbol's watermark, [] on error or no new data"""
+        if not self.guard.allow(symbol):
+            return []
+
+        count_back = self.watermarks.count_back(symbol, INTRADAY_COUNT_BACK, self.source.now())
+        try:
+            async with self._semaphore:
+                RATE_LIMIT_WAIT.observe(await self.guard.limiter.acquire())
+                with FETCH_LATENCY.labels(symbol).time():
+                    df = await self.source.fetch_bars(symbol, count_back=count_back)
+        except Exception as e:
+            self.guard.on_error(symbol, e)
+            return []
+
+        self.guard.on_success(symbol)
+        return bars_for_cycle(symbol, df, self.watermarks, self.source.now())
+
+    async def collect(self, symbols: List[str]) -> Dict[str, List[BarPoint]]:
+        """Run one collection cycle, returning new points per symbol"""
+        self.guard.reset_cycle()
+        results = await asyncio.gather(*(self.fetch_symbol(s) for s in symbols))
+        return {symbol: points for symbol, points in zip(symbols, results) if points}
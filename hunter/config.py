@@ -4,7 +4,7 @@ Centralized config for all VN30 stocks
 """
 import os
 from dataclasses import dataclass
-from typing import List
+from typing import List, Optional
 
 # VN30 Index Components (30 stocks)
 VN30_STOCKS: List[str] = [
@@ -14,6 +14,14 @@ VN30_STOCKS: List[str] = [
     "SSI", "REE", "KDH", "PDR", "PNJ", "ACB"
 ]
 
+# Rổ VN30 hiện hành mà hunter thu thập (VN30_STOCKS giữ thứ tự cũ cho backend)
+HUNTER_STOCKS: List[str] = [
+    "ACB", "BCM", "BID", "BVH", "CTG", "FPT", "GAS", "GVR",
+    "HDB", "HPG", "MBB", "MSN", "MWG", "PLX", "POW", "SAB",
+    "SHB", "SSB", "SSI", "STB", "TCB", "TPB", "VCB", "VHM",
+    "VIB", "VIC", "VJC", "VNM", "VPB", "VRE"
+]
+
 @dataclass
 class InfluxConfig:
     """InfluxDB configuration"""
@@ -29,7 +37,54 @@ class HunterConfig:
     refresh_interval: int = int(os.getenv('REFRESH_INTERVAL', '60'))
     history_days: int = int(os.getenv('HISTORY_DAYS', '30'))
     batch_size: int = int(os.getenv('BATCH_SIZE', '5'))
+    # Upstream budget: one request per rate_limit_delay s across all workers, so
+    # symbols × rate_limit_delay must fit in refresh_interval or the hunter refuses
+    # to start (full ~1,600-symbol universe at 60s: ≤ 0.0375s, ~27 req/s upstream)
     rate_limit_delay: float = float(os.getenv('RATE_LIMIT_DELAY', '0.5'))
+    # Collector engine: "async" (one event loop + pooled HTTP) or "thread" (legacy vnstock)
+    collector_mode: str = os.getenv('COLLECTOR_MODE', 'async')
+    max_concurrency: int = int(os.getenv('MAX_CONCURRENCY', '16'))
+    http_pool_size: int = int(os.getenv('HTTP_POOL_SIZE', '32'))
+    request_timeout: float = float(os.getenv('REQUEST_TIMEOUT', '10'))
+    # Market data: "tcbs" (async HTTP), "vnstock" (alternate provider) or "replay" (local files)
+    data_source: str = os.getenv('DATA_SOURCE', 'tcbs')
+    vnstock_provider: str = os.getenv('VNSTOCK_PROVIDER', 'VCI')
+    replay_path: str = os.getenv('REPLAY_PATH', './replay')
+    replay_speed: float = float(os.getenv('REPLAY_SPEED', '1'))
+    replay_start: str = os.getenv('REPLAY_START', '')
+    # Replay ghi vào bucket riêng: bar cũ không lẫn vào market_data, watermark bắt đầu trống
+    replay_bucket: str = os.getenv('REPLAY_BUCKET', 'replay')
+    # Upstream protection: token bucket (1 token / rate_limit_delay s) + per-symbol breakers
+    rate_limit_burst: float = float(os.getenv('RATE_LIMIT_BURST', '30'))
+    breaker_threshold: int = int(os.getenv('BREAKER_THRESHOLD', '3'))
+    breaker_cooldown: float = float(os.getenv('BREAKER_COOLDOWN', '60'))
+    breaker_max_cooldown: float = float(os.getenv('BREAKER_MAX_COOLDOWN', '1800'))
+    # Sharding: SYMBOL_UNIVERSE = vn30 | all | HOSE,HNX,UPCOM | file, split over HUNTER_WORKERS processes
+    symbol_universe: str = os.getenv('SYMBOL_UNIVERSE', 'vn30')
+    workers: int = int(os.getenv('HUNTER_WORKERS', '1'))
+    shard_id: str = os.getenv('SHARD_ID', '')
+    shard_file: str = os.getenv('SHARD_FILE', os.path.join(os.getenv('SPILL_DIR', './spill'), 'shards.json'))
+    # Prometheus /metrics port (0 = off); sharded workers use metrics_port + shard index
+    metrics_port: int = int(os.getenv('METRICS_PORT', '9101'))
+    # Bar events: "bars written" notifications on Redis pub/sub (empty REDIS_URL = off)
+    redis_url: str = os.getenv('REDIS_URL', '')
+    bar_channel: str = os.getenv('BAR_EVENTS_CHANNEL', 'vn30:bars')
+    # Shared bar ring: last bar_ring_size bars per symbol in a mmap file read by signal agent / analyst ('' = off)
+    bar_ring_path: str = os.getenv('BAR_RING_PATH', '')
+    bar_ring_size: int = int(os.getenv('BAR_RING_SIZE', '512'))
+    # Scheduler: wake `bar_settle_delay`s after each bar closes, park outside HOSE sessions
+    session_aware: bool = os.getenv('SESSION_AWARE', 'true').lower() == 'true'
+    bar_settle_delay: float = float(os.getenv('BAR_SETTLE_DELAY', '2'))
+    
+    def upstream_budget_error(self, symbol_count: int) -> Optional[str]:
+        """Why `symbol_count` symbols can't all be polled every refresh_interval (None = they fit)"""
+        cycle = symbol_count * self.rate_limit_delay
+        if cycle <= self.refresh_interval:
+            return None
+        return (f"{symbol_count} mã × RATE_LIMIT_DELAY={self.rate_limit_delay}s = {cycle:.0f}s/cycle "
+                f"> REFRESH_INTERVAL={self.refresh_interval}s - cần RATE_LIMIT_DELAY ≤ "
+                f"{self.refresh_interval / symbol_count:.4f}s (≥ {symbol_count / self.refresh_interval:.1f} req/s upstream), "
+                f"tăng REFRESH_INTERVAL hoặc thu hẹp SYMBOL_UNIVERSE")
     
     def __post_init__(self):
         if self.stocks is None:
@@ -40,9 +95,23 @@ class HunterConfig:
             else:
                 self.stocks = VN30_STOCKS
 
+@dataclass
+class WriterConfig:
+    """Background InfluxDB writer configuration"""
+    batch_size: int = int(os.getenv('WRITE_BATCH_SIZE', '5000'))
+    flush_interval: float = float(os.getenv('WRITE_FLUSH_INTERVAL', '1.0'))
+    max_queue: int = int(os.getenv('WRITE_QUEUE_SIZE', '100000'))
+    max_retries: int = int(os.getenv('WRITE_MAX_RETRIES', '5'))
+    spill_dir: str = os.getenv('SPILL_DIR', './spill')
+    max_spill_mb: int = int(os.getenv('MAX_SPILL_MB', '256'))
+    # Skip points identical to the last write per (measurement, symbol); rewrite every heartbeat
+    change_detection: bool = os.getenv('CHANGE_DETECTION', 'true').lower() == 'true'
+    change_heartbeat: float = float(os.getenv('CHANGE_HEARTBEAT', '300'))
+
 # Default configs
 influx_config = InfluxConfig()
 hunter_config = HunterConfig()
+writer_config = WriterConfig()
 
 # Logging colors
 class Colors:
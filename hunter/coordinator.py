@@ -0,0 +1,213 @@
+#!/usr/bin/env python3
+"""
+VN30-Quantum Hunter - Shard Coordinator
+Runs HUNTER_WORKERS collector processes, each owning a consistent-hash
+shard of the symbol universe, and rebalances when a worker dies
+
+Usage:
+    python coordinator.py                   # HUNTER_WORKERS workers over SYMBOL_UNIVERSE
+    python coordinator.py --workers 4 --universe all
+"""
+import argparse
+import os
+import signal
+import subprocess
+import sys
+import time
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+
+from config import hunter_config, writer_config, log_error, log_header, log_info, log_success, log_warning
+from sharding import HashRing, write_shard_map
+from universe import load_universe
+
+MONITOR_INTERVAL = 2.0
+# Worker phải sống đủ lâu mới được nhận lại shard (tránh xoay vòng khi crash liên tục)
+STABLE_AFTER = 30.0
+RESTART_BACKOFF_BASE = 2.0
+RESTART_BACKOFF_MAX = 120.0
+
+MAIN_SCRIPT = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'main.py')
+
+
+@dataclass
+class Worker:
+    worker_id: str
+    process: Optional[subprocess.Popen] = None
+    started: float = 0.0
+    restarts: int = 0
+    restart_at: float = 0.0
+    in_ring: bool = False
+
+
+class Coordinator:
+    """
+    Supervises worker processes and owns the shard map
+
+    Each worker is a full hunter (`main.py`) with its own event loop,
+    connection pool, writer and spill file; it only learns its symbols from
+    the shard map. When a worker exits, it is taken off the ring at once so
+    its symbols move to the survivors on their next cycle, then restarted
+    with backoff and put back on the ring once it has stayed up.
+    """
+
+    def __init__(self, symbols: List[str], workers: int, shard_file: str, universe: str):
+        self.symbols = symbols
+        self.universe = universe
+        self.shard_file = shard_file
+        self.workers: Dict[str, Worker] = {f"w{i}": Worker(f"w{i}") for i in range(workers)}
+        self.ring = HashRing()
+        self.generation = 0
+        self._stopping = False
+
+    def worker_env(self, worker: Worker) -> Dict[str, str]:
+        env = dict(os.environ)
+        count = len(self.workers)
+        # Mỗi worker một cổng /metrics: METRICS_PORT, METRICS_PORT + 1, ...
+        metrics_port = hunter_config.metrics_port
+        if metrics_port > 0:
+            metrics_port += int(worker.worker_id[1:])
+        env.update({
+            # Worker đọc danh sách mã đầy đủ từ shard map; SYMBOL_UNIVERSE cho khớp log / fallback
+            'SYMBOL_UNIVERSE': self.universe,
+            'SHARD_ID': worker.worker_id,
+            'SHARD_FILE': self.shard_file,
+            'METRICS_PORT': str(metrics_port),
+            # Ngân sách request upstream là của cả hệ thống - chia đều lúc khởi động,
+            # sau đó theo kích thước shard trong shard map (shard_delays)
+            'RATE_LIMIT_DELAY': str(hunter_config.rate_limit_delay * count),
+            'RATE_LIMIT_BURST': str(max(1.0, hunter_config.rate_limit_burst / count)),
+        })
+        return env
+
+    def spawn(self, worker: Worker):
+        worker.process = subprocess.Popen(
+            [sys.executable, '-u', MAIN_SCRIPT],
+            env=self.worker_env(worker),
+        )
+        worker.started = time.time()
+        log_info(f"🚀 Worker {worker.worker_id} (pid {worker.process.pid}) đã khởi động")
+
+    def shard_delays(self, shards: Dict[str, List[str]]) -> Dict[str, float]:
+        """
+        Per-worker RATE_LIMIT_DELAY in proportion to shard size: together the
+        workers stay at one request per rate_limit_delay, and each shard still
+        fits its cycle after survivors take over a dead worker's symbols
+        """
+        total = len(self.symbols)
+        return {worker: hunter_config.rate_limit_delay * total / len(symbols)
+                for worker, symbols in shards.items() if symbols}
+
+    def publish(self, reason: str):
+        self.generation += 1
+        shards = self.ring.assign(self.symbols)
+        write_shard_map(self.shard_file, self.generation, shards, self.symbols, self.shard_delays(shards))
+        sizes = ', '.join(f"{w}={len(s)}" for w, s in sorted(shards.items()))
+        log_info(f"🔀 Shard map thế hệ {self.generation} ({reason}): {sizes or 'không có worker'}")
+
+    def start(self):
+        for worker in self.workers.values():
+            self.ring.add(worker.worker_id)
+            worker.in_ring = True
+        self.publish("khởi động")
+        for worker in self.workers.values():
+            self.spawn(worker)
+
+    def check(self):
+        """One supervision pass: detect exits, restart, re-admit stable workers"""
+        now = time.time()
+        changed = []
+        for worker in self.workers.values():
+            if worker.process is not None and worker.process.poll() is not None:
+                code = worker.process.returncode
+                worker.process = None
+                worker.restarts += 1
+                delay = min(RESTART_BACKOFF_MAX, RESTART_BACKOFF_BASE * (2 ** (worker.restarts - 1)))
+                worker.restart_at = now + delay
+                log_warning(f"💀 Worker {worker.worker_id} đã thoát (code {code}) - "
+                            f"khởi động lại sau {delay:.0f}s")
+                if worker.in_ring:
+                    self.ring.remove(worker.worker_id)
+                    worker.in_ring = False
+                    changed.append(f"{worker.worker_id} mất")
+
+            elif worker.process is None and now >= worker.restart_at:
+                self.spawn(worker)
+
+            elif worker.process is not None and not worker.in_ring and now - worker.started >= STABLE_AFTER:
+                self.ring.add(worker.worker_id)
+                worker.in_ring = True
+                worker.restarts = 0
+                changed.append(f"{worker.worker_id} trở lại")
+
+        if changed:
+            self.publish(', '.join(changed))
+            if not self.ring.nodes:
+                log_error("Không còn worker nào hoạt động - toàn bộ mã đang chờ")
+
+    def run(self):
+        self.start()
+        while not self._stopping:
+            time.sleep(MONITOR_INTERVAL)
+            if not self._stopping:
+                self.check()
+
+    def stop(self, *_):
+        """Forward shutdown as SIGINT so each worker drains its writer"""
+        if self._stopping:
+            return
+        self._stopping = True
+        log_warning("Đang dừng các worker...")
+        for worker in self.workers.values():
+            if worker.process is not None and worker.process.poll() is None:
+                worker.process.send_signal(signal.SIGINT)
+        deadline = time.time() + 40
+        for worker in self.workers.values():
+            if worker.process is None:
+                continue
+            try:
+                worker.process.wait(timeout=max(0.1, deadline - time.time()))
+            except subprocess.TimeoutExpired:
+                worker.process.kill()
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Run sharded hunter workers")
+    parser.add_argument('--workers', type=int, default=hunter_config.workers,
+                        help="Worker processes (default: HUNTER_WORKERS)")
+    parser.add_argument('--universe', type=str, default=hunter_config.symbol_universe,
+                        help="vn30 | all | HOSE,HNX,UPCOM | symbol file (default: SYMBOL_UNIVERSE)")
+    parser.add_argument('--shard-file', type=str, default=hunter_config.shard_file)
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    if args.workers <= 1:
+        # Một worker: chạy hunter trực tiếp, không cần shard map
+        os.environ['SYMBOL_UNIVERSE'] = args.universe
+        os.execv(sys.executable, [sys.executable, '-u', MAIN_SCRIPT])
+
+    symbols = load_universe(args.universe, cache_dir=writer_config.spill_dir,
+                            provider=hunter_config.vnstock_provider)
+    log_header("VN30-QUANTUM HUNTER COORDINATOR")
+    log_info(f"{len(symbols)} mã ({args.universe}) chia cho {args.workers} worker")
+    # Không đủ ngân sách upstream -> dừng ngay thay vì trễ nến mỗi cycle
+    budget_error = hunter_config.upstream_budget_error(len(symbols))
+    if budget_error:
+        log_error(budget_error)
+        sys.exit(1)
+
+    coordinator = Coordinator(symbols, args.workers, args.shard_file, args.universe)
+    signal.signal(signal.SIGTERM, coordinator.stop)
+    try:
+        coordinator.run()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        coordinator.stop()
+    log_success("Coordinator đã dừng.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,263 @@
+"""
+VN30-Quantum Hunter - Market Data Sources
+Pluggable bar sources: TCBS (async HTTP), vnstock providers, local replay
+"""
+import asyncio
+import glob
+import math
+import os
+import time
+from abc import ABC, abstractmethod
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional
+
+import aiohttp
+import numpy as np
+import pandas as pd
+
+from collector import BAR_COLUMNS, INTRADAY_COUNT_BACK, VN_TZ, bars_to_frame, normalize_bars
+
+# Số nến 1 phút tối đa trong một phiên HOSE (09:00-11:30 + 13:00-14:45)
+BARS_PER_SESSION = 255
+
+
+class DataSource(ABC):
+    """
+    Source of normalized 1m bars (see collector.normalize_bars)
+
+    `fetch_bars` returns up to `count_back` bars ending at unix time `to`
+    (default: the source's current time). `now()` is the source clock -
+    wall time for live sources, virtual time for replay.
+    """
+
+    name = 'base'
+
+    async def start(self):
+        pass
+
+    async def close(self):
+        pass
+
+    @abstractmethod
+    async def fetch_bars(self, symbol: str, count_back: int = INTRADAY_COUNT_BACK,
+                         to: Optional[int] = None) -> pd.DataFrame:
+        ...
+
+    def now(self) -> datetime:
+        return datetime.now(timezone.utc)
+
+    @property
+    def symbols(self) -> Optional[List[str]]:
+        """Symbols the source is limited to (None = any)"""
+        return None
+
+    @property
+    def exhausted(self) -> bool:
+        return False
+
+
+# ═══════════════════════════════════════════════════════
+# TCBS (ASYNC HTTP)
+# ═══════════════════════════════════════════════════════
+TCBS_BARS_URL = "https://apipubaws.tcbs.com.vn/stock-insight/v2/stock/bars"
+TCBS_HEADERS = {
+    'Accept': 'application/json',
+    'User-Agent': 'Mozilla/5.0 (X11; Linux x86_64) VN30-Quantum Hunter',
+}
+
+
+class TCBSSource(DataSource):
+    """
+    Async TCBS bars client
+    Keeps one keep-alive connection pool for the process lifetime,
+    so each request reuses an open TCP/TLS connection.
+    """
+
+    name = 'tcbs'
+
+    def __init__(self, pool_size: int = 32, timeout: float = 10.0):
+        self.pool_size = pool_size
+        self.timeout = timeout
+        self._session: Optional[aiohttp.ClientSession] = None
+
+    async def start(self):
+        if self._session is not None:
+            return
+        connector = aiohttp.TCPConnector(
+            limit=self.pool_size,
+            limit_per_host=self.pool_size,
+            ttl_dns_cache=300,
+            keepalive_timeout=60,
+        )
+        self._session = aiohttp.ClientSession(
+            connector=connector,
+            headers=TCBS_HEADERS,
+            timeout=aiohttp.ClientTimeout(total=self.timeout),
+        )
+
+    async def close(self):
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
+    async def fetch_bars(self, symbol: str, count_back: int = INTRADAY_COUNT_BACK,
+                         to: Optional[int] = None, resolution: str = '1') -> pd.DataFrame:
+        if self._session is None:
+            await self.start()
+
+        params = {
+            'ticker': symbol,
+            'type': 'stock',
+            'resolution': resolution,
+            'to': to or int(time.time()),
+            'countBack': count_back,
+        }
+        async with self._session.get(TCBS_BARS_URL, params=params) as response:
+            response.raise_for_status()
+            payload = await response.json(content_type=None)
+
+        return bars_to_frame((payload or {}).get('data') or [])
+
+
+# ═══════════════════════════════════════════════════════
+# VNSTOCK (ALTERNATE PROVIDERS)
+# ═══════════════════════════════════════════════════════
+class VnstockSource(DataSource):
+    """
+    vnstock-backed source for an alternate provider (VCI, DNSE, TCBS, ...)
+    vnstock is blocking, so async calls run on the default thread pool;
+    the collector's semaphore still bounds how many run at once.
+    """
+
+    name = 'vnstock'
+
+    def __init__(self, provider: str = 'VCI'):
+        self.provider = provider
+
+    def fetch_bars_blocking(self, symbol: str, count_back: int = INTRADAY_COUNT_BACK,
+                            to: Optional[int] = None) -> pd.DataFrame:
+        end = datetime.fromtimestamp(to or time.time(), VN_TZ)
+        # Đủ số ngày lịch để phủ count_back nến (cộng dư cho cuối tuần)
+        sessions = math.ceil(count_back / BARS_PER_SESSION)
+        start = end - timedelta(days=sessions + 2 * (sessions // 5 + 1))
+        start_str, end_str = start.strftime('%Y-%m-%d'), end.strftime('%Y-%m-%d')
+
+        try:
+            from vnstock import Quote  # vnstock >= 3
+            df = Quote(symbol=symbol, source=self.provider).history(
+                start=start_str, end=end_str, interval='1m'
+            )
+        except ImportError:
+            from vnstock import stock_historical_data  # vnstock 0.x
+            df = stock_historical_data(
+                symbol=symbol, start_date=start_str, end_date=end_str,
+                resolution='1', type='stock', source=self.provider
+            )
+
+        df = normalize_bars(df)
+        df = df[df['time'] <= pd.Timestamp(end)]
+        return df.tail(count_back).reset_index(drop=True)
+
+    async def fetch_bars(self, symbol: str, count_back: int = INTRADAY_COUNT_BACK,
+                         to: Optional[int] = None) -> pd.DataFrame:
+        return await asyncio.to_thread(self.fetch_bars_blocking, symbol, count_back, to)
+
+
+# ═══════════════════════════════════════════════════════
+# REPLAY (LOAD TESTING)
+# ═══════════════════════════════════════════════════════
+class ReplaySource(DataSource):
+    """
+    Streams recorded bars from local CSV/Parquet on a virtual clock
+
+    `path` is a file or a directory of files with columns
+    time, [symbol,] open, high, low, close, volume - when `symbol` is
+    missing the file name (e.g. FPT.csv) is used. The virtual clock starts
+    at the first recorded bar (or `start_at`) and advances `speed` times
+    faster than wall time, so the whole hunter -> Influx -> agents pipeline
+    can be driven offline at 1x-1000x without touching the live API.
+    """
+
+    name = 'replay'
+
+    def __init__(self, path: str, speed: float = 1.0, start_at: Optional[datetime] = None):
+        if speed <= 0:
+            raise ValueError("Replay speed must be positive")
+        self.path = path
+        self.speed = speed
+        self._frames: Dict[str, pd.DataFrame] = {}
+        self._times: Dict[str, np.ndarray] = {}
+        self._load()
+
+        first = min(int(t[0]) for t in self._times.values())
+        self._last = max(int(t[-1]) for t in self._times.values())
+        self._origin = int(pd.Timestamp(start_at).value) if start_at is not None else first
+        self._wall_origin: Optional[float] = None
+
+    def _load(self):
+        files = sorted(glob.glob(os.path.join(self.path, '*'))) if os.path.isdir(self.path) else [self.path]
+        frames = []
+        for file in files:
+            if file.endswith('.parquet'):
+                df = pd.read_parquet(file)
+            elif file.endswith('.csv'):
+                df = pd.read_csv(file)
+            else:
+                continue
+            if 'symbol' not in df:
+                df['symbol'] = os.path.splitext(os.path.basename(file))[0].upper()
+            frames.append(df)
+        if not frames:
+            raise FileNotFoundError(f"Không có file CSV/Parquet để replay: {self.path}")
+
+        data = pd.concat(frames, ignore_index=True)
+        for symbol, df in data.groupby('symbol'):
+            bars = normalize_bars(df)
+            self._frames[symbol] = bars
+            # int64 ns UTC để tìm kiếm nhị phân theo thời gian ảo
+            self._times[symbol] = bars['time'].dt.as_unit('ns').astype('int64').to_numpy()
+
+    async def start(self):
+        if self._wall_origin is None:
+            self._wall_origin = time.time()
+
+    def _virtual_ns(self) -> int:
+        if self._wall_origin is None:
+            self._wall_origin = time.time()
+        elapsed = (time.time() - self._wall_origin) * self.speed
+        return self._origin + int(elapsed * 1e9)
+
+    def now(self) -> datetime:
+        return datetime.fromtimestamp(self._virtual_ns() / 1e9, timezone.utc)
+
+    @property
+    def symbols(self) -> List[str]:
+        return list(self._frames)
+
+    @property
+    def exhausted(self) -> bool:
+        return self._virtual_ns() > self._last
+
+    async def fetch_bars(self, symbol: str, count_back: int = INTRADAY_COUNT_BACK,
+                         to: Optional[int] = None) -> pd.DataFrame:
+        times = self._times.get(symbol)
+        if times is None:
+            return pd.DataFrame(columns=BAR_COLUMNS)
+        limit = self._virtual_ns() if to is None else min(self._virtual_ns(), int(to * 1e9))
+        end = int(np.searchsorted(times, limit, side='right'))
+        return self._frames[symbol].iloc[max(0, end - count_back):end].reset_index(drop=True)
+
+
+def create_data_source(name: str, pool_size: int = 32, timeout: float = 10.0,
+                       vnstock_provider: str = 'VCI', replay_path: str = '',
+                       replay_speed: float = 1.0, replay_start: str = '') -> DataSource:
+    """Build the DataSource selected by DATA_SOURCE"""
+    name = name.lower()
+    if name == 'tcbs':
+        return TCBSSource(pool_size=pool_size, timeout=timeout)
+    if name == 'vnstock':
+        return VnstockSource(provider=vnstock_provider)
+    if name == 'replay':
+        start_at = pd.Timestamp(replay_start, tz=VN_TZ) if replay_start else None
+        return ReplaySource(replay_path, speed=replay_speed, start_at=start_at)
+    raise ValueError(f"DATA_SOURCE không hợp lệ: {name} (tcbs | vnstock | replay)")
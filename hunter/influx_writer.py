@@ -0,0 +1,367 @@
+"""
+VN30-Quantum Hunter - Background InfluxDB Writer
+Queue + flush thread, gzip'd batches, retry with backoff, disk spill & replay
+"""
+import os
+import queue
+import random
+import threading
+import time
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from influxdb_client import InfluxDBClient, Point
+from influxdb_client.client.write_api import SYNCHRONOUS
+from influxdb_client.rest import ApiException
+
+from config import log_error, log_info, log_warning, writer_config
+from change_filter import ChangeFilter, split_line
+from metrics import INFLUX_POINTS, INFLUX_QUEUE_DEPTH, INFLUX_WRITE_ERRORS, INFLUX_WRITE_LATENCY
+
+# HTTP status codes that mean the data itself is bad - retrying or spilling won't help
+NON_RETRYABLE_STATUS = {400, 413, 422}
+# Queue marker from flush(): the flush thread sends its batch without waiting out flush_interval
+FLUSH_NOW = None
+
+
+@dataclass
+class WriterStats:
+    queued: int = 0
+    written: int = 0
+    spilled: int = 0
+    replayed: int = 0
+    dropped: int = 0
+    spill_dropped: int = 0      # phần của `dropped` bị bỏ vì spill file đầy (có thể nạp lại)
+    suppressed: int = 0
+    failures: int = 0
+    last_write_latency: float = 0.0
+
+
+class InfluxBatchWriter:
+    """
+    Non-blocking replacement for `write_api(write_options=SYNCHRONOUS)`
+
+    `write()` serializes records to line protocol and enqueues them; a
+    background thread batches by size/time and sends gzip'd requests with
+    exponential backoff. Batches that still fail - or that arrive while the
+    queue is full - are appended to a bounded on-disk spill file, which is
+    replayed automatically once InfluxDB accepts writes again. Every line
+    carries its own timestamp, so replays are idempotent overwrites.
+    With a `change_filter`, Points identical to the last write of the same
+    (measurement, symbol) are dropped before they are queued.
+    """
+
+    def __init__(self, url: str, token: str, org: str, name: str = 'hunter',
+                 batch_size: int = 5000, flush_interval: float = 1.0,
+                 max_queue: int = 100_000, max_retries: int = 5,
+                 backoff_base: float = 0.5, backoff_max: float = 30.0,
+                 spill_dir: str = './spill', max_spill_mb: int = 256,
+                 change_filter: Optional[ChangeFilter] = None):
+        self.org = org
+        self.name = name
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.max_spill_bytes = max_spill_mb * 1024 * 1024
+        self.change_filter = change_filter
+        self.stats = WriterStats()
+
+        self._client = InfluxDBClient(url=url, token=token, org=org, enable_gzip=True)
+        self._write_api = self._client.write_api(write_options=SYNCHRONOUS)
+        self._queue: "queue.Queue[Optional[Tuple[str, str, str]]]" = queue.Queue(maxsize=max_queue)
+        INFLUX_QUEUE_DEPTH.labels(name).set_function(self._queue.qsize)
+
+        os.makedirs(spill_dir, exist_ok=True)
+        self.spill_path = os.path.join(spill_dir, f'{name}.spill.lp')
+        self._replay_path = self.spill_path + '.replay'
+        self._replay_offset = 0
+        self._spill_lock = threading.Lock()
+        self._spill_full_logged = False
+        self._down_until = 0.0
+
+        self._stop = threading.Event()
+        self._pending = 0
+        self._pending_lock = threading.Lock()
+        self._thread = threading.Thread(target=self._run, name=f'{name}-influx-writer', daemon=True)
+        self._thread.start()
+
+        if self.has_spill():
+            log_info(f"[{name}] Có dữ liệu spill chờ ghi lại: {self.spill_path}")
+
+    # ═══════════════════════════════════════════════════════
+    # PUBLIC API
+    # ═══════════════════════════════════════════════════════
+    def write(self, bucket: str, org: Optional[str] = None, record=None) -> int:
+        """Enqueue a Point, line protocol string, or list of them; never blocks on InfluxDB"""
+        org = org or self.org
+        lines = self._to_lines(record)
+        overflow: List[Tuple[str, str, str]] = []
+
+        with self._pending_lock:
+            for line in lines:
+                item = (bucket, org, line)
+                try:
+                    self._queue.put_nowait(item)
+                    self._pending += 1
+                except queue.Full:
+                    overflow.append(item)
+
+        self.stats.queued += len(lines) - len(overflow)
+        if overflow:
+            self._spill(overflow)
+        return len(lines)
+
+    @property
+    def queue_depth(self) -> int:
+        return self._queue.qsize()
+
+    def has_spill(self) -> bool:
+        return any(os.path.exists(p) and os.path.getsize(p) > 0
+                   for p in (self.spill_path, self._replay_path))
+
+    @property
+    def healthy(self) -> bool:
+        """False while InfluxDB is considered down (new batches go straight to spill)"""
+        return time.time() >= self._down_until
+
+    def flush(self, timeout: float = 30.0) -> bool:
+        """Send what is queued now (no batching wait) and wait until it is written or spilled"""
+        deadline = time.time() + timeout
+        try:
+            self._queue.put_nowait(FLUSH_NOW)
+        except queue.Full:
+            pass
+        while time.time() < deadline:
+            if self._pending == 0:
+                return True
+            time.sleep(0.01)
+        return False
+
+    def close(self, timeout: float = 30.0):
+        """Drain the queue, stop the flush thread and close the client"""
+        self.flush(timeout)
+        self._stop.set()
+        self._thread.join(timeout)
+        self._client.close()
+
+    # ═══════════════════════════════════════════════════════
+    # FLUSH THREAD
+    # ═══════════════════════════════════════════════════════
+    def _run(self):
+        while not self._stop.is_set():
+            batch = self._next_batch()
+            if batch:
+                self._flush_batch(batch)
+                with self._pending_lock:
+                    self._pending -= len(batch)
+            elif self.has_spill() and time.time() >= self._down_until:
+                self._replay_spill()
+
+    def _next_batch(self) -> List[Tuple[str, str, str]]:
+        """Collect up to batch_size items, waiting at most flush_interval"""
+        batch = []
+        deadline = time.time() + self.flush_interval
+        while len(batch) < self.batch_size:
+            remaining = deadline - time.time()
+            if remaining <= 0:
+                break
+            try:
+                item = self._queue.get(timeout=remaining)
+            except queue.Empty:
+                break
+            if item is FLUSH_NOW:
+                break
+            batch.append(item)
+        if batch:
+            # write() enqueues under _pending_lock - draining under it keeps the
+            # lines of one write() call (e.g. a signal cycle) in the same request
+            with self._pending_lock:
+                while len(batch) < self.batch_size:
+                    try:
+                        item = self._queue.get_nowait()
+                    except queue.Empty:
+                        break
+                    if item is not FLUSH_NOW:
+                        batch.append(item)
+        return batch
+
+    def _flush_batch(self, batch: List[Tuple[str, str, str]]):
+        # InfluxDB đang lỗi -> ghi thẳng ra đĩa, không chặn hàng đợi bằng retry
+        if time.time() < self._down_until:
+            self._spill(batch)
+            return
+
+        if self._send_with_retry(batch):
+            if self.has_spill():
+                self._replay_spill()
+        else:
+            self._spill(batch)
+
+    def _send_with_retry(self, batch: List[Tuple[str, str, str]]) -> bool:
+        for attempt in range(self.max_retries + 1):
+            try:
+                self._send(batch)
+                self._down_until = 0.0
+                self.stats.written += len(batch)
+                INFLUX_POINTS.labels(self.name, 'written').inc(len(batch))
+                return True
+            except ApiException as e:
+                if e.status in NON_RETRYABLE_STATUS:
+                    self.stats.dropped += len(batch)
+                    INFLUX_WRITE_ERRORS.labels(self.name, 'rejected').inc()
+                    INFLUX_POINTS.labels(self.name, 'dropped').inc(len(batch))
+                    log_error(f"[{self.name}] InfluxDB từ chối batch ({e.status}): {str(e.body)[:120]}")
+                    return True
+                error = e
+            except Exception as e:
+                error = e
+
+            self.stats.failures += 1
+            INFLUX_WRITE_ERRORS.labels(self.name, 'retry').inc()
+            if attempt < self.max_retries and not self._stop.is_set():
+                time.sleep(self._backoff(attempt))
+
+        log_warning(f"[{self.name}] Ghi InfluxDB thất bại sau {self.max_retries + 1} lần: "
+                    f"{str(error)[:80]} -> spill ra đĩa")
+        self._down_until = time.time() + self.backoff_max
+        return False
+
+    def _send(self, batch: List[Tuple[str, str, str]]):
+        started = time.time()
+        for (bucket, org), lines in self._group(batch).items():
+            self._write_api.write(bucket=bucket, org=org, record=lines)
+        self.stats.last_write_latency = time.time() - started
+        INFLUX_WRITE_LATENCY.labels(self.name).observe(self.stats.last_write_latency)
+
+    def _backoff(self, attempt: int) -> float:
+        delay = min(self.backoff_max, self.backoff_base * (2 ** attempt))
+        return delay * random.uniform(0.5, 1.0)
+
+    # ═══════════════════════════════════════════════════════
+    # DISK SPILL
+    # ═══════════════════════════════════════════════════════
+    def _spill(self, items: List[Tuple[str, str, str]]):
+        data = ''.join(f'{bucket}\t{org}\t{line}\n' for bucket, org, line in items)
+        encoded = data.encode('utf-8')
+
+        with self._spill_lock:
+            size = os.path.getsize(self.spill_path) if os.path.exists(self.spill_path) else 0
+            if size + len(encoded) > self.max_spill_bytes:
+                self.stats.dropped += len(items)
+                self.stats.spill_dropped += len(items)
+                INFLUX_WRITE_ERRORS.labels(self.name, 'spill_full').inc()
+                INFLUX_POINTS.labels(self.name, 'dropped').inc(len(items))
+                if not self._spill_full_logged:
+                    log_error(f"[{self.name}] Spill file đầy ({self.max_spill_bytes // (1024 * 1024)}MB) "
+                              f"- bỏ {len(items)} điểm")
+                    self._spill_full_logged = True
+                return
+            with open(self.spill_path, 'ab') as f:
+                f.write(encoded)
+                f.flush()
+                os.fsync(f.fileno())
+            self.stats.spilled += len(items)
+            INFLUX_POINTS.labels(self.name, 'spilled').inc(len(items))
+
+    def _replay_spill(self):
+        """Replay spilled lines in batches; resumes from the last good offset on failure"""
+        with self._spill_lock:
+            if not os.path.exists(self._replay_path):
+                if not os.path.exists(self.spill_path) or os.path.getsize(self.spill_path) == 0:
+                    return
+                os.replace(self.spill_path, self._replay_path)
+                self._replay_offset = 0
+                self._spill_full_logged = False
+
+        replayed = 0
+        with open(self._replay_path, 'rb') as f:
+            f.seek(self._replay_offset)
+            while not self._stop.is_set():
+                batch, end_offset = self._read_spill_batch(f)
+                if not batch:
+                    break
+                if not self._send_with_retry(batch):
+                    return
+                self._replay_offset = end_offset
+                replayed += len(batch)
+                self.stats.replayed += len(batch)
+                INFLUX_POINTS.labels(self.name, 'replayed').inc(len(batch))
+                # Nhường cho dữ liệu mới nếu hàng đợi đang dồn
+                if self._queue.qsize() >= self.batch_size:
+                    return
+
+        if not self._stop.is_set():
+            os.remove(self._replay_path)
+            self._replay_offset = 0
+            if replayed:
+                log_info(f"[{self.name}] Đã ghi lại {replayed} điểm từ spill file")
+
+    def _read_spill_batch(self, f) -> Tuple[List[Tuple[str, str, str]], int]:
+        batch = []
+        while len(batch) < self.batch_size:
+            raw = f.readline()
+            if not raw:
+                break
+            parts = raw.decode('utf-8').rstrip('\n').split('\t', 2)
+            if len(parts) == 3 and parts[2]:
+                batch.append((parts[0], parts[1], parts[2]))
+        return batch, f.tell()
+
+    # ═══════════════════════════════════════════════════════
+    # HELPERS
+    # ═══════════════════════════════════════════════════════
+    def _to_lines(self, record) -> List[str]:
+        if record is None:
+            return []
+        if isinstance(record, (str, Point)):
+            record = [record]
+
+        lines = []
+        suppressed = 0
+        for item in record:
+            if isinstance(item, Point):
+                item = item.to_line_protocol()
+                if not item:
+                    continue
+                # Điểm chưa có timestamp sẽ bị InfluxDB gán giờ lúc ghi (kể cả khi replay) -> gán ngay
+                if split_line(item)[3] is None:
+                    item = f"{item} {time.time_ns()}"
+                if self.change_filter is not None and not self.change_filter.should_write(item):
+                    suppressed += 1
+                    continue
+            if item:
+                lines.append(item)
+
+        if suppressed:
+            self.stats.suppressed += suppressed
+            INFLUX_POINTS.labels(self.name, 'suppressed').inc(suppressed)
+        return lines
+
+    @staticmethod
+    def _group(batch: Iterable[Tuple[str, str, str]]) -> Dict[Tuple[str, str], List[str]]:
+        groups: Dict[Tuple[str, str], List[str]] = {}
+        for bucket, org, line in batch:
+            groups.setdefault((bucket, org), []).append(line)
+        return groups
+
+
+def writer_from_config(url: str, token: str, org: str, name: str, dedupe: bool = False,
+                       **overrides) -> InfluxBatchWriter:
+    """
+    Build a writer from WriterConfig (env) defaults, with per-caller overrides
+    `dedupe` enables change detection (CHANGE_DETECTION / CHANGE_HEARTBEAT)
+    """
+    options = dict(
+        batch_size=writer_config.batch_size,
+        flush_interval=writer_config.flush_interval,
+        max_queue=writer_config.max_queue,
+        max_retries=writer_config.max_retries,
+        spill_dir=writer_config.spill_dir,
+        max_spill_mb=writer_config.max_spill_mb,
+    )
+    if dedupe and writer_config.change_detection:
+        options['change_filter'] = ChangeFilter(heartbeat=writer_config.change_heartbeat)
+    options.update(overrides)
+    return InfluxBatchWriter(url, token, org, name=name, **options)
@@ -1,15 +1,33 @@
 #!/usr/bin/env python3
 """
 VN30-Quantum Hunter V2.0
-Multi-threaded data collector for all VN30 stocks
+Data collector for all VN30 stocks (asyncio engine or legacy thread pool)
 """
+import asyncio
 import time
 import os
+import sys
 import concurrent.futures
-from datetime import datetime
-from vnstock import stock_historical_data
+import numpy as np
 from influxdb_client import InfluxDBClient, Point
-from influxdb_client.client.write_api import SYNCHRONOUS
+
+from config import hunter_config, writer_config
+from collector import INTRADAY_COUNT_BACK, AsyncCollector, bars_for_cycle
+from data_sources import VnstockSource, create_data_source
+from watermark import WatermarkStore
+from scheduler import BarScheduler
+from influx_writer import writer_from_config
+from rate_limit import BreakerRegistry, TokenBucket, UpstreamGuard
+from sharding import WorkerShard
+from universe import load_universe
+from metrics import (
+    BREAKERS, CYCLE_DURATION, FETCH_LATENCY, RATE_LIMIT_WAIT, SYMBOLS, start_metrics_server
+)
+
+# ai_engine/ ở thư mục gốc repo (image hunter: /app/ai_engine/bar_ring.py)
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from ai_engine.bar_ring import BAR_DTYPE, BarRing
+from bar_events import BarPublisher, newest_bar_time
 
 # ═══════════════════════════════════════════════════════
 # CẤU HÌNH
@@ -19,13 +37,51 @@ INFLUX_TOKEN = os.getenv('INFLUX_TOKEN', 'my-super-secret-auth-token')
 INFLUX_ORG = os.getenv('INFLUX_ORG', 'vnquant')
 INFLUX_BUCKET = os.getenv('INFLUX_BUCKET', 'market_data')
 
-# DANH SÁCH VN30 (Cập nhật mới nhất)
-VN30_STOCKS = [
-    "ACB", "BCM", "BID", "BVH", "CTG", "FPT", "GAS", "GVR", 
-    "HDB", "HPG", "MBB", "MSN", "MWG", "PLX", "POW", "SAB", 
-    "SHB", "SSB", "SSI", "STB", "TCB", "TPB", "VCB", "VHM", 
-    "VIB", "VIC", "VJC", "VNM", "VPB", "VRE"
-]
+ASYNC_MODE = hunter_config.collector_mode.lower() == 'async'
+
+# NGUỒN DỮ LIỆU: thread mode luôn dùng vnstock/TCBS (blocking), async mode theo DATA_SOURCE
+if ASYNC_MODE:
+    data_source = create_data_source(
+        hunter_config.data_source,
+        pool_size=hunter_config.http_pool_size,
+        timeout=hunter_config.request_timeout,
+        vnstock_provider=hunter_config.vnstock_provider,
+        replay_path=hunter_config.replay_path,
+        replay_speed=hunter_config.replay_speed,
+        replay_start=hunter_config.replay_start
+    )
+else:
+    # Giữ provider TCBS như trước (VNSTOCK_PROVIDER chỉ áp dụng cho DATA_SOURCE=vnstock)
+    data_source = VnstockSource(provider='TCBS')
+REPLAY_MODE = data_source.name == 'replay'
+if REPLAY_MODE:
+    INFLUX_BUCKET = hunter_config.replay_bucket
+
+# DANH SÁCH MÃ: SYMBOL_UNIVERSE (mặc định rổ VN30, dùng chung với backfill.py); replay dùng mã trong file.
+# Khi chạy dưới coordinator.py, worker chỉ thu thập shard của mình (đọc lại mỗi cycle)
+SHARD_ID = hunter_config.shard_id
+shard = WorkerShard(hunter_config.shard_file, SHARD_ID) if SHARD_ID else None
+shard_delay = {'current': hunter_config.rate_limit_delay}
+# Worker của coordinator: universe lấy từ shard map (cùng danh sách đã chia shard, cùng layout bar ring)
+VN30_STOCKS = data_source.symbols or (shard.universe() if shard is not None else []) or load_universe(
+    hunter_config.symbol_universe,
+    cache_dir=writer_config.spill_dir,
+    provider=hunter_config.vnstock_provider
+)
+
+
+def current_symbols() -> list:
+    """Symbols this process collects this cycle (and the request rate for that shard)"""
+    if shard is None:
+        return VN30_STOCKS
+    symbols = shard.symbols()
+    # Shard lớn lên khi worker khác chết -> coordinator cấp thêm ngân sách request
+    delay = shard.rate_limit_delay
+    if delay is not None and not REPLAY_MODE and delay != shard_delay['current']:
+        upstream.limiter.set_delay(delay)
+        shard_delay['current'] = delay
+        log_info(f"[{SHARD_ID}] RATE_LIMIT_DELAY = {delay:.3f}s cho {len(symbols)} mã")
+    return symbols
 
 # ═══════════════════════════════════════════════════════
 # COLORS FOR TERMINAL
@@ -47,6 +103,14 @@ def log_warn(msg):
 def log_error(msg):
     print(f"{Colors.RED}❌ {msg}{Colors.RESET}")
 
+MODE_LABEL = (f"Async (1 event loop, {hunter_config.max_concurrency} concurrent requests)"
+              if ASYNC_MODE else "Multi-Thread (10 workers)")
+MODE_LABEL += f" · Source: {data_source.name}"
+if REPLAY_MODE:
+    MODE_LABEL += f" x{hunter_config.replay_speed:g}"
+if shard is not None:
+    MODE_LABEL += f" · Shard {SHARD_ID}"
+
 # ═══════════════════════════════════════════════════════
 # STARTUP BANNER
 # ═══════════════════════════════════════════════════════
@@ -57,122 +121,271 @@ print(f"""
 ║        Multi-Thread Data Collector                    ║
 ╚═══════════════════════════════════════════════════════╝
 {Colors.RESET}
-🎯 Mục tiêu: {Colors.BOLD}{len(VN30_STOCKS)} mã VN30{Colors.RESET}
-📡 Database: {INFLUX_URL}
-⚡ Mode: Multi-Thread (10 workers)
+🎯 Mục tiêu: {Colors.BOLD}{len(VN30_STOCKS)} mã ({hunter_config.symbol_universe}){Colors.RESET}
+📡 Database: {INFLUX_URL} · bucket {INFLUX_BUCKET}
+⚡ Mode: {MODE_LABEL}
 """)
 
+# Chạy không shard (HUNTER_WORKERS=1 hoặc trực tiếp): universe phải vừa ngân sách upstream
+# (worker của coordinator.py đã được kiểm tra trên toàn universe)
+if shard is None and not REPLAY_MODE:
+    budget_error = hunter_config.upstream_budget_error(len(VN30_STOCKS))
+    if budget_error:
+        log_error(budget_error)
+        exit(1)
+
 # ═══════════════════════════════════════════════════════
 # DATABASE SETUP
 # ═══════════════════════════════════════════════════════
+def ensure_bucket(client: InfluxDBClient, bucket: str, org: str):
+    """Create the bucket if it doesn't exist yet (replay bucket on first run)"""
+    try:
+        buckets = client.buckets_api()
+        if buckets.find_bucket_by_name(bucket) is None:
+            buckets.create_bucket(bucket_name=bucket, org=org)
+            log_info(f"Đã tạo bucket {bucket}")
+    except Exception as e:
+        log_warn(f"Không kiểm tra/tạo được bucket {bucket}: {str(e)[:80]}")
+
 try:
     client = InfluxDBClient(url=INFLUX_URL, token=INFLUX_TOKEN, org=INFLUX_ORG)
-    write_api = client.write_api(write_options=SYNCHRONOUS)
+    # Writes go through a background queue: a slow InfluxDB never stalls collection
+    # Mỗi worker có writer + spill file riêng
+    write_api = writer_from_config(INFLUX_URL, INFLUX_TOKEN, INFLUX_ORG,
+                                   name=f'hunter-{SHARD_ID}' if SHARD_ID else 'hunter', dedupe=True)
     log_info("Kết nối InfluxDB thành công!")
 except Exception as e:
     log_error(f"Không thể kết nối InfluxDB: {e}")
     exit(1)
 
+# High-water mark per symbol: only bars newer than the last stored one are written.
+# Replay bắt đầu với watermark trống: bản ghi cũ hơn bar mới nhất đã lưu vẫn được ghi lại
+watermarks = WatermarkStore()
+if REPLAY_MODE:
+    ensure_bucket(client, INFLUX_BUCKET, INFLUX_ORG)
+else:
+    watermarks.seed_from_influx(client.query_api(), INFLUX_BUCKET, INFLUX_ORG)
+
+# Wall-clock aligned cycles: just after each bar closes, parked outside HOSE sessions.
+# Replay chạy trên đồng hồ ảo: chu kỳ co lại theo tốc độ, không theo lịch HOSE
+if REPLAY_MODE:
+    scheduler = BarScheduler(
+        interval=hunter_config.refresh_interval / hunter_config.replay_speed,
+        settle_delay=0,
+        session_aware=False
+    )
+else:
+    scheduler = BarScheduler(
+        interval=hunter_config.refresh_interval,
+        settle_delay=hunter_config.bar_settle_delay,
+        session_aware=hunter_config.session_aware
+    )
+
+# Upstream protection: one token bucket for every request + a breaker per symbol.
+# Replay không gọi API nên không cần giới hạn tốc độ
+upstream = UpstreamGuard(
+    TokenBucket.from_delay(0 if REPLAY_MODE else hunter_config.rate_limit_delay,
+                           burst=hunter_config.rate_limit_burst),
+    BreakerRegistry(
+        failure_threshold=hunter_config.breaker_threshold,
+        base_cooldown=hunter_config.breaker_cooldown,
+        max_cooldown=hunter_config.breaker_max_cooldown
+    )
+)
+
+# "Bars written" notifications -> signal agent / analyst re-analyse only these symbols
+bar_events = BarPublisher(hunter_config.redis_url, hunter_config.bar_channel, write_api,
+                          source=f'hunter-{SHARD_ID}' if SHARD_ID else 'hunter')
+
+# Recent bars for the signal agent / analyst in shared memory (InfluxDB stays the durable copy).
+# Mọi shard dùng chung một file: layout theo toàn bộ universe, mỗi shard ghi các mã của mình
+bar_ring = None
+if hunter_config.bar_ring_path:
+    try:
+        bar_ring = BarRing.create(hunter_config.bar_ring_path, VN30_STOCKS, hunter_config.bar_ring_size)
+        log_info(f"Bar ring: {hunter_config.bar_ring_path} ({hunter_config.bar_ring_size} nến/mã)")
+    except OSError as e:
+        log_warn(f"Không tạo được bar ring ({e}) - tắt")
+
+# Prometheus /metrics (worker của coordinator dùng METRICS_PORT + số thứ tự shard)
+start_metrics_server(hunter_config.metrics_port, f'hunter-{SHARD_ID}' if SHARD_ID else 'hunter')
+
 # ═══════════════════════════════════════════════════════
 # WORKER FUNCTION
 # ═══════════════════════════════════════════════════════
-def fetch_and_store(symbol: str) -> Point | None:
+def fetch_and_store(symbol: str) -> list:
     """
     Worker function - Fetch data for a single stock
-    Returns InfluxDB Point or None on error
+    Returns InfluxDB Points for bars newer than the watermark ([] on error or open breaker)
     """
+    if not upstream.allow(symbol):
+        return []
+
     try:
-        now_str = datetime.now().strftime('%Y-%m-%d')
-        
-        # Fetch data from TCBS
-        df = stock_historical_data(
-            symbol=symbol, 
-            start_date=now_str, 
-            end_date=now_str, 
-            resolution='1m', 
-            type='stock', 
-            source='TCBS'
-        )
-        
-        if df is not None and not df.empty:
-            latest = df.iloc[-1]
-            price = float(latest['close'])
-            volume = float(latest['volume'])
-            high = float(latest['high']) if 'high' in latest else price
-            low = float(latest['low']) if 'low' in latest else price
-            open_price = float(latest['open']) if 'open' in latest else price
-            
-            # Create InfluxDB Point
-            point = Point("stock_price") \
-                .tag("symbol", symbol) \
-                .tag("market", "VN30") \
-                .field("price", price) \
-                .field("open", open_price) \
-                .field("high", high) \
-                .field("low", low) \
-                .field("close", price) \
-                .field("volume", volume) \
-                .time(datetime.utcnow())
-            
-            return point
-        else:
-            return None
-            
+        # Fetch data from the vnstock provider
+        RATE_LIMIT_WAIT.observe(upstream.limiter.acquire_blocking())
+        with FETCH_LATENCY.labels(symbol).time():
+            df = data_source.fetch_bars_blocking(
+                symbol,
+                count_back=watermarks.count_back(symbol, INTRADAY_COUNT_BACK)
+            )
     except Exception as e:
-        log_warn(f"Lỗi {symbol}: {str(e)[:50]}")
-        return None
+        upstream.on_error(symbol, e)
+        return []
+
+    upstream.on_success(symbol)
+    # Create InfluxDB Points, stamped with each bar's own time
+    return bars_for_cycle(symbol, df, watermarks)
 
 # ═══════════════════════════════════════════════════════
 # MAIN LOOP
 # ═══════════════════════════════════════════════════════
+ring_missing = set()
+
+def mirror_to_ring(points_by_symbol: dict):
+    """Append the cycle's bars to the shared ring (same values as the stock_price points)"""
+    missing = [s for s in points_by_symbol if s not in bar_ring.index and s not in ring_missing]
+    if missing:
+        ring_missing.update(missing)
+        log_warn(f"Bar ring không có {len(missing)} mã ({', '.join(missing[:5])}...) - chỉ ghi InfluxDB")
+    for symbol, points in points_by_symbol.items():
+        bars = np.array([p.bar for p in points], dtype=BAR_DTYPE)
+        bars.sort(order='time', kind='stable')
+        bar_ring.append(symbol, bars)
+
+
+def store_batch(points_by_symbol: dict, total: int, start_time: float):
+    """Queue batch for the background writer, advance watermarks and print cycle stats"""
+    points_batch = [point for points in points_by_symbol.values() for point in points]
+    if points_batch:
+        try:
+            queued = write_api.write(bucket=INFLUX_BUCKET, org=INFLUX_ORG, record=points_batch)
+            watermarks.commit(points_by_symbol.keys())
+            if bar_ring is not None:
+                mirror_to_ring(points_by_symbol)
+            if queued:
+                bar_events.publish(points_by_symbol.keys(), newest_bar_time(points_batch))
+            elapsed = time.time() - start_time
+            
+            # Success stats
+            updated = len(points_by_symbol)
+            success_rate = (updated / max(total, 1)) * 100
+            color = Colors.GREEN if success_rate > 80 else Colors.YELLOW
+            
+            unchanged = len(points_batch) - queued
+            print(f"{color}✅ Đã cập nhật {updated}/{total} mã, {queued} nến " +
+                  (f"(+{unchanged} không đổi) " if unchanged else "") +
+                  f"({success_rate:.0f}%) trong {elapsed:.2f}s{Colors.RESET}")
+                  
+        except Exception as e:
+            watermarks.rollback()
+            log_error(f"Lỗi ghi database: {e}")
+    else:
+        print(f"{Colors.YELLOW}💤 Thị trường đang ngủ hoặc không có dữ liệu...{Colors.RESET}")
+
+
+def report_upstream_health():
+    """Write breaker/limiter state to InfluxDB and warn about symbols being skipped"""
+    counts = upstream.breakers.counts()
+    unhealthy = upstream.breakers.unhealthy()
+    for state, count in counts.items():
+        BREAKERS.labels(state).set(count)
+
+    point = Point("collector_health") \
+        .tag("service", "hunter") \
+        .tag("shard", SHARD_ID or "all") \
+        .field("breakers_closed", counts['CLOSED']) \
+        .field("breakers_open", counts['OPEN']) \
+        .field("breakers_half_open", counts['HALF_OPEN']) \
+        .field("skipped_symbols", upstream.skipped) \
+        .field("throttle_events", upstream.limiter.throttle_events) \
+        .field("open_symbols", ','.join(b.symbol for b in unhealthy))
+    write_api.write(bucket=INFLUX_BUCKET, org=INFLUX_ORG, record=point)
+
+    if unhealthy:
+        details = ', '.join(f"{b.symbol}({b.cooldown_remaining:.0f}s)" for b in unhealthy[:10])
+        log_warn(f"🔌 {len(unhealthy)} mã đang ngắt mạch, bỏ qua {upstream.skipped} mã: {details}")
+
+
+def finish_cycle(boundary, points_by_symbol: dict, total: int, start_time: float):
+    """Store a collected cycle and record per-stage timings"""
+    CYCLE_DURATION.labels('collect').observe(time.time() - start_time)
+    with CYCLE_DURATION.labels('store').time():
+        store_batch(points_by_symbol, total, start_time)
+    report_upstream_health()
+    CYCLE_DURATION.labels('total').observe(scheduler.cycle_done(boundary, start_time))
+
+
 def main_loop():
-    """Main execution loop with parallel processing"""
+    """Main execution loop with parallel processing (legacy thread mode)"""
     cycle_count = 0
     
     while True:
+        boundary = scheduler.wait_next()
         cycle_count += 1
         start_time = time.time()
-        points_batch = []
         
-        print(f"\n{Colors.CYAN}━━━ Cycle #{cycle_count} ━━━{Colors.RESET}")
+        print(f"\n{Colors.CYAN}━━━ Cycle #{cycle_count} · nến {boundary.strftime('%H:%M')} ━━━{Colors.RESET}")
         
+        upstream.reset_cycle()
+        symbols = current_symbols()
+        SYMBOLS.set(len(symbols))
+
         # PARALLEL EXECUTION (Power of V2)
         # Use 10 workers for parallel requests
         with concurrent.futures.ThreadPoolExecutor(max_workers=10) as executor:
             # Submit all stocks to workers
-            results = executor.map(fetch_and_store, VN30_STOCKS)
+            results = executor.map(fetch_and_store, symbols)
             
             # Collect results
-            for point in results:
-                if point:
-                    points_batch.append(point)
-
-        # Batch write to database (IO optimized)
-        if points_batch:
-            try:
-                write_api.write(bucket=INFLUX_BUCKET, org=INFLUX_ORG, record=points_batch)
-                elapsed = time.time() - start_time
-                
-                # Success stats
-                success_rate = (len(points_batch) / len(VN30_STOCKS)) * 100
-                color = Colors.GREEN if success_rate > 80 else Colors.YELLOW
-                
-                print(f"{color}✅ Đã cập nhật {len(points_batch)}/{len(VN30_STOCKS)} mã " +
-                      f"({success_rate:.0f}%) trong {elapsed:.2f}s{Colors.RESET}")
-                      
-            except Exception as e:
-                log_error(f"Lỗi ghi database: {e}")
-        else:
-            print(f"{Colors.YELLOW}💤 Thị trường đang ngủ hoặc không có dữ liệu...{Colors.RESET}")
+            points_by_symbol = {
+                symbol: points for symbol, points in zip(symbols, results) if points
+            }
 
-        # Sleep interval (10s default, can reduce to 5s for faster updates)
-        time.sleep(10)
+        finish_cycle(boundary, points_by_symbol, len(symbols), start_time)
+
+
+async def async_main_loop():
+    """
+    Main execution loop on a single event loop
+    The data source (HTTP pool) and collector live for the whole process, so
+    a cycle costs only the requests themselves - no thread or handshake churn.
+    """
+    await data_source.start()
+    collector = AsyncCollector(data_source, watermarks, upstream,
+                               max_concurrency=hunter_config.max_concurrency)
+    cycle_count = 0
+    
+    try:
+        while not data_source.exhausted:
+            boundary = await scheduler.async_wait_next()
+            cycle_count += 1
+            start_time = time.time()
+            
+            print(f"\n{Colors.CYAN}━━━ Cycle #{cycle_count} · nến {boundary.strftime('%H:%M')} ━━━{Colors.RESET}")
+            
+            symbols = current_symbols()
+            SYMBOLS.set(len(symbols))
+            points_by_symbol = await collector.collect(symbols)
+            
+            # Enqueue only - the background writer owns InfluxDB latency
+            finish_cycle(boundary, points_by_symbol, len(symbols), start_time)
+        
+        print(f"\n{Colors.CYAN}🏁 Replay xong: {cycle_count} cycle, "
+              f"{scheduler.stats.overruns} lần quá hạn{Colors.RESET}")
+    finally:
+        await data_source.close()
 
 
 if __name__ == "__main__":
     try:
-        main_loop()
+        if ASYNC_MODE:
+            asyncio.run(async_main_loop())
+        else:
+            main_loop()
     except KeyboardInterrupt:
         print(f"\n{Colors.YELLOW}👋 Hunter đã dừng.{Colors.RESET}")
     finally:
+        bar_events.close()
+        write_api.close()
         client.close()
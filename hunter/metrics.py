@@ -0,0 +1,85 @@
+"""
+VN30-Quantum Hunter - Prometheus Metrics
+Metric families for hunter, writer and signal agent (buckets, shared
+families and the /metrics endpoint: ai_engine/metrics.py)
+"""
+import os
+import sys
+from datetime import datetime, timezone
+from typing import Optional
+
+from prometheus_client import Counter, Gauge, Histogram
+
+from config import log_info, log_warning
+
+# ai_engine/ ở thư mục gốc repo (image hunter: /app/ai_engine/metrics.py); mọi module hunter import file này
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from ai_engine import metrics as shared
+from ai_engine.metrics import LAG_BUCKETS, LATENCY_BUCKETS
+
+# ═══════════════════════════════════════════════════════
+# INFLUX WRITER (label: writer = hunter, hunter-w0, signal_agent, backfill...)
+# ═══════════════════════════════════════════════════════
+INFLUX_WRITE_LATENCY = Histogram(
+    'influx_write_latency_seconds', 'InfluxDB write request latency per batch',
+    ['writer'], buckets=LATENCY_BUCKETS
+)
+INFLUX_WRITE_ERRORS = Counter(
+    'influx_write_errors_total', 'InfluxDB write errors (retry, rejected, spill_full)',
+    ['writer', 'kind']
+)
+INFLUX_POINTS = Counter(
+    'influx_points_total', 'Points leaving the writer by outcome (written, spilled, replayed, dropped)',
+    ['writer', 'outcome']
+)
+INFLUX_QUEUE_DEPTH = Gauge('influx_write_queue_depth', 'Points waiting in the writer queue', ['writer'])
+
+# ═══════════════════════════════════════════════════════
+# HUNTER
+# ═══════════════════════════════════════════════════════
+FETCH_LATENCY = Histogram(
+    'hunter_fetch_latency_seconds', 'Upstream bar request latency',
+    ['symbol'], buckets=LATENCY_BUCKETS
+)
+FETCH_ERRORS = Counter(
+    'hunter_fetch_errors_total', 'Failed or skipped fetches (error, throttle, breaker_open)',
+    ['symbol', 'kind']
+)
+RATE_LIMIT_WAIT = Histogram(
+    'hunter_rate_limit_wait_seconds', 'Time spent waiting for a token-bucket token',
+    buckets=LATENCY_BUCKETS
+)
+CYCLE_DURATION = shared.cycle_histogram('hunter', 'collect, store, total')
+CYCLE_OVERRUNS = Counter('hunter_cycle_overruns_total', 'Cycles that ran past the next bar boundary')
+INGEST_LAG = Histogram(
+    'hunter_ingest_lag_seconds', 'Wall clock minus time of the newest fetched bar',
+    buckets=LAG_BUCKETS
+)
+BAR_LAG = Gauge('hunter_bar_lag_seconds', 'Wall clock minus newest fetched bar time', ['symbol'])
+BARS_INGESTED = Counter('hunter_bars_total', 'New bars queued for InfluxDB')
+BREAKERS = Gauge('hunter_breakers', 'Circuit breakers by state', ['state'])
+SYMBOLS = Gauge('hunter_symbols', 'Symbols assigned to this process')
+
+# ═══════════════════════════════════════════════════════
+# SIGNAL AGENT
+# ═══════════════════════════════════════════════════════
+SIGNAL_CYCLE_DURATION = shared.cycle_histogram('signal_agent', 'query, compute, total')
+SIGNAL_QUERY_LATENCY = shared.query_histogram('signal_agent', 'shard')
+SIGNAL_DATA_LAG = shared.data_lag_histogram('signal_agent')
+SIGNALS = Counter('signal_agent_signals_total', 'Signals generated', ['signal_type'])
+SIGNAL_EVENT_LATENCY = shared.event_latency_histogram('signal_agent', 'signals queued')
+
+
+def start_metrics_server(port: int, service: str):
+    """Serve /metrics on `port` in a daemon thread (0 disables), logged like the rest of the hunter"""
+    shared.start_metrics_server(port, service, info=log_info, warning=log_warning)
+
+
+def observe_bar_lag(symbol: str, bar_time, now: Optional[datetime] = None) -> float:
+    """Record wall clock (or the source clock) minus the newest bar time"""
+    now = now or datetime.now(timezone.utc)
+    lag = max(0.0, now.timestamp() - bar_time.timestamp())
+    INGEST_LAG.observe(lag)
+    BAR_LAG.labels(symbol).set(lag)
+    return lag
+
@@ -0,0 +1,251 @@
+"""
+VN30-Quantum Hunter - Upstream Protection
+Shared token-bucket rate limiter + per-symbol circuit breakers
+"""
+import asyncio
+import threading
+import time
+from dataclasses import dataclass
+from enum import Enum
+from typing import Dict, List, Optional
+
+from config import log_warning
+from metrics import FETCH_ERRORS
+
+
+# ═══════════════════════════════════════════════════════
+# TOKEN BUCKET
+# ═══════════════════════════════════════════════════════
+class TokenBucket:
+    """
+    Token bucket shared by every upstream call in the process
+
+    Refills at `rate` tokens/s up to `capacity` (burst). Tokens are
+    reserved under a lock, so it is safe from both coroutines and
+    threads; callers sleep outside the lock. `pause()` freezes the
+    bucket when the upstream throttles us (HTTP 429 / Retry-After).
+    """
+
+    def __init__(self, rate: float, capacity: float = 1.0):
+        self.rate = rate
+        self.capacity = max(1.0, capacity)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._paused_until = 0.0
+        self._lock = threading.Lock()
+        self.throttle_events = 0
+
+    def _reserve(self) -> float:
+        """Take one token, returning how long the caller must wait for it"""
+        with self._lock:
+            now = time.monotonic()
+            if self.rate > 0:
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            self._tokens -= 1
+            wait = 0.0
+            if self._tokens < 0:
+                wait = -self._tokens / self.rate if self.rate > 0 else 0.0
+            return max(wait, self._paused_until - now)
+
+    async def acquire(self) -> float:
+        """Wait for a token; returns the seconds spent waiting"""
+        wait = self._reserve()
+        if wait > 0:
+            await asyncio.sleep(wait)
+        return max(wait, 0.0)
+
+    def acquire_blocking(self) -> float:
+        wait = self._reserve()
+        if wait > 0:
+            time.sleep(wait)
+        return max(wait, 0.0)
+
+    def pause(self, seconds: float):
+        """Stop handing out tokens for `seconds` (upstream asked us to back off)"""
+        with self._lock:
+            self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+            self._tokens = min(self._tokens, 0.0)
+            self.throttle_events += 1
+
+    def set_delay(self, delay: float):
+        """Change the rate to one request every `delay` seconds (0 = unlimited)"""
+        with self._lock:
+            now = time.monotonic()
+            if self.rate > 0:
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            self.rate = 1.0 / delay if delay > 0 else 0.0
+
+    @classmethod
+    def from_delay(cls, delay: float, burst: float = 1.0) -> "TokenBucket":
+        """Bucket equivalent to one request every `delay` seconds (0 = unlimited)"""
+        return cls(rate=1.0 / delay if delay > 0 else 0.0, capacity=burst)
+
+
+# ═══════════════════════════════════════════════════════
+# CIRCUIT BREAKER
+# ═══════════════════════════════════════════════════════
+class BreakerState(Enum):
+    CLOSED = "CLOSED"
+    OPEN = "OPEN"
+    HALF_OPEN = "HALF_OPEN"
+
+
+@dataclass
+class CircuitBreaker:
+    """
+    Per-symbol breaker: opens after `failure_threshold` consecutive errors,
+    stays open for a cooldown that doubles each time it re-opens (capped),
+    then lets a single half-open probe through to decide.
+    """
+    symbol: str
+    failure_threshold: int = 3
+    base_cooldown: float = 60.0
+    max_cooldown: float = 1800.0
+    state: BreakerState = BreakerState.CLOSED
+    consecutive_failures: int = 0
+    trips: int = 0
+    open_until: float = 0.0
+    last_error: str = ''
+
+    def allow(self, now: Optional[float] = None) -> bool:
+        now = now or time.time()
+        if self.state == BreakerState.CLOSED:
+            return True
+        if self.state == BreakerState.OPEN and now >= self.open_until:
+            self.state = BreakerState.HALF_OPEN
+            return True
+        # HALF_OPEN: đã có một probe đang chạy / OPEN: chưa hết cooldown
+        return False
+
+    def abort_probe(self):
+        """Probe was inconclusive (e.g. throttled globally) - allow another one next time"""
+        if self.state == BreakerState.HALF_OPEN:
+            self.state = BreakerState.OPEN
+
+    def record_success(self):
+        self.state = BreakerState.CLOSED
+        self.consecutive_failures = 0
+        self.trips = 0
+        self.last_error = ''
+
+    def record_failure(self, error: str = '', now: Optional[float] = None):
+        now = now or time.time()
+        self.consecutive_failures += 1
+        self.last_error = error[:120]
+        if self.state == BreakerState.HALF_OPEN or self.consecutive_failures >= self.failure_threshold:
+            cooldown = min(self.max_cooldown, self.base_cooldown * (2 ** self.trips))
+            self.trips += 1
+            self.state = BreakerState.OPEN
+            self.open_until = now + cooldown
+
+    @property
+    def cooldown_remaining(self) -> float:
+        return max(0.0, self.open_until - time.time()) if self.state == BreakerState.OPEN else 0.0
+
+
+class BreakerRegistry:
+    """Circuit breakers keyed by symbol, with a snapshot for monitoring"""
+
+    def __init__(self, failure_threshold: int = 3, base_cooldown: float = 60.0,
+                 max_cooldown: float = 1800.0):
+        self.failure_threshold = failure_threshold
+        self.base_cooldown = base_cooldown
+        self.max_cooldown = max_cooldown
+        self._breakers: Dict[str, CircuitBreaker] = {}
+
+    def get(self, symbol: str) -> CircuitBreaker:
+        breaker = self._breakers.get(symbol)
+        if breaker is None:
+            breaker = CircuitBreaker(
+                symbol,
+                failure_threshold=self.failure_threshold,
+                base_cooldown=self.base_cooldown,
+                max_cooldown=self.max_cooldown,
+            )
+            self._breakers[symbol] = breaker
+        return breaker
+
+    def unhealthy(self) -> List[CircuitBreaker]:
+        return [b for b in self._breakers.values() if b.state != BreakerState.CLOSED]
+
+    def counts(self) -> Dict[str, int]:
+        counts = {state.value: 0 for state in BreakerState}
+        for breaker in self._breakers.values():
+            counts[breaker.state.value] += 1
+        return counts
+
+    def snapshot(self) -> Dict[str, dict]:
+        return {
+            b.symbol: {
+                'state': b.state.value,
+                'consecutive_failures': b.consecutive_failures,
+                'trips': b.trips,
+                'cooldown_remaining': round(b.cooldown_remaining, 1),
+                'last_error': b.last_error,
+            }
+            for b in self._breakers.values()
+        }
+
+
+# ═══════════════════════════════════════════════════════
+# UPSTREAM GUARD
+# ═══════════════════════════════════════════════════════
+def throttle_delay(error: Exception, default: float = 5.0) -> Optional[float]:
+    """Seconds to back off if `error` is an upstream throttle (HTTP 429), else None"""
+    response = getattr(error, 'response', None)
+    status = getattr(error, 'status', None) or getattr(response, 'status_code', None)
+    if status != 429:
+        return None
+    headers = getattr(error, 'headers', None) or getattr(response, 'headers', None) or {}
+    try:
+        return float(headers.get('Retry-After', default))
+    except (TypeError, ValueError):
+        return default
+
+
+class UpstreamGuard:
+    """
+    Limiter + breakers around one upstream call per symbol
+    Throttling pauses the shared bucket for everyone instead of tripping
+    the symbol's breaker; any other error counts against the symbol only,
+    so healthy symbols stay on schedule.
+    """
+
+    def __init__(self, limiter: TokenBucket, breakers: BreakerRegistry):
+        self.limiter = limiter
+        self.breakers = breakers
+        self.skipped = 0
+
+    def allow(self, symbol: str) -> bool:
+        if self.breakers.get(symbol).allow():
+            return True
+        self.skipped += 1
+        FETCH_ERRORS.labels(symbol, 'breaker_open').inc()
+        return False
+
+    def on_success(self, symbol: str):
+        self.breakers.get(symbol).record_success()
+
+    def on_error(self, symbol: str, error: Exception):
+        breaker = self.breakers.get(symbol)
+        delay = throttle_delay(error)
+        if delay is not None:
+            FETCH_ERRORS.labels(symbol, 'throttle').inc()
+            breaker.abort_probe()
+            self.limiter.pause(delay)
+            log_warning(f"🚦 Upstream throttle ({symbol}) - tạm dừng {delay:.0f}s")
+            return
+
+        FETCH_ERRORS.labels(symbol, 'error').inc()
+        was_open = breaker.state == BreakerState.OPEN
+        breaker.record_failure(str(error))
+        if breaker.state == BreakerState.OPEN and not was_open:
+            log_warning(f"🔌 {symbol}: ngắt mạch {breaker.cooldown_remaining:.0f}s "
+                        f"sau {breaker.consecutive_failures} lỗi liên tiếp ({str(error)[:50]})")
+        else:
+            log_warning(f"Lỗi {symbol}: {str(error)[:50]}")
+
+    def reset_cycle(self):
+        self.skipped = 0
@@ -0,0 +1,228 @@
+"""
+VN30-Quantum Hunter - Session-Aware Scheduler
+HOSE trading calendar + wall-clock aligned bar scheduling
+"""
+import asyncio
+import os
+import time
+from dataclasses import dataclass
+from datetime import date, datetime, time as dtime, timedelta, timezone
+from enum import Enum
+from typing import Optional, Set, Tuple
+
+from config import log_info, log_warning
+from metrics import CYCLE_OVERRUNS
+
+# Giờ Việt Nam (UTC+7, không có DST)
+VN_TZ = timezone(timedelta(hours=7))
+
+# ═══════════════════════════════════════════════════════
+# HOSE SESSIONS
+# ═══════════════════════════════════════════════════════
+ATO_OPEN = dtime(9, 0)
+CONTINUOUS_OPEN = dtime(9, 15)
+LUNCH_START = dtime(11, 30)
+LUNCH_END = dtime(13, 0)
+ATC_START = dtime(14, 30)
+ATC_END = dtime(14, 45)
+
+# Matched-order windows that produce 1m bars: (open, close)
+BAR_SESSIONS: Tuple[Tuple[dtime, dtime], ...] = (
+    (ATO_OPEN, LUNCH_START),
+    (LUNCH_END, ATC_END),
+)
+
+# Ngày nghỉ lễ HOSE (bổ sung qua biến môi trường HOSE_HOLIDAYS=YYYY-MM-DD,...)
+HOSE_HOLIDAYS: Set[date] = {
+    # 2025
+    date(2025, 1, 1),
+    date(2025, 1, 27), date(2025, 1, 28), date(2025, 1, 29),
+    date(2025, 1, 30), date(2025, 1, 31),
+    date(2025, 4, 7),
+    date(2025, 4, 30), date(2025, 5, 1), date(2025, 5, 2),
+    date(2025, 9, 1), date(2025, 9, 2),
+    # 2026
+    date(2026, 1, 1), date(2026, 1, 2),
+    date(2026, 2, 16), date(2026, 2, 17), date(2026, 2, 18),
+    date(2026, 2, 19), date(2026, 2, 20),
+    date(2026, 4, 27),
+    date(2026, 4, 30), date(2026, 5, 1),
+    date(2026, 9, 1), date(2026, 9, 2),
+}
+
+
+class TradingPhase(Enum):
+    PRE_OPEN = "PRE_OPEN"
+    ATO = "ATO"
+    CONTINUOUS = "CONTINUOUS"
+    LUNCH = "LUNCH"
+    ATC = "ATC"
+    CLOSED = "CLOSED"
+
+
+def _parse_holidays(value: str) -> Set[date]:
+    holidays = set()
+    for item in value.split(','):
+        item = item.strip()
+        if item:
+            holidays.add(datetime.strptime(item, '%Y-%m-%d').date())
+    return holidays
+
+
+class HoseCalendar:
+    """HOSE trading calendar: trading days, intraday phases and bar boundaries"""
+
+    def __init__(self, holidays: Optional[Set[date]] = None):
+        self.holidays = set(HOSE_HOLIDAYS if holidays is None else holidays)
+        self.holidays |= _parse_holidays(os.getenv('HOSE_HOLIDAYS', ''))
+
+    @staticmethod
+    def to_local(dt: datetime) -> datetime:
+        if dt.tzinfo is None:
+            dt = dt.replace(tzinfo=timezone.utc)
+        return dt.astimezone(VN_TZ)
+
+    def is_trading_day(self, day: date) -> bool:
+        return day.weekday() < 5 and day not in self.holidays
+
+    def phase_at(self, dt: datetime) -> TradingPhase:
+        local = self.to_local(dt)
+        if not self.is_trading_day(local.date()):
+            return TradingPhase.CLOSED
+
+        t = local.time()
+        if t < ATO_OPEN:
+            return TradingPhase.PRE_OPEN
+        if t < CONTINUOUS_OPEN:
+            return TradingPhase.ATO
+        if t < LUNCH_START:
+            return TradingPhase.CONTINUOUS
+        if t < LUNCH_END:
+            return TradingPhase.LUNCH
+        if t < ATC_START:
+            return TradingPhase.CONTINUOUS
+        if t < ATC_END:
+            return TradingPhase.ATC
+        return TradingPhase.CLOSED
+
+    def is_bar_close(self, boundary: datetime) -> bool:
+        """True if the bar ending at `boundary` overlaps a matching session"""
+        local = self.to_local(boundary)
+        if not self.is_trading_day(local.date()):
+            return False
+        t = local.time()
+        return any(start < t <= end for start, end in BAR_SESSIONS)
+
+    def next_bar_close(self, after: datetime, interval: int = 60) -> datetime:
+        """First session bar boundary strictly after `after` (aligned to `interval` seconds)"""
+        local = self.to_local(after)
+        midnight = local.replace(hour=0, minute=0, second=0, microsecond=0)
+        elapsed = (local - midnight).total_seconds()
+        boundary = midnight + timedelta(seconds=(int(elapsed // interval) + 1) * interval)
+
+        # Nhảy thẳng tới phiên kế tiếp thay vì quét từng phút qua đêm / cuối tuần
+        for _ in range(64):
+            if self.is_bar_close(boundary):
+                return boundary
+            boundary = self._next_session_first_close(boundary, interval)
+        raise RuntimeError("Không tìm thấy phiên giao dịch kế tiếp (kiểm tra HOSE_HOLIDAYS)")
+
+    def _next_session_first_close(self, boundary: datetime, interval: int) -> datetime:
+        day = boundary.date()
+        if self.is_trading_day(day):
+            for start, _ in BAR_SESSIONS:
+                first_close = datetime.combine(day, start, VN_TZ) + timedelta(seconds=interval)
+                if boundary < first_close:
+                    return first_close
+
+        next_day = day + timedelta(days=1)
+        while not self.is_trading_day(next_day):
+            next_day += timedelta(days=1)
+        return datetime.combine(next_day, BAR_SESSIONS[0][0], VN_TZ) + timedelta(seconds=interval)
+
+
+# ═══════════════════════════════════════════════════════
+# BAR SCHEDULER
+# ═══════════════════════════════════════════════════════
+@dataclass
+class CycleStats:
+    cycles: int = 0
+    overruns: int = 0
+    skipped_bars: int = 0
+    last_duration: float = 0.0
+
+
+class BarScheduler:
+    """
+    Wakes collection just after each bar closes, parks outside sessions.
+
+    Cycles are aligned to wall-clock boundaries (`interval` seconds since
+    local midnight) plus a small settle delay for the upstream to publish
+    the bar, so timing never drifts. A cycle that runs past the next wake
+    time is reported as an overrun; missed boundaries are skipped rather
+    than queued (watermarks pick up the bars on the next cycle).
+    """
+
+    PARK_LOG_THRESHOLD = 120  # seconds
+
+    def __init__(self, calendar: Optional[HoseCalendar] = None, interval: int = 60,
+                 settle_delay: float = 2.0, session_aware: bool = True):
+        self.calendar = calendar or HoseCalendar()
+        self.interval = interval
+        self.settle_delay = settle_delay
+        self.session_aware = session_aware
+        self.stats = CycleStats()
+
+    def next_wake(self, now: Optional[datetime] = None) -> Tuple[datetime, datetime]:
+        """(bar boundary, wake time) of the next cycle"""
+        now = now or datetime.now(timezone.utc)
+        settle = timedelta(seconds=self.settle_delay)
+        if self.session_aware:
+            boundary = self.calendar.next_bar_close(now - settle, self.interval)
+        else:
+            local = self.calendar.to_local(now - settle)
+            midnight = local.replace(hour=0, minute=0, second=0, microsecond=0)
+            slots = int((local - midnight).total_seconds() // self.interval) + 1
+            boundary = midnight + timedelta(seconds=slots * self.interval)
+        return boundary, boundary + settle
+
+    def _plan(self) -> Tuple[datetime, float]:
+        now = datetime.now(timezone.utc)
+        boundary, wake = self.next_wake(now)
+        delay = max(0.0, (wake - now).total_seconds())
+
+        if delay > self.PARK_LOG_THRESHOLD:
+            phase = self.calendar.phase_at(now)
+            log_info(f"💤 Ngoài phiên ({phase.value}) - tạm nghỉ đến "
+                     f"{boundary.strftime('%H:%M %d/%m/%Y')} ({delay / 60:.0f} phút)")
+        return boundary, delay
+
+    def wait_next(self) -> datetime:
+        """Block until the next bar boundary (+ settle); returns the boundary"""
+        boundary, delay = self._plan()
+        time.sleep(delay)
+        return boundary
+
+    async def async_wait_next(self) -> datetime:
+        """Event-loop friendly variant of wait_next"""
+        boundary, delay = self._plan()
+        await asyncio.sleep(delay)
+        return boundary
+
+    def cycle_done(self, boundary: datetime, started: float) -> float:
+        """Record cycle duration and report overruns past the next wake time"""
+        duration = time.time() - started
+        self.stats.cycles += 1
+        self.stats.last_duration = duration
+
+        deadline = boundary + timedelta(seconds=self.interval + self.settle_delay)
+        overrun = (datetime.now(timezone.utc) - deadline).total_seconds()
+        if overrun > 0:
+            missed = int(overrun // self.interval) + 1
+            self.stats.overruns += 1
+            CYCLE_OVERRUNS.inc()
+            self.stats.skipped_bars += missed
+            log_warning(f"⏱ Cycle {boundary.strftime('%H:%M')} quá hạn {overrun:.1f}s "
+                        f"({duration:.1f}s / ngân sách {self.interval}s), bỏ qua {missed} mốc nến - "
+                        f"tổng {self.stats.overruns} lần quá hạn")
+        return duration
@@ -0,0 +1,152 @@
+"""
+VN30-Quantum Hunter - Symbol Sharding
+Consistent-hash ring + shard map shared between coordinator and workers
+"""
+import bisect
+import hashlib
+import json
+import os
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Sequence
+
+from config import log_info, log_warning
+
+
+def _hash(key: str) -> int:
+    return int.from_bytes(hashlib.md5(key.encode('utf-8')).digest()[:8], 'big')
+
+
+class HashRing:
+    """
+    Consistent-hash ring with virtual nodes
+
+    Removing a worker only moves that worker's symbols (spread across the
+    survivors); adding it back takes roughly 1/N of every other shard. Each
+    worker therefore keeps most of its watermarks and warm connections
+    through a rebalance.
+    """
+
+    def __init__(self, nodes: Iterable[str] = (), vnodes: int = 128):
+        self.vnodes = vnodes
+        self._keys: List[int] = []
+        self._owners: List[str] = []
+        self.nodes: List[str] = []
+        for node in nodes:
+            self.add(node)
+
+    def add(self, node: str):
+        if node in self.nodes:
+            return
+        self.nodes.append(node)
+        for i in range(self.vnodes):
+            key = _hash(f"{node}#{i}")
+            index = bisect.bisect(self._keys, key)
+            self._keys.insert(index, key)
+            self._owners.insert(index, node)
+
+    def remove(self, node: str):
+        if node not in self.nodes:
+            return
+        self.nodes.remove(node)
+        kept = [(k, o) for k, o in zip(self._keys, self._owners) if o != node]
+        self._keys = [k for k, _ in kept]
+        self._owners = [o for _, o in kept]
+
+    def owner(self, symbol: str) -> Optional[str]:
+        if not self._keys:
+            return None
+        index = bisect.bisect(self._keys, _hash(symbol)) % len(self._keys)
+        return self._owners[index]
+
+    def assign(self, symbols: Iterable[str]) -> Dict[str, List[str]]:
+        shards: Dict[str, List[str]] = {node: [] for node in self.nodes}
+        for symbol in symbols:
+            owner = self.owner(symbol)
+            if owner is not None:
+                shards[owner].append(symbol)
+        return shards
+
+
+# ═══════════════════════════════════════════════════════
+# SHARD MAP FILE
+# ═══════════════════════════════════════════════════════
+def write_shard_map(path: str, generation: int, shards: Dict[str, List[str]], universe: Sequence[str] = (),
+                    delays: Optional[Dict[str, float]] = None):
+    """
+    Publish the shard map atomically (tmp file + rename)
+    `universe` is the coordinator's full symbol list: workers lay out the
+    shared bar ring from it, so every shard writes into the same layout.
+    `delays` is each worker's RATE_LIMIT_DELAY for its current shard.
+    """
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'w') as f:
+        json.dump({
+            'generation': generation,
+            'updated': datetime.now().isoformat(),
+            'universe': list(universe),
+            'shards': shards,
+            'delays': delays or {},
+        }, f)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+
+class WorkerShard:
+    """
+    Worker-side view of the shard map
+    `symbols()` is called every cycle; the file is only re-read when its
+    mtime changes, so picking up a rebalance costs one stat() per cycle.
+    """
+
+    def __init__(self, path: str, worker_id: str):
+        self.path = path
+        self.worker_id = worker_id
+        self.generation = -1
+        self._mtime = 0.0
+        self._symbols: List[str] = []
+        self._universe: List[str] = []
+        # RATE_LIMIT_DELAY cho shard hiện tại (None: giữ giá trị lúc khởi động)
+        self.rate_limit_delay: Optional[float] = None
+        self._missing_logged = False
+
+    def symbols(self) -> List[str]:
+        try:
+            mtime = os.path.getmtime(self.path)
+        except OSError:
+            if not self._missing_logged:
+                log_warning(f"[{self.worker_id}] Chưa có shard map: {self.path}")
+                self._missing_logged = True
+            return self._symbols
+
+        if mtime != self._mtime:
+            self._mtime = mtime
+            self._reload()
+        return self._symbols
+
+    def universe(self) -> List[str]:
+        """Every symbol of the coordinator's universe ([] before the first shard map)"""
+        self.symbols()
+        return self._universe
+
+    def _reload(self):
+        try:
+            with open(self.path) as f:
+                data = json.load(f)
+        except (OSError, ValueError) as e:
+            log_warning(f"[{self.worker_id}] Lỗi đọc shard map: {str(e)[:80]}")
+            return
+
+        generation = data.get('generation', 0)
+        if generation == self.generation:
+            return
+        symbols = data.get('shards', {}).get(self.worker_id, [])
+        self._universe = data.get('universe', [])
+        self.rate_limit_delay = data.get('delays', {}).get(self.worker_id)
+        added = len(set(symbols) - set(self._symbols))
+        removed = len(set(self._symbols) - set(symbols))
+        self.generation = generation
+        self._symbols = symbols
+        log_info(f"🔀 [{self.worker_id}] Shard thế hệ {generation}: {len(symbols)} mã "
+                 f"(+{added} / -{removed})")
@@ -4,15 +4,34 @@ VN30-Quantum AI Signal Agent
 Reads price data, calculates indicators, writes trading signals to InfluxDB
 """
 import os
+import sys
 import time
+import concurrent.futures
 import numpy as np
-from datetime import datetime, timedelta
+from functools import partial
+from datetime import datetime, timedelta, timezone
 from typing import Dict, List, Optional, Tuple
 from dataclasses import dataclass
 from enum import Enum
 
 from influxdb_client import InfluxDBClient, Point
-from influxdb_client.client.write_api import SYNCHRONOUS
+
+# ai_engine/ ở thư mục gốc repo (image hunter: /app/ai_engine/kernels.py)
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from ai_engine import kernels
+from ai_engine.bar_events import BarSubscriber
+from ai_engine.bar_ring import BarRing, open_ring
+from ai_engine.columnar import query_columns
+from ai_engine.parallel import PanelPool, resolve_workers
+from ai_engine.streaming import IndicatorValues, StreamingIndicators, fold_cold
+
+from config import log_info, log_warning
+from influx_writer import writer_from_config
+from signal_sink import SignalSink
+from metrics import (
+    SIGNAL_CYCLE_DURATION, SIGNAL_DATA_LAG, SIGNAL_EVENT_LATENCY, SIGNAL_QUERY_LATENCY, SIGNALS,
+    start_metrics_server
+)
 
 # ═══════════════════════════════════════════════════════
 # CONFIG
@@ -22,6 +41,21 @@ INFLUX_TOKEN = os.getenv('INFLUX_TOKEN', 'my-super-secret-auth-token')
 INFLUX_ORG = os.getenv('INFLUX_ORG', 'vnquant')
 INFLUX_BUCKET = os.getenv('INFLUX_BUCKET', 'market_data')
 SIGNALS_BUCKET = os.getenv('SIGNALS_BUCKET', 'trading_signals')
+# Ngoài dải cổng của hunter (METRICS_PORT + số shard: 9101, 9102, ...)
+METRICS_PORT = int(os.getenv('SIGNAL_METRICS_PORT', '9201'))
+# Symbols per bulk Flux query (shards run concurrently)
+QUERY_SHARD_SIZE = int(os.getenv('SIGNAL_QUERY_SHARD_SIZE', '200'))
+# Streaming indicator checkpoint: restarts resume from here instead of re-reading 24h
+STATE_PATH = os.getenv('SIGNAL_STATE_PATH', os.path.join(os.getenv('SPILL_DIR', './spill'), 'signal_state.json'))
+# Bar events from the hunter (Redis pub/sub); without them, or when none arrive, poll every POLL_INTERVAL
+REDIS_URL = os.getenv('REDIS_URL', '')
+BAR_CHANNEL = os.getenv('BAR_EVENTS_CHANNEL', 'vn30:bars')
+POLL_INTERVAL = float(os.getenv('SIGNAL_POLL_INTERVAL', '30'))
+# Processes that fold cold symbols' full history (1 = in-process, 0 = one per core)
+SIGNAL_WORKERS = resolve_workers(int(os.getenv('SIGNAL_WORKERS', '1')))
+COLD_FIELDS = ('times', 'opens', 'highs', 'lows', 'prices')
+# Hunter's shared bar ring: warm symbols read new bars from it instead of InfluxDB ('' = off)
+BAR_RING_PATH = os.getenv('BAR_RING_PATH', '')
 
 VN30_STOCKS = [
     "ACB", "BCM", "BID", "BVH", "CTG", "FPT", "GAS", "GVR", 
@@ -69,81 +103,25 @@ class Colors:
 # TECHNICAL INDICATORS
 # ═══════════════════════════════════════════════════════
 def calculate_rsi(prices: List[float], period: int = 14) -> float:
-    """Calculate Relative Strength Index"""
-    if len(prices) < period + 1:
-        return 50.0  # Neutral
-    
-    deltas = np.diff(prices)
-    gains = np.where(deltas > 0, deltas, 0)
-    losses = np.where(deltas < 0, -deltas, 0)
-    
-    avg_gain = np.mean(gains[-period:])
-    avg_loss = np.mean(losses[-period:])
-    
-    if avg_loss == 0:
-        return 100.0
-    
-    rs = avg_gain / avg_loss
-    rsi = 100 - (100 / (1 + rs))
-    return float(rsi)
+    """Wilder RSI of the latest bar (50 while warming up)"""
+    return kernels.last_value(kernels.rsi(prices, period), 50.0)
 
 def calculate_macd(prices: List[float]) -> Tuple[float, float, float]:
-    """Calculate MACD, Signal Line, and Histogram"""
-    if len(prices) < 26:
-        return 0.0, 0.0, 0.0
-    
-    prices_arr = np.array(prices)
-    
-    # EMA 12
-    ema12 = calculate_ema(prices_arr, 12)
-    # EMA 26
-    ema26 = calculate_ema(prices_arr, 26)
-    
-    macd_line = ema12 - ema26
-    
-    # Signal line (EMA 9 of MACD)
-    if len(prices) >= 35:
-        signal_line = calculate_ema(np.array([macd_line]), 9)
-    else:
-        signal_line = macd_line
-    
-    histogram = macd_line - signal_line
-    
-    return float(macd_line), float(signal_line), float(histogram)
+    """MACD, Signal Line, and Histogram of the latest bar (0 while warming up)"""
+    series = kernels.macd(prices)
+    return tuple(kernels.last_value(s, 0.0) for s in series)
 
 def calculate_ema(prices: np.ndarray, period: int) -> float:
-    """Calculate Exponential Moving Average"""
-    if len(prices) < period:
-        return float(np.mean(prices))
-    
-    multiplier = 2 / (period + 1)
-    ema = prices[0]
-    for price in prices[1:]:
-        ema = (price - ema) * multiplier + ema
-    return float(ema)
+    """Exponential Moving Average of the latest bar"""
+    return kernels.last_value(kernels.ema(prices, period))
 
 def calculate_bollinger(prices: List[float], period: int = 20) -> Tuple[float, float, float, float]:
-    """Calculate Bollinger Bands and position"""
+    """Bollinger Bands and position of the latest bar"""
     if len(prices) < period:
         return 0.0, 0.0, 0.0, 0.5
-    
-    prices_arr = np.array(prices[-period:])
-    sma = np.mean(prices_arr)
-    std = np.std(prices_arr)
-    
-    upper = sma + (std * 2)
-    lower = sma - (std * 2)
-    
-    current_price = prices[-1]
-    # Position: 0 = at lower, 0.5 = at middle, 1 = at upper
-    if upper != lower:
-        position = (current_price - lower) / (upper - lower)
-    else:
-        position = 0.5
-    
-    position = max(0, min(1, position))  # Clamp to [0, 1]
-    
-    return float(upper), float(sma), float(lower), float(position)
+    bands = kernels.bollinger(prices[-period:], period)
+    return (kernels.last_value(bands.upper), kernels.last_value(bands.middle),
+            kernels.last_value(bands.lower), kernels.last_value(bands.position))
 
 def detect_candlestick_pattern(opens: List[float], highs: List[float], 
                                 lows: List[float], closes: List[float]) -> Optional[str]:
@@ -192,20 +170,41 @@ def generate_signal(symbol: str, prices: List[float],
                     lows: List[float] = None, volumes: List[float] = None) -> TradingSignal:
     """Generate trading signal based on multiple indicators"""
     
-    if not prices or len(prices) < 5:
+    if prices is None or len(prices) < 5:
         return TradingSignal(
             symbol=symbol, signal=SignalType.HOLD, confidence=0.0,
             price=0.0, rsi=50.0, macd=0.0, macd_signal=0.0, bb_position=0.5
         )
     
-    current_price = prices[-1]
-    reasoning = []
-    score = 0  # -100 to +100
-    
     # Calculate indicators
     rsi = calculate_rsi(prices)
     macd, macd_signal_val, macd_hist = calculate_macd(prices)
     bb_upper, bb_middle, bb_lower, bb_position = calculate_bollinger(prices)
+    pattern = None
+    if opens is not None and highs is not None and lows is not None and len(opens):
+        pattern = detect_candlestick_pattern(opens, highs, lows, prices)
+    
+    return score_signal(symbol, prices[-1], rsi, macd, macd_signal_val, macd_hist, bb_position, pattern)
+
+
+def signal_from_indicators(symbol: str, values: IndicatorValues) -> TradingSignal:
+    """Score a signal from streaming indicator state (see ai_engine.streaming)"""
+    if values.bars < 5:
+        return TradingSignal(
+            symbol=symbol, signal=SignalType.HOLD, confidence=0.0,
+            price=0.0, rsi=50.0, macd=0.0, macd_signal=0.0, bb_position=0.5
+        )
+    opens, highs, lows, closes = values.candles
+    pattern = detect_candlestick_pattern(opens, highs, lows, closes)
+    return score_signal(symbol, values.price, values.rsi, values.macd, values.macd_signal,
+                        values.macd_hist, values.bb_position, pattern)
+
+
+def score_signal(symbol: str, current_price: float, rsi: float, macd: float, macd_signal_val: float,
+                 macd_hist: float, bb_position: float, pattern: Optional[str]) -> TradingSignal:
+    """Combine indicator readings into a weighted score and signal"""
+    reasoning = []
+    score = 0  # -100 to +100
     
     # RSI Analysis (weight: 25)
     if rsi < 30:
@@ -238,16 +237,13 @@ def generate_signal(symbol: str, prices: List[float],
         reasoning.append("Giá chạm Bollinger trên")
     
     # Pattern Detection (weight: 30)
-    pattern = None
-    if opens and highs and lows:
-        pattern = detect_candlestick_pattern(opens, highs, lows, prices)
-        if pattern:
-            if "BULLISH" in pattern or "HAMMER" in pattern:
-                score += 30
-                reasoning.append(f"Mẫu nến: {pattern}")
-            elif "BEARISH" in pattern:
-                score -= 30
-                reasoning.append(f"Mẫu nến: {pattern}")
+    if pattern:
+        if "BULLISH" in pattern or "HAMMER" in pattern:
+            score += 30
+            reasoning.append(f"Mẫu nến: {pattern}")
+        elif "BEARISH" in pattern:
+            score -= 30
+            reasoning.append(f"Mẫu nến: {pattern}")
     
     # Determine final signal
     confidence = min(abs(score) / 100, 1.0)
@@ -279,50 +275,81 @@ def generate_signal(symbol: str, prices: List[float],
 # ═══════════════════════════════════════════════════════
 # INFLUXDB FUNCTIONS
 # ═══════════════════════════════════════════════════════
-def fetch_price_data(client: InfluxDBClient, symbol: str, hours: int = 24) -> Dict:
-    """Fetch price data from InfluxDB"""
-    query_api = client.query_api()
-    
-    query = f'''
+PRICE_FIELDS = {'close': 'prices', 'open': 'opens', 'high': 'highs', 'low': 'lows', 'volume': 'volumes'}
+
+
+def _empty_price_data() -> Dict:
+    data = {key: np.empty(0) for key in PRICE_FIELDS.values()}
+    data['times'] = np.empty(0, dtype=np.int64)
+    data['last_time'] = None
+    return data
+
+
+def _price_query(symbols: List[str], start: str) -> str:
+    symbol_set = ', '.join(f'"{s}"' for s in symbols)
+    return f'''
     from(bucket: "{INFLUX_BUCKET}")
-      |> range(start: -{hours}h)
+      |> range(start: {start})
       |> filter(fn: (r) => r["_measurement"] == "stock_price")
-      |> filter(fn: (r) => r["symbol"] == "{symbol}")
+      |> filter(fn: (r) => contains(value: r["symbol"], set: [{symbol_set}]))
+      |> filter(fn: (r) => r["_field"] == "open" or r["_field"] == "high" or r["_field"] == "low"
+                        or r["_field"] == "close" or r["_field"] == "volume")
       |> pivot(rowKey:["_time"], columnKey: ["_field"], valueColumn: "_value")
-      |> sort(columns: ["_time"])
+      |> keep(columns: ["_time", "symbol", "open", "high", "low", "close", "volume"])
     '''
-    
-    try:
-        tables = query_api.query(query, org=INFLUX_ORG)
-        
-        prices, opens, highs, lows, volumes = [], [], [], [], []
-        
-        for table in tables:
-            for record in table.records:
-                if 'close' in record.values:
-                    prices.append(float(record.values.get('close', 0)))
-                if 'open' in record.values:
-                    opens.append(float(record.values.get('open', 0)))
-                if 'high' in record.values:
-                    highs.append(float(record.values.get('high', 0)))
-                if 'low' in record.values:
-                    lows.append(float(record.values.get('low', 0)))
-                if 'volume' in record.values:
-                    volumes.append(float(record.values.get('volume', 0)))
-        
-        return {
-            'prices': prices,
-            'opens': opens,
-            'highs': highs,
-            'lows': lows,
-            'volumes': volumes
+
+
+def _fetch_shard(query_api, shard: int, symbols: List[str], start: str) -> Dict[str, Dict]:
+    """One Flux round trip for a shard of symbols -> per-symbol column arrays"""
+    with SIGNAL_QUERY_LATENCY.labels(str(shard)).time():
+        columns = query_columns(query_api, _price_query(symbols, start), INFLUX_ORG, tuple(PRICE_FIELDS))
+
+    results = {}
+    for symbol, values in columns.items():
+        has_close = ~np.isnan(values['close'])
+        if not has_close.any():
+            continue
+        data = {key: values[field][has_close] for field, key in PRICE_FIELDS.items()}
+        data['times'] = values['time'][has_close]
+        data['last_time'] = datetime.fromtimestamp(int(data['times'][-1]), tz=timezone.utc)
+        results[symbol] = data
+    return results
+
+
+def fetch_all_price_data(client: InfluxDBClient, symbols: List[str], hours: int = 24,
+                         since: Optional[datetime] = None) -> Dict[str, Dict]:
+    """
+    Fetch bars for many symbols with one Flux query per QUERY_SHARD_SIZE symbols
+    Shards run concurrently, so a cycle costs ~one round trip regardless of
+    universe size. Returns {symbol: {'prices', 'opens', 'highs', 'lows',
+    'volumes', 'times' (np arrays, times in epoch s), 'last_time'}};
+    symbols without data get empty arrays. `since` (UTC) overrides `hours`.
+    """
+    query_api = client.query_api()
+    start = since.strftime('%Y-%m-%dT%H:%M:%SZ') if since is not None else f'-{hours}h'
+    shards = [symbols[i:i + QUERY_SHARD_SIZE] for i in range(0, len(symbols), QUERY_SHARD_SIZE)]
+    results = {symbol: _empty_price_data() for symbol in symbols}
+
+    with concurrent.futures.ThreadPoolExecutor(max_workers=min(len(shards), 4) or 1) as executor:
+        futures = {
+            executor.submit(_fetch_shard, query_api, index, shard, start): shard
+            for index, shard in enumerate(shards)
         }
-    except Exception as e:
-        print(f"Error fetching {symbol}: {e}")
-        return {'prices': [], 'opens': [], 'highs': [], 'lows': [], 'volumes': []}
+        for future in concurrent.futures.as_completed(futures):
+            try:
+                results.update(future.result())
+            except Exception as e:
+                shard = futures[future]
+                print(f"Error fetching {shard[0]}..{shard[-1]} ({len(shard)} mã): {e}")
+    return results
+
 
-def write_signal_to_db(write_api, signal: TradingSignal):
-    """Write trading signal to InfluxDB"""
+def fetch_price_data(client: InfluxDBClient, symbol: str, hours: int = 24) -> Dict:
+    """Fetch price data for a single symbol from InfluxDB"""
+    return fetch_all_price_data(client, [symbol], hours)[symbol]
+
+def signal_to_point(signal: TradingSignal, timestamp: datetime) -> Point:
+    """Trading signal as an InfluxDB point (one timestamp per cycle)"""
     
     # Convert signal to numeric for Grafana
     signal_value = {
@@ -345,9 +372,9 @@ def write_signal_to_db(write_api, signal: TradingSignal):
         .field("macd_signal", signal.macd_signal) \
         .field("bb_position", signal.bb_position) \
         .field("reasoning", "; ".join(signal.reasoning) if signal.reasoning else "") \
-        .time(datetime.utcnow())
+        .time(timestamp)
     
-    write_api.write(bucket=INFLUX_BUCKET, org=INFLUX_ORG, record=point)
+    return point
 
 # ═══════════════════════════════════════════════════════
 # MAIN
@@ -361,41 +388,133 @@ def main():
 ╚═══════════════════════════════════════════════════════╝
 {Colors.RESET}
 🎯 Phân tích: {Colors.BOLD}{len(VN30_STOCKS)} mã VN30{Colors.RESET}
-📡 Database: {INFLUX_URL}
+📡 Database: {INFLUX_URL} (tín hiệu → {SIGNALS_BUCKET})
 🔬 Indicators: RSI, MACD, Bollinger, Patterns
+🧮 Workers: {SIGNAL_WORKERS}
 """)
     
+    # Cold symbols (full 24h history) are folded in a process pool over shared memory;
+    # its workers start before the metrics / writer threads below
+    pool = PanelPool(SIGNAL_WORKERS)
+    start_metrics_server(METRICS_PORT, 'signal_agent')
+    
     # Connect to InfluxDB
     client = InfluxDBClient(url=INFLUX_URL, token=INFLUX_TOKEN, org=INFLUX_ORG)
-    write_api = client.write_api(write_options=SYNCHRONOUS)
+    # Non-blocking writes with retry + disk spill (shared with the hunter);
+    # unchanged signals are only rewritten every CHANGE_HEARTBEAT seconds
+    write_api = writer_from_config(INFLUX_URL, INFLUX_TOKEN, INFLUX_ORG, name='signal_agent', dedupe=True)
+    # One batched write per cycle to the signals bucket
+    sink = SignalSink(write_api, SIGNALS_BUCKET, INFLUX_ORG)
+    sink.ensure_bucket(client)
+    
+    # Streaming indicator state (resume from checkpoint if present)
+    engine = StreamingIndicators(STATE_PATH)
+    try:
+        restored = engine.load()
+    except (OSError, ValueError) as e:
+        restored = 0
+        print(f"{Colors.YELLOW}⚠️ Không đọc được checkpoint {STATE_PATH}: {e}{Colors.RESET}")
+    if restored:
+        print(f"{Colors.GREEN}✅ Khôi phục trạng thái chỉ báo cho {restored} mã từ {STATE_PATH}{Colors.RESET}")
     
+    try:
+        run_cycles(client, sink, engine, pool)
+    finally:
+        pool.close()
+        engine.save()
+        write_api.close()
+        client.close()
+
+def ring_price_data(ring: BarRing, symbol: str, since: int) -> Optional[Dict]:
+    """Bars after epoch `since` from the shared ring (copied under the seqlock); None if the ring doesn't cover it"""
+    bars = ring.since(symbol, since)
+    if bars is None:
+        return None
+    data = {key: bars[field] for field, key in PRICE_FIELDS.items()}
+    data['times'] = bars['time']
+    data['last_time'] = datetime.fromtimestamp(int(bars['time'][-1]), tz=timezone.utc) if len(bars) else None
+    return data
+
+def fetch_new_bars(client: InfluxDBClient, engine: StreamingIndicators, symbols: List[str],
+                   ring: Optional[BarRing] = None) -> Dict[str, Dict]:
+    """
+    Full 24h history for cold symbols (InfluxDB), only bars past the state
+    for warm ones - from the bar ring when it reaches back far enough
+    """
+    cold, warm, since = engine.plan(symbols)
+    all_data = {}
+    if ring is not None:
+        for symbol in warm:
+            data = ring_price_data(ring, symbol, engine.states[symbol].last_time)
+            if data is not None:
+                all_data[symbol] = data
+        warm = [s for s in warm if s not in all_data]
+    if cold:
+        all_data.update(fetch_all_price_data(client, cold))
+    if warm:
+        all_data.update(fetch_all_price_data(client, warm, since=since))
+    return all_data
+
+def fold_cold_symbols(engine: StreamingIndicators, pool: PanelPool, symbols: List[str],
+                      all_data: Dict[str, Dict]) -> Dict[str, Optional[IndicatorValues]]:
+    """
+    Build states for symbols without one from their full history, across the pool
+    Warm symbols only fold a bar or two and stay in-process.
+    """
+    cold = {s: all_data[s] for s in symbols if s not in engine.states and len(all_data[s]['times'])}
+    task = partial(fold_cold, rsi_period=engine.rsi_period, bb_period=engine.bb_period)
+    folded, errors = pool.map(task, cold, COLD_FIELDS)
+    for symbol, error in errors.items():
+        print(f"{Colors.YELLOW}⚠️ Lỗi tính chỉ báo {symbol}: {error[:60]}{Colors.RESET}")
+    values = {}
+    for symbol, (state, symbol_values) in folded.items():
+        engine.adopt(symbol, state)
+        values[symbol] = symbol_values
+    return values
+
+def run_cycles(client: InfluxDBClient, sink: SignalSink, engine: StreamingIndicators, pool: PanelPool):
+    """
+    Analysis loop: fetch new bars, advance indicator state, score and write signals
+    Cycles start when the hunter reports written bars (only those symbols are
+    re-analysed); without events they fall back to polling every POLL_INTERVAL.
+    """
+    events = BarSubscriber(REDIS_URL, BAR_CHANNEL, info=log_info, warning=log_warning)
+    ring = None
+    symbols = VN30_STOCKS
     cycle = 0
     while True:
         cycle += 1
         start_time = time.time()
+        cycle_time = datetime.utcnow()
+        event = events.last_event
         
-        print(f"\n{Colors.CYAN}━━━ Analysis Cycle #{cycle} ━━━{Colors.RESET}")
+        trigger = "bar event" if event else "polling"
+        print(f"\n{Colors.CYAN}━━━ Analysis Cycle #{cycle} · {len(symbols)} mã ({trigger}) ━━━{Colors.RESET}")
         
         buy_signals = []
         sell_signals = []
         
-        for symbol in VN30_STOCKS:
-            # Fetch data
-            data = fetch_price_data(client, symbol)
+        # Fetch new bars for all symbols in bulk (sharded for large universes)
+        ring = open_ring(BAR_RING_PATH, ring)
+        all_data = fetch_new_bars(client, engine, symbols, ring)
+        query_time = time.time() - start_time
+        cold_values = fold_cold_symbols(engine, pool, symbols, all_data)
+        
+        for symbol in symbols:
+            data = all_data[symbol]
+            
+            if data['last_time'] is not None:
+                SIGNAL_DATA_LAG.observe(max(0.0, time.time() - data['last_time'].timestamp()))
             
-            if data['prices']:
+            # O(1) per new bar: fold closed bars into the running state
+            values = cold_values[symbol] if symbol in cold_values else engine.ingest(symbol, data)
+            if values is not None:
                 # Generate signal
-                signal = generate_signal(
-                    symbol=symbol,
-                    prices=data['prices'],
-                    opens=data['opens'],
-                    highs=data['highs'],
-                    lows=data['lows'],
-                    volumes=data['volumes']
-                )
+                signal = signal_from_indicators(symbol, values)
                 
-                # Write to DB
-                write_signal_to_db(write_api, signal)
+                # Buffer for the cycle's batched write
+                sink.add(signal_to_point(signal, cycle_time))
+                SIGNALS.labels(signal.signal.value).inc()
                 
                 # Categorize
                 if signal.signal in [SignalType.BUY, SignalType.STRONG_BUY]:
@@ -409,8 +528,17 @@ def main():
                 elif signal.signal == SignalType.STRONG_SELL:
                     print(f"  {Colors.RED}🔴🔴 {symbol}: BÁN MẠNH ({signal.confidence:.0%}){Colors.RESET}")
         
+        generated = len(sink)
+        queued = sink.flush()
+        if event:
+            SIGNAL_EVENT_LATENCY.observe(max(0.0, time.time() - event['published']))
+        engine.maybe_save()
         elapsed = time.time() - start_time
+        SIGNAL_CYCLE_DURATION.labels('query').observe(query_time)
+        SIGNAL_CYCLE_DURATION.labels('compute').observe(elapsed - query_time)
+        SIGNAL_CYCLE_DURATION.labels('total').observe(elapsed)
         print(f"\n📊 Kết quả: {Colors.GREEN}+{len(buy_signals)} MUA{Colors.RESET} | {Colors.RED}-{len(sell_signals)} BÁN{Colors.RESET} | ⏱ {elapsed:.1f}s")
+        print(f"💾 Ghi {queued}/{generated} tín hiệu (1 batch → {SIGNALS_BUCKET}, {generated - queued} không đổi)")
         
         # Top signals
         if buy_signals:
@@ -420,8 +548,8 @@ def main():
             top_sell = max(sell_signals, key=lambda s: s.confidence)
             print(f"⚠️ Top BÁN: {Colors.RED}{top_sell.symbol} ({top_sell.confidence:.0%}){Colors.RESET}")
         
-        # Sleep 30 seconds between analysis cycles
-        time.sleep(30)
+        # Next cycle: as soon as the hunter writes new bars
+        symbols = events.wait_for(VN30_STOCKS, POLL_INTERVAL)
 
 if __name__ == "__main__":
     try:
@@ -0,0 +1,56 @@
+"""
+VN30-Quantum Signal Sink
+Buffers one analysis cycle of signal Points and writes them to the signals bucket as one batch
+"""
+from typing import List
+
+from influxdb_client import InfluxDBClient, Point
+
+from config import log_info, log_warning
+from influx_writer import InfluxBatchWriter
+
+
+class SignalSink:
+    """
+    Per-cycle buffer in front of the background writer
+
+    `add()` only appends to a list. `flush()` hands the whole cycle to the
+    writer in a single `write()` call, which the flush thread always sends
+    as one batch, so a cycle costs one request to the signals bucket however
+    many symbols it covers. `flush()` never waits on InfluxDB: retries and
+    disk spill stay with the writer.
+    """
+
+    def __init__(self, writer: InfluxBatchWriter, bucket: str, org: str):
+        self.writer = writer
+        self.bucket = bucket
+        self.org = org
+        self._points: List[Point] = []
+
+    def ensure_bucket(self, client: InfluxDBClient, retention_seconds: int = 0) -> bool:
+        """Create the signals bucket if it doesn't exist (0 = keep forever)"""
+        try:
+            buckets_api = client.buckets_api()
+            if buckets_api.find_bucket_by_name(self.bucket) is not None:
+                return True
+            org_id = client.organizations_api().find_organizations(org=self.org)[0].id
+            rules = [{'type': 'expire', 'everySeconds': retention_seconds}] if retention_seconds else []
+            buckets_api.create_bucket(bucket_name=self.bucket, org_id=org_id, retention_rules=rules)
+            log_info(f"🪣 Đã tạo bucket tín hiệu: {self.bucket}")
+            return True
+        except Exception as e:
+            log_warning(f"Không kiểm tra/tạo được bucket {self.bucket}: {str(e)[:80]}")
+            return False
+
+    def add(self, point: Point):
+        self._points.append(point)
+
+    def __len__(self) -> int:
+        return len(self._points)
+
+    def flush(self) -> int:
+        """Queue the cycle's signals as one batch; returns how many were queued (after dedupe)"""
+        if not self._points:
+            return 0
+        points, self._points = self._points, []
+        return self.writer.write(bucket=self.bucket, org=self.org, record=points)
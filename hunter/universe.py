@@ -0,0 +1,101 @@
+"""
+VN30-Quantum Hunter - Symbol Universe
+Resolves SYMBOL_UNIVERSE into the list of symbols to collect
+"""
+import json
+import os
+import time
+from typing import List, Optional
+
+from config import HUNTER_STOCKS, log_info, log_warning
+
+EXCHANGES = ('HOSE', 'HNX', 'UPCOM')
+# vnstock providers use HSX for HOSE
+EXCHANGE_ALIASES = {'HSX': 'HOSE', 'UPCOM': 'UPCOM', 'HNX': 'HNX', 'HOSE': 'HOSE'}
+
+LISTING_CACHE_TTL = 24 * 3600
+
+
+def load_universe(spec: str, cache_dir: str = './spill', provider: str = 'VCI') -> List[str]:
+    """
+    `spec` is one of:
+      vn30                  - the current VN30 basket (default)
+      all                   - every listed stock on HOSE, HNX and UPCoM
+      HOSE,HNX              - listed stocks on the given exchanges
+      /path/symbols.txt     - one symbol per line (or a CSV with a `symbol` column)
+    Exchange listings are cached for a day, so restarts don't hit the listing API.
+    """
+    spec = (spec or 'vn30').strip()
+    if spec.lower() == 'vn30':
+        return list(HUNTER_STOCKS)
+    if os.path.isfile(spec):
+        return _read_symbol_file(spec)
+
+    exchanges = EXCHANGES if spec.lower() == 'all' else tuple(
+        EXCHANGE_ALIASES.get(e.strip().upper(), e.strip().upper()) for e in spec.split(',') if e.strip()
+    )
+    unknown = [e for e in exchanges if e not in EXCHANGES]
+    if unknown:
+        raise ValueError(f"SYMBOL_UNIVERSE không hợp lệ: {spec} (vn30 | all | HOSE,HNX,UPCOM | file)")
+
+    listing = _cached_listing(cache_dir, provider)
+    symbols = sorted(s for s, exchange in listing.items() if exchange in exchanges)
+    if not symbols:
+        log_warning(f"Không lấy được danh sách mã {','.join(exchanges)} - dùng rổ VN30")
+        return list(HUNTER_STOCKS)
+    return symbols
+
+
+def _read_symbol_file(path: str) -> List[str]:
+    if path.endswith('.csv'):
+        import pandas as pd
+        return sorted(pd.read_csv(path)['symbol'].astype(str).str.strip().str.upper().unique())
+    with open(path) as f:
+        return sorted({line.strip().upper() for line in f if line.strip() and not line.startswith('#')})
+
+
+def _cached_listing(cache_dir: str, provider: str) -> dict:
+    """{symbol: exchange} from the listing cache, refreshed from vnstock when stale"""
+    path = os.path.join(cache_dir, 'universe.json')
+    cached: Optional[dict] = None
+    if os.path.exists(path):
+        with open(path) as f:
+            cached = json.load(f)
+        if time.time() - cached.get('fetched', 0) < LISTING_CACHE_TTL:
+            return cached['symbols']
+
+    try:
+        listing = fetch_listing(provider)
+    except Exception as e:
+        log_warning(f"Lỗi tải danh sách niêm yết: {str(e)[:80]}")
+        return cached['symbols'] if cached else {}
+
+    os.makedirs(cache_dir, exist_ok=True)
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'w') as f:
+        json.dump({'fetched': time.time(), 'symbols': listing}, f)
+    os.replace(tmp_path, path)
+    log_info(f"Đã tải danh sách niêm yết: {len(listing)} mã")
+    return listing
+
+
+def fetch_listing(provider: str = 'VCI') -> dict:
+    """{symbol: exchange} for listed stocks (HOSE/HNX/UPCOM) via vnstock"""
+    try:
+        from vnstock import Listing  # vnstock >= 3
+        df = Listing(source=provider).symbols_by_exchange()
+        if 'type' in df:
+            df = df[df['type'].astype(str).str.upper() == 'STOCK']
+        symbol_col, exchange_col = 'symbol', 'exchange'
+    except ImportError:
+        from vnstock import listing_companies  # vnstock 0.x
+        df = listing_companies()
+        symbol_col, exchange_col = 'ticker', 'comGroupCode'
+
+    listing = {}
+    for symbol, exchange in zip(df[symbol_col], df[exchange_col]):
+        exchange = EXCHANGE_ALIASES.get(str(exchange).upper())
+        # Cổ phiếu niêm yết có mã 3 ký tự (loại chứng quyền, trái phiếu, ETF dài)
+        if exchange and isinstance(symbol, str) and len(symbol) == 3:
+            listing[symbol.upper()] = exchange
+    return listing
@@ -0,0 +1,80 @@
+"""
+VN30-Quantum Hunter - Bar Watermarks
+Per-symbol high-water mark of the last bar stored in InfluxDB
+"""
+import math
+from datetime import datetime, timezone
+from typing import Dict, Iterable, Optional
+
+import pandas as pd
+
+from config import log_warning
+
+
+class WatermarkStore:
+    """
+    Tracks the newest bar time stored per symbol.
+
+    Each cycle only bars at or after the watermark are written. The bar at
+    the watermark itself is re-sent because the current minute is still
+    forming; since points carry the bar's own timestamp, Influx overwrites
+    it in place, so writes are idempotent on (symbol, bar time).
+
+    New marks are staged while a cycle runs and only committed once the
+    batch has been written, so a failed write never skips bars.
+    """
+
+    def __init__(self):
+        self._marks: Dict[str, pd.Timestamp] = {}
+        self._staged: Dict[str, pd.Timestamp] = {}
+
+    def get(self, symbol: str) -> Optional[pd.Timestamp]:
+        return self._marks.get(symbol)
+
+    def seed_from_influx(self, query_api, bucket: str, org: str, lookback: str = '-3d'):
+        """Load the last stored bar time per symbol so restarts resume in place"""
+        query = f'''
+        from(bucket: "{bucket}")
+          |> range(start: {lookback})
+          |> filter(fn: (r) => r["_measurement"] == "stock_price" and r["_field"] == "close")
+          |> group(columns: ["symbol"])
+          |> last()
+        '''
+        try:
+            for table in query_api.query(query, org=org):
+                for record in table.records:
+                    symbol = record.values.get('symbol')
+                    if symbol:
+                        self._marks[symbol] = pd.Timestamp(record.get_time()).tz_convert(timezone.utc)
+        except Exception as e:
+            log_warning(f"Không đọc được watermark từ InfluxDB: {str(e)[:80]}")
+
+    def count_back(self, symbol: str, limit: int, now: Optional[datetime] = None) -> int:
+        """Number of 1m bars to request so the window just covers the watermark"""
+        mark = self._marks.get(symbol)
+        if mark is None:
+            return limit
+        now = pd.Timestamp(now or datetime.now(timezone.utc))
+        minutes = (now - mark).total_seconds() / 60
+        return int(min(limit, max(2, math.ceil(minutes) + 2)))
+
+    def new_bars(self, symbol: str, df: pd.DataFrame) -> pd.DataFrame:
+        """Rows of a normalized bar frame at or after the symbol's watermark"""
+        if df is None or df.empty:
+            return df
+        mark = self._marks.get(symbol)
+        if mark is not None:
+            df = df[df['time'] >= mark]
+        if not df.empty:
+            self._staged[symbol] = df['time'].iloc[-1]
+        return df
+
+    def commit(self, symbols: Optional[Iterable[str]] = None):
+        """Promote staged marks after a successful write"""
+        for symbol in list(symbols) if symbols is not None else list(self._staged):
+            if symbol in self._staged:
+                self._marks[symbol] = self._staged.pop(symbol)
+
+    def rollback(self):
+        """Drop staged marks after a failed write - the bars will be re-fetched"""
+        self._staged.clear()